@@ -0,0 +1,290 @@
+"""
+Caches of the objects which a PdfFileReader has resolved, and of the decoded
+data of its streams.
+
+By default every object that is read stays in the cache for the lifetime of
+the reader, which makes a large document cost as much memory as all of its
+decoded content streams. :class:`ObjectCache` can instead keep only the most
+recently used objects, up to a number of objects or an approximate number of
+bytes, and counts its hits, misses and evictions. :class:`StreamCache` does
+the same for decoded stream data, which it can keep in place of the encoded
+data.
+"""
+
+import weakref
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:  # Py2
+    from collections import MutableMapping
+from collections import OrderedDict
+
+from .generic import ArrayObject, DictionaryObject, EncodedStreamObject, StreamObject
+from .utils import bytes_type, string_type
+
+
+def approximateSize(obj):
+    """
+    :return: roughly the number of bytes of memory taken up by an object and
+        the direct objects it contains, including the data of a stream and
+        its decoded data. Data which is a view of a memory-mapped file is not
+        counted, since it is not held in memory.
+    """
+    if isinstance(obj, EncodedStreamObject):
+        # the encoded data is not read again if it has been dropped, and
+        # data in a StreamCache is counted by the StreamCache
+        size = _dataSize(obj._encodedData)
+        if obj.decodedSelf is not None:
+            size += _dataSize(obj.decodedSelf._data)
+        return size + sum(approximateSize(value) + 64 for value in obj.values())
+    if isinstance(obj, StreamObject):
+        size = _dataSize(obj._data)
+        return size + sum(approximateSize(value) + 64 for value in obj.values())
+    if isinstance(obj, DictionaryObject):
+        return 100 + sum(approximateSize(value) + 64 for value in obj.values())
+    if isinstance(obj, ArrayObject):
+        return 64 + sum(approximateSize(value) + 8 for value in obj)
+    if isinstance(obj, (bytes_type, string_type)):
+        return 40 + len(obj)
+    return 32
+
+
+def _dataSize(data):
+    if data is None or isinstance(data, memoryview):
+        return 0
+    return len(data)
+
+
+class ObjectCache(MutableMapping):
+    """
+    The resolved objects of a reader, as a dict of (generation, object
+    number) to object.
+
+    Without limits every object is kept. With ``maxObjects`` or ``maxBytes``
+    the least recently used objects are evicted once there are more than
+    ``maxObjects`` of them, or once their :func:`approximateSize` adds up to
+    more than ``maxBytes``. The reader reads an evicted object from the file
+    again when it is next needed, unless it is still referenced elsewhere
+    (e.g. a page returned by ``getPage``), in which case the same object is
+    found through a weak reference, so changes made to it are not lost.
+
+    Decoded stream data is cached on the stream object, so it is evicted with
+    it. The size of a stream is measured again when it is used, since it is
+    usually decoded after it has been added.
+    """
+    def __init__(self, maxObjects=None, maxBytes=None):
+        self.maxObjects = maxObjects
+        self.maxBytes = maxBytes
+        self.bounded = maxObjects is not None or maxBytes is not None
+        # only bounded caches need to know the order in which objects were used
+        self.objects = OrderedDict() if self.bounded else {}
+        self.sizes = {}
+        self.size = 0
+        self.evicted = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Looks up an object, counting a hit or a miss, and marks it as the
+        most recently used.
+        """
+        obj = self.objects.get(key)
+        if obj is not None:
+            self.hits += 1
+            if self.bounded:
+                self._touch(key)
+            return obj
+        obj = self.evicted.get(key) if self.bounded else None
+        if obj is None:
+            self.misses += 1
+            return default
+        # evicted, but still in use elsewhere
+        self.hits += 1
+        self[key] = obj
+        return obj
+
+    def _touch(self, key):
+        if hasattr(self.objects, 'move_to_end'):
+            self.objects.move_to_end(key)
+        else:  # Py2
+            self.objects[key] = self.objects.pop(key)
+        if self.maxBytes is not None:
+            self._measure(key)
+
+    def _measure(self, key):
+        size = approximateSize(self.objects[key])
+        self.size += size - self.sizes.get(key, 0)
+        self.sizes[key] = size
+
+    def __getitem__(self, key):
+        return self.objects[key]
+
+    def __contains__(self, key):
+        return key in self.objects
+
+    def __setitem__(self, key, obj):
+        if not self.bounded:
+            self.objects[key] = obj
+            return
+        if key in self.objects:
+            del self[key]
+        elif self.objects and self.maxBytes is not None:
+            # the previous object has most likely been decoded since it was
+            # added
+            self._measure(next(reversed(self.objects)))
+        self.objects[key] = obj
+        if self.maxBytes is not None:
+            self._measure(key)
+        # the object which was just added is never evicted
+        while len(self.objects) > 1 and self._isFull():
+            self._evict()
+
+    def __delitem__(self, key):
+        del self.objects[key]
+        self.size -= self.sizes.pop(key, 0)
+        self.evicted.pop(key, None)
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def _isFull(self):
+        return (self.maxObjects is not None and len(self.objects) > self.maxObjects) or \
+            (self.maxBytes is not None and self.size > self.maxBytes)
+
+    def _evict(self):
+        key, obj = self.objects.popitem(last=False)
+        self.size -= self.sizes.pop(key, 0)
+        self.evictions += 1
+        try:
+            self.evicted[key] = obj
+        except TypeError:
+            # numbers and strings cannot be weakly referenced, but they are
+            # never changed either
+            pass
+
+    def stats(self):
+        """
+        :return: a dict of the number of ``hits``, ``misses`` and
+            ``evictions``, and the number of ``objects`` in the cache and
+            their approximate size in ``bytes`` (``None`` unless the cache
+            is limited by size).
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'objects': len(self.objects),
+            'bytes': self.size if self.maxBytes is not None else None,
+        }
+
+
+class StreamCache(object):
+    """
+    The decoded data of the streams of a reader, which is kept here instead
+    of on each stream (as ``decodedSelf``) when the reader is given a
+    cache.
+
+    Without ``maxBytes`` the data of every stream which has been decoded is
+    kept. With ``maxBytes`` the least recently used data is dropped once the
+    decoded data adds up to more than ``maxBytes``, and decoded again when
+    it is next needed; data larger than ``maxBytes`` is not kept at all.
+    With ``dropEncoded`` the encoded data of a stream is dropped once its
+    decoded data is kept, and read from the file again if the stream has to
+    be decoded again, so that only one copy of the data of a stream is held
+    at a time. Encoded data which has been decrypted, or which is a view of
+    a memory-mapped file, is never dropped.
+
+    Streams are looked up by identity and are not kept alive by the cache:
+    the data of a stream which is no longer used anywhere, e.g. one evicted
+    from an :class:`ObjectCache`, is dropped with it.
+
+    Any object with the ``get``, ``put`` and ``stats`` methods and the
+    ``dropEncoded`` attribute of this class can be used instead.
+    """
+    def __init__(self, maxBytes=None, dropEncoded=False):
+        self.maxBytes = maxBytes
+        self.dropEncoded = dropEncoded
+        # the id of each stream to a tuple of (weak reference to the stream,
+        # decoded data), from the least to the most recently used
+        self.entries = OrderedDict()
+        self.size = 0
+        self.peakSize = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, stream):
+        """
+        Looks up the decoded data of a stream, counting a hit or a miss, and
+        marks it as the most recently used.
+
+        :return: the decoded data, or ``None`` if it is not in the cache.
+        """
+        key = id(stream)
+        entry = self.entries.get(key)
+        if entry is None or entry[0]() is not stream:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if hasattr(self.entries, 'move_to_end'):
+            self.entries.move_to_end(key)
+        else:  # Py2
+            self.entries[key] = self.entries.pop(key)
+        return entry[1]
+
+    def put(self, stream, data):
+        """
+        Adds the decoded data of a stream, evicting the least recently used
+        data if the cache is full.
+
+        :return: ``True`` if the data is kept, or ``False`` if it is larger
+            than the cache.
+        """
+        key = id(stream)
+        self._remove(key)
+        if self.maxBytes is not None and len(data) > self.maxBytes:
+            return False
+        reference = weakref.ref(stream, lambda reference, key=key: self._forget(key, reference))
+        self.entries[key] = (reference, data)
+        self.size += len(data)
+        while self.maxBytes is not None and self.size > self.maxBytes:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+        self.peakSize = max(self.peakSize, self.size)
+        return True
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def _forget(self, key, reference):
+        # the stream has been garbage collected; its id may since have been
+        # reused by a stream which was added in its place
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] is reference:
+            self._remove(key)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        """
+        :return: a dict of the number of ``hits``, ``misses`` and
+            ``evictions``, the number of ``streams`` whose data is kept,
+            the size of that data in ``bytes``, and the most bytes kept at
+            any one time, ``peakBytes``.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'streams': len(self.entries),
+            'bytes': self.size,
+            'peakBytes': self.peakSize,
+        }
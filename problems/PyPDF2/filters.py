@@ -34,13 +34,20 @@ Implementation of stream filters for PDF.
 __author__ = "Mathieu Fenniak"
 __author_email__ = "biziqe@mathieu.fenniak.net"
 
-from .utils import PdfReadError, ord_, chr_
+from .utils import PdfReadError, b_, ord_, chr_, bytes_type
 from sys import version_info
+from itertools import chain
 if version_info < ( 3, 0 ):
     from cStringIO import StringIO
+    accumulate = None
 else:
     from io import StringIO
-    import struct
+    from itertools import accumulate
+import array
+import binascii
+import re
+import struct
+import sys
 
 try:
     import zlib
@@ -54,6 +61,7 @@ try:
 except ImportError:
     # Unable to import zlib.  Attempt to use the System.IO.Compression
     # library from the .NET framework. (IronPython only)
+    zlib = None
     import System
     from System import IO, Collections, Array
 
@@ -106,46 +114,238 @@ except ImportError:
         return retval
 
 
+def undoPrediction(data, predictor, colors=1, bitsPerComponent=8, columns=1):
+    """
+    Reverses the prediction applied to the data of a stream before it was
+    compressed with the FlateDecode or LZWDecode filter.
+
+    :param data: the decompressed data
+    :param int predictor: the ``/Predictor`` of the stream: 2 for TIFF
+        predictor 2, or 10 to 15 for PNG predictors, where the filter (None,
+        Sub, Up, Average or Paeth) is given by the first byte of each row
+    :param int colors: the number of color components in each sample
+    :param int bitsPerComponent: the number of bits of each color component
+    :param int columns: the number of samples in each row
+    :return: the data, as bytes. A truncated last row is decoded as if it
+        were padded with zeros.
+    """
+    bitsPerPixel = colors * bitsPerComponent
+    rowLength = (bitsPerPixel * columns + 7) // 8
+    if rowLength <= 0:
+        raise PdfReadError("Invalid predictor parameters: %r colors, %r bits per component, %r columns"
+                           % (colors, bitsPerComponent, columns))
+    data = bytearray(data)
+    if 10 <= predictor <= 15:
+        # PNG filters work on whole bytes, comparing each byte to the
+        # corresponding byte of the previous pixel, rounded up to a byte
+        return _undoPngPrediction(data, rowLength, (bitsPerPixel + 7) // 8)
+    elif predictor == 2:
+        return _undoTiffPrediction(data, rowLength, colors, bitsPerComponent, columns)
+    else:
+        # unsupported predictor
+        raise PdfReadError("Unsupported flatedecode predictor %r" % predictor)
+
+
+def _undoPngPrediction(data, rowLength, bytesPerPixel):
+    stride = rowLength + 1
+    rows = (len(data) + stride - 1) // stride
+    length = len(data) - rows
+    data.extend(bytearray(rows * stride - len(data)))
+    # strip the filter byte which starts each row, by column or by row,
+    # whichever takes fewer copies
+    output = bytearray(rows * rowLength)
+    if rowLength < rows:
+        for column in range(rowLength):
+            output[column::rowLength] = data[column + 1::stride]
+    else:
+        for row in range(rows):
+            output[row * rowLength:(row + 1) * rowLength] = data[row * stride + 1:(row + 1) * stride]
+
+    # undo the filter of each run of rows which have the same filter
+    for run in _RUN_PATTERN.finditer(bytes(data[::stride])):
+        start, row = run.span()
+        filterByte = data[start * stride]
+        if filterByte == 0:
+            pass
+        elif filterByte == 1:
+            for position in range(start * rowLength, row * rowLength, rowLength):
+                _undoSub(output, position, rowLength, bytesPerPixel)
+        elif filterByte == 2:
+            _undoUp(output, start, row, rowLength)
+        elif filterByte == 3:
+            for position in range(start * rowLength, row * rowLength, rowLength):
+                _undoAverage(output, position, rowLength, bytesPerPixel)
+        elif filterByte == 4:
+            for position in range(start * rowLength, row * rowLength, rowLength):
+                _undoPaeth(output, position, rowLength, bytesPerPixel)
+        else:
+            # unsupported PNG filter
+            raise PdfReadError("Unsupported PNG filter %r" % filterByte)
+    return bytes(output[:length])
+
+
+# a run of the same byte
+_RUN_PATTERN = re.compile(b_(r"(.)\1*"), re.DOTALL)
+
+
+def _undoSub(output, position, rowLength, bytesPerPixel):
+    # each byte is the difference from the same byte of the previous pixel
+    end = position + rowLength
+    for offset in range(position, min(position + bytesPerPixel, end)):
+        output[offset:end:bytesPerPixel] = _runningTotal(output[offset:end:bytesPerPixel])
+
+
+def _undoUp(output, start, stop, rowLength):
+    # each byte is the difference from the same byte of the previous row;
+    # the row before the first one is zeros
+    start = max(start, 1)
+    if stop - start > rowLength:
+        # many short rows: sum down each column of the run
+        for column in range(rowLength):
+            previous = output[(start - 1) * rowLength + column]
+            output[start * rowLength + column:stop * rowLength:rowLength] = _runningTotal(
+                output[start * rowLength + column:stop * rowLength:rowLength], previous)
+    else:
+        for position in range(start * rowLength, stop * rowLength, rowLength):
+            output[position:position + rowLength] = _addBytes(output[position:position + rowLength],
+                                                              output[position - rowLength:position])
+
+
+def _undoAverage(output, position, rowLength, bytesPerPixel):
+    # each byte is the difference from the mean of the same byte of the
+    # previous pixel and of the previous row
+    hasUp = position >= rowLength
+    for i in range(position, position + rowLength):
+        left = output[i - bytesPerPixel] if i - position >= bytesPerPixel else 0
+        up = output[i - rowLength] if hasUp else 0
+        output[i] = (output[i] + ((left + up) >> 1)) & 0xff
+
+
+def _undoPaeth(output, position, rowLength, bytesPerPixel):
+    # each byte is the difference from whichever of the same byte of the
+    # previous pixel, the previous row, or the previous pixel of the previous
+    # row is closest to left + up - upLeft
+    hasUp = position >= rowLength
+    for i in range(position, position + rowLength):
+        if i - position >= bytesPerPixel:
+            left = output[i - bytesPerPixel]
+            upLeft = output[i - bytesPerPixel - rowLength] if hasUp else 0
+        else:
+            left = upLeft = 0
+        up = output[i - rowLength] if hasUp else 0
+        estimate = left + up - upLeft
+        distanceLeft = abs(estimate - left)
+        distanceUp = abs(estimate - up)
+        distanceUpLeft = abs(estimate - upLeft)
+        if distanceLeft <= distanceUp and distanceLeft <= distanceUpLeft:
+            predicted = left
+        elif distanceUp <= distanceUpLeft:
+            predicted = up
+        else:
+            predicted = upLeft
+        output[i] = (output[i] + predicted) & 0xff
+
+
+def _undoTiffPrediction(data, rowLength, colors, bitsPerComponent, columns):
+    # each color component of a sample is the difference from the same
+    # component of the previous sample in the row
+    length = len(data)
+    rows = (length + rowLength - 1) // rowLength
+    data.extend(bytearray(rows * rowLength - length))
+    if bitsPerComponent == 8:
+        for position in range(0, rows * rowLength, rowLength):
+            _undoSub(data, position, rowLength, colors)
+    elif bitsPerComponent == 16:
+        for position in range(0, rows * rowLength, rowLength):
+            components = array.array("H")
+            if hasattr(components, "frombytes"):
+                components.frombytes(bytes(data[position:position + rowLength]))
+            else:  # Py2
+                components.fromstring(bytes(data[position:position + rowLength]))
+            if sys.byteorder == "little":
+                components.byteswap()
+            for component in range(colors):
+                components[component::colors] = array.array(
+                    "H", [total & 0xffff for total in _runningSums(components[component::colors])])
+            if sys.byteorder == "little":
+                components.byteswap()
+            if hasattr(components, "tobytes"):
+                data[position:position + rowLength] = components.tobytes()
+            else:  # Py2
+                data[position:position + rowLength] = components.tostring()
+    elif bitsPerComponent in (1, 2, 4):
+        mask = (1 << bitsPerComponent) - 1
+        samplesPerByte = 8 // bitsPerComponent
+        for position in range(0, rows * rowLength, rowLength):
+            components = [(byte >> shift) & mask for byte in data[position:position + rowLength]
+                          for shift in range(8 - bitsPerComponent, -1, -bitsPerComponent)]
+            # the bits after the last sample of a row are left as they are
+            for i in range(colors, colors * columns):
+                components[i] = (components[i] + components[i - colors]) & mask
+            for i in range(rowLength):
+                byte = 0
+                for component in components[i * samplesPerByte:(i + 1) * samplesPerByte]:
+                    byte = (byte << bitsPerComponent) | component
+                data[position + i] = byte
+    else:
+        raise PdfReadError("Unsupported bits per component for TIFF predictor %r" % bitsPerComponent)
+    return bytes(data[:length])
+
+
+def _runningSums(values, start=0):
+    if accumulate is None:  # Py2
+        sums = []
+        for value in values:
+            start += value
+            sums.append(start)
+        return sums
+    if start:
+        sums = accumulate(chain((start,), values))
+        next(sums)
+        return sums
+    return accumulate(values)
+
+
+def _runningTotal(values, start=0):
+    """
+    :return: a bytearray of the running totals of ``values`` (a bytearray),
+        modulo 256, starting from ``start``.
+    """
+    if accumulate is None:  # Py2
+        return bytearray(total & 0xff for total in _runningSums(values, start))
+    # the low byte of each total, taken from the totals as 64-bit integers,
+    # which is faster than masking each one
+    totals = array.array("Q", _runningSums(values, start)).tobytes()
+    return bytearray(totals[_LOW_BYTE_OFFSET::8])
+
+_LOW_BYTE_OFFSET = 0 if sys.byteorder == "little" else 7
+
+
+def _addBytes(a, b):
+    """
+    :return: a bytearray of the sums, modulo 256, of the bytes of ``a`` and
+        ``b``, which have the same length.
+    """
+    if not hasattr(int, "from_bytes"):  # Py2
+        return bytearray((x + y) & 0xff for x, y in zip(a, b))
+    # add the low seven bits of every byte at once, as one big integer, so
+    # that no carry crosses into the next byte, then add the top bits
+    # without carrying them
+    n = len(a)
+    x = int.from_bytes(a, "big")
+    y = int.from_bytes(b, "big")
+    low = int.from_bytes(b"\x7f" * n, "big")
+    return bytearray((((x & low) + (y & low)) ^ ((x ^ y) & ~low)).to_bytes(n, "big"))
+
+
 class FlateDecode(object):
     def decode(data, decodeParms):
         data = decompress(data)
-        predictor = 1
-        if decodeParms:
-            try:
-                predictor = decodeParms.get("/Predictor", 1)
-            except AttributeError:
-                pass    # usually an array with a null object was read
-
+        predictor = _getPredictor(decodeParms)
         # predictor 1 == no predictor
         if predictor != 1:
-            columns = decodeParms["/Columns"]
-            # PNG prediction:
-            if predictor >= 10 and predictor <= 15:
-                output = StringIO()
-                # PNG prediction can vary from row to row
-                rowlength = columns + 1
-                assert len(data) % rowlength == 0
-                prev_rowdata = (0,) * rowlength
-                for row in range(len(data) // rowlength):
-                    rowdata = [ord_(x) for x in data[(row*rowlength):((row+1)*rowlength)]]
-                    filterByte = rowdata[0]
-                    if filterByte == 0:
-                        pass
-                    elif filterByte == 1:
-                        for i in range(2, rowlength):
-                            rowdata[i] = (rowdata[i] + rowdata[i-1]) % 256
-                    elif filterByte == 2:
-                        for i in range(1, rowlength):
-                            rowdata[i] = (rowdata[i] + prev_rowdata[i]) % 256
-                    else:
-                        # unsupported PNG filter
-                        raise PdfReadError("Unsupported PNG filter %r" % filterByte)
-                    prev_rowdata = rowdata
-                    output.write(''.join([chr(x) for x in rowdata[1:]]))
-                data = output.getvalue()
-            else:
-                # unsupported predictor
-                raise PdfReadError("Unsupported flatedecode predictor %r" % predictor)
+            data = undoPrediction(data, predictor, decodeParms.get("/Colors", 1),
+                                  decodeParms.get("/BitsPerComponent", 8), decodeParms.get("/Columns", 1))
         return data
     decode = staticmethod(decode)
 
@@ -156,207 +356,527 @@ class FlateDecode(object):
 
 class ASCIIHexDecode(object):
     def decode(data, decodeParms=None):
-        retval = ""
-        char = ""
-        x = 0
-        while True:
-            c = data[x]
-            if c == ">":
-                break
-            elif c.isspace():
-                x += 1
-                continue
-            char += c
-            if len(char) == 2:
-                retval += chr(int(char, base=16))
-                char = ""
-            x += 1
-        assert char == ""
-        return retval
+        return b_("").join(_stageOutputs(_ASCIIHexStage(), [_asBytes(data)]))
     decode = staticmethod(decode)
 
 
 class LZWDecode(object):
-    """Taken from:
-    http://www.java2s.com/Open-Source/Java-Document/PDF/PDF-Renderer/com/sun/pdfview/decode/LZWDecode.java.htm
+    """
+    Decodes LZW data (PDF spec section 7.4.4), with codes of 9 to 12 bits.
     """
     class decoder(object):
-        def __init__(self, data):
-            self.STOP=257
-            self.CLEARDICT=256
-            self.data=data
-            self.bytepos=0
-            self.bitpos=0
-            self.dict=[""]*4096
-            for i in range(256):
-                self.dict[i]=chr(i)
+        """
+        Decodes LZW data fed to it in pieces. The code table is allocated
+        up front, each entry being the entry of its prefix code followed by
+        one byte.
+        """
+        CLEARDICT = 256
+        STOP = 257
+        # the first code which is added to the table
+        FIRST = 258
+        # the table holds at most 4096 codes of 12 bits
+        MAX_CODES = 4096
+
+        def __init__(self, data=b_(""), earlyChange=1):
+            """
+            :param data: the data which :meth:`decode` decodes
+            :param int earlyChange: 1 to widen the codes one code early, as
+                most encoders do, or 0 to widen them when the table is full
+            """
+            self.data = data
+            self.earlyChange = earlyChange
+            self.table = [bytes(bytearray([i])) for i in range(256)] + [None] * (self.MAX_CODES - 256)
+            self.buffer = 0     # bits which have been read but not decoded
+            self.bits = 0
+            self.previous = None
+            self.stopped = False
             self.resetDict()
 
         def resetDict(self):
-            self.dictlen=258
-            self.bitspercode=9
-
-        def nextCode(self):
-            fillbits=self.bitspercode
-            value=0
-            while fillbits>0 :
-                if self.bytepos >= len(self.data):
-                    return -1
-                nextbits=ord(self.data[self.bytepos])
-                bitsfromhere=8-self.bitpos
-                if bitsfromhere>fillbits:
-                    bitsfromhere=fillbits
-                value |= (((nextbits >> (8-self.bitpos-bitsfromhere)) &
-                           (0xff >> (8-bitsfromhere))) <<
-                          (fillbits-bitsfromhere))
-                fillbits -= bitsfromhere
-                self.bitpos += bitsfromhere
-                if self.bitpos >=8:
-                    self.bitpos=0
-                    self.bytepos = self.bytepos+1
-            return value
+            self.dictlen = self.FIRST
+            self.bitspercode = 9
+            self.previous = None
 
         def decode(self):
-            """ algorithm derived from:
-            http://www.rasip.fer.hr/research/compress/algorithms/fund/lz/lzw.html
-            and the PDFReference
             """
-            cW = self.CLEARDICT;
-            baos=""
-            while True:
-                pW = cW;
-                cW = self.nextCode();
-                if cW == -1:
-                    raise PdfReadError("Missed the stop code in LZWDecode!")
-                if cW == self.STOP:
-                    break;
-                elif cW == self.CLEARDICT:
-                    self.resetDict();
-                elif pW == self.CLEARDICT:
-                    baos+=self.dict[cW]
+            :return: all of the decoded data
+            """
+            data = self.feed(self.data)
+            self.finish()
+            return data
+
+        def feed(self, data):
+            """
+            Decodes the next piece of the data.
+
+            :return: the data decoded from it, as bytes
+            """
+            if self.stopped:
+                # anything after the stop code is ignored
+                return b_("")
+            table = self.table
+            earlyChange = self.earlyChange
+            buffer = self.buffer
+            bits = self.bits
+            width = self.bitspercode
+            size = self.dictlen
+            previous = self.previous
+            clear = self.CLEARDICT
+            stop = self.STOP
+            maxCodes = self.MAX_CODES
+            output = bytearray()
+            # codes have at least 9 bits, so each byte completes at most one
+            for byte in bytearray(data):
+                buffer = (buffer << 8) | byte
+                bits += 8
+                if bits < width:
+                    continue
+                bits -= width
+                code = buffer >> bits
+                buffer &= (1 << bits) - 1
+                if code < clear or stop < code < size:
+                    entry = table[code]
+                    if previous is not None and size < maxCodes:
+                        table[size] = previous + entry[:1]
+                        size += 1
+                elif code == size and previous is not None:
+                    # the code which is being added: the previous entry and
+                    # its own first byte
+                    entry = previous + previous[:1]
+                    table[size] = entry
+                    size += 1
+                elif code == clear:
+                    size = self.FIRST
+                    width = 9
+                    previous = None
+                    continue
+                elif code == stop:
+                    self.stopped = True
+                    break
                 else:
-                    if cW < self.dictlen:
-                        baos += self.dict[cW]
-                        p=self.dict[pW]+self.dict[cW][0]
-                        self.dict[self.dictlen]=p
-                        self.dictlen+=1
-                    else:
-                        p=self.dict[pW]+self.dict[pW][0]
-                        baos+=p
-                        self.dict[self.dictlen] = p;
-                        self.dictlen+=1
-                    if (self.dictlen >= (1 << self.bitspercode) - 1 and
-                        self.bitspercode < 12):
-                        self.bitspercode+=1
-            return baos
+                    raise PdfReadError("Invalid code %d in LZWDecode" % code)
+                output += entry
+                previous = entry
+                if size + earlyChange >= 1 << width and width < 12:
+                    width += 1
+            self.buffer = buffer
+            self.bits = bits
+            self.bitspercode = width
+            self.dictlen = size
+            self.previous = previous
+            return bytes(output)
+
+        def finish(self):
+            """
+            Checks that all of the data has been decoded.
+            """
+            if not self.stopped:
+                raise PdfReadError("Missed the stop code in LZWDecode!")
 
     @staticmethod
-    def decode(data,decodeParams=None):
-        return LZWDecode.decoder(data).decode()
+    def decode(data, decodeParams=None):
+        data = LZWDecode.decoder(data, _getEarlyChange(decodeParams)).decode()
+        predictor = _getPredictor(decodeParams)
+        if predictor != 1:
+            data = undoPrediction(data, predictor, decodeParams.get("/Colors", 1),
+                                  decodeParams.get("/BitsPerComponent", 8), decodeParams.get("/Columns", 1))
+        return data
+
+
+def _getEarlyChange(decodeParms):
+    earlyChange = 1
+    if decodeParms:
+        try:
+            earlyChange = decodeParms.get("/EarlyChange", 1)
+        except AttributeError:
+            pass    # usually an array with a null object was read
+    return earlyChange
 
 
 class ASCII85Decode(object):
     def decode(data, decodeParms=None):
-        if version_info < ( 3, 0 ):
-            retval = ""
-            group = []
-            x = 0
-            hitEod = False
-            # remove all whitespace from data
-            data = [y for y in data if not (y in ' \n\r\t')]
-            while not hitEod:
-                c = data[x]
-                if len(retval) == 0 and c == "<" and data[x+1] == "~":
-                    x += 2
-                    continue
-                #elif c.isspace():
-                #    x += 1
-                #    continue
-                elif c == 'z':
-                    assert len(group) == 0
-                    retval += '\x00\x00\x00\x00'
-                    x += 1
-                    continue
-                elif c == "~" and data[x+1] == ">":
-                    if len(group) != 0:
-                        # cannot have a final group of just 1 char
-                        assert len(group) > 1
-                        cnt = len(group) - 1
-                        group += [ 85, 85, 85 ]
-                        hitEod = cnt
-                    else:
-                        break
-                else:
-                    c = ord(c) - 33
-                    assert c >= 0 and c < 85
-                    group += [ c ]
-                if len(group) >= 5:
-                    b = group[0] * (85**4) + \
-                        group[1] * (85**3) + \
-                        group[2] * (85**2) + \
-                        group[3] * 85 + \
-                        group[4]
-                    assert b < (2**32 - 1)
-                    c4 = chr((b >> 0) % 256)
-                    c3 = chr((b >> 8) % 256)
-                    c2 = chr((b >> 16) % 256)
-                    c1 = chr(b >> 24)
-                    retval += (c1 + c2 + c3 + c4)
-                    if hitEod:
-                        retval = retval[:-4+hitEod]
-                    group = []
-                x += 1
-            return retval
-        else:
-            if isinstance(data, str):
-                data = data.encode('ascii')
-            n = b = 0
-            out = bytearray()
-            for c in data:
-                if ord('!') <= c and c <= ord('u'):
-                    n += 1
-                    b = b*85+(c-33)
-                    if n == 5:
-                        out += struct.pack(b'>L',b)
-                        n = b = 0
-                elif c == ord('z'):
-                    assert n == 0
-                    out += b'\0\0\0\0'
-                elif c == ord('~'):
-                    if n:
-                        for _ in range(5-n):
-                            b = b*85+84
-                        out += struct.pack(b'>L',b)[:n-1]
-                    break
-            return bytes(out)
+        return b_("").join(_stageOutputs(_ASCII85Stage(), [_asBytes(data)]))
     decode = staticmethod(decode)
 
 
-def decodeStreamData(stream):
+def _asBytes(data):
+    if isinstance(data, memoryview):
+        return data.tobytes()
+    if not isinstance(data, (bytes_type, bytearray)):
+        return b_(data)
+    return data
+
+
+# the size of the pieces in which iterDecodedStreamData reads and decodes a
+# stream
+CHUNK_SIZE = 64 * 1024
+
+
+def decodeStreamData(stream, maxLength=None):
+    """
+    Decodes the data of a stream with each of its filters in turn.
+
+    :param int maxLength: the most bytes that the stream, or the output of
+        any of its filters, may decode to, or ``None`` for no limit. A
+        stream which decodes to more, e.g. a decompression bomb, raises a
+        :class:`PdfReadError<PyPDF2.utils.PdfReadError>` without being
+        decoded any further.
+    :return: the decoded data
+    """
+    data = stream._data
+    # If there is not data to decode we should not try to decode the data.
+    if not data:
+        return data.tobytes() if isinstance(data, memoryview) else data
+    # feed all of the data to the filters at once, since it is all kept
+    # anyway
+    return b_("").join(iterDecodedStreamData(stream, maxLength, None))
+
+
+def iterDecodedStreamData(stream, maxLength=None, chunkSize=CHUNK_SIZE):
+    """
+    Decodes the data of a stream a piece at a time. Each filter decodes the
+    output of the previous one as it is produced, so only a few pieces are
+    held in memory at once, whatever the size of the stream.
+
+    :param int maxLength: the most bytes that the stream, or the output of
+        any of its filters, may decode to; see :func:`decodeStreamData`.
+    :param int chunkSize: the size of the pieces of the stream which are
+        decoded in turn, and roughly the most that each filter produces at a
+        time. ``None`` feeds all of the data to the filters at once, though
+        Flate data is still decompressed ``CHUNK_SIZE`` bytes at a time, so
+        that ``maxLength`` is enforced before the output grows past it.
+    :return: a generator of the decoded data, as bytes.
+    """
+    data = stream._data
+    if not data:
+        return
+    stages = _makeStages(stream, chunkSize, maxLength)
+    if chunkSize is None:
+        chunks = [data]
+    else:
+        chunks = (data[start:start + chunkSize] for start in range(0, len(data), chunkSize))
+    for stage in stages:
+        chunks = _runStage(stage, chunks, maxLength)
+    for chunk in chunks:
+        # the data of memory-mapped files, if the stream has no filters
+        yield chunk.tobytes() if isinstance(chunk, memoryview) else chunk
+
+
+def _makeStages(stream, chunkSize, maxLength=None):
     from .generic import NameObject
     filters = stream.get("/Filter", ())
     if len(filters) and not isinstance(filters[0], NameObject):
         # we have a single filter instance
         filters = (filters,)
-    data = stream._data
-    # If there is not data to decode we should not try to decode the data.
-    if data:
-        for filterType in filters:
-            if filterType == "/FlateDecode" or filterType == "/Fl":
-                data = FlateDecode.decode(data, stream.get("/DecodeParms"))
-            elif filterType == "/ASCIIHexDecode" or filterType == "/AHx":
-                data = ASCIIHexDecode.decode(data)
-            elif filterType == "/LZWDecode" or filterType == "/LZW":
-                data = LZWDecode.decode(data, stream.get("/DecodeParms"))
-            elif filterType == "/ASCII85Decode" or filterType == "/A85":
-                data = ASCII85Decode.decode(data)
-            elif filterType == "/Crypt":
-                decodeParams = stream.get("/DecodeParams", {})
-                if "/Name" not in decodeParams and "/Type" not in decodeParams:
-                    pass
-                else:
-                    raise NotImplementedError("/Crypt filter with /Name or /Type not supported yet")
+    allDecodeParms = stream.get("/DecodeParms")
+    stages = []
+    for i, filterType in enumerate(filters):
+        decodeParms = allDecodeParms
+        if isinstance(decodeParms, list):
+            # the parameters of each filter, in order
+            decodeParms = decodeParms[i].getObject() if i < len(decodeParms) else None
+        if filterType == "/FlateDecode" or filterType == "/Fl":
+            # zlib can decompress a piece at a time
+            stages.append(_FlateStage(chunkSize, maxLength) if zlib else _WholeDataStage(decompress))
+            predictor = _getPredictor(decodeParms)
+            if predictor != 1:
+                stages.append(_PredictorStage(predictor, decodeParms))
+        elif filterType == "/ASCIIHexDecode" or filterType == "/AHx":
+            stages.append(_ASCIIHexStage())
+        elif filterType == "/LZWDecode" or filterType == "/LZW":
+            stages.append(_LZWStage(_getEarlyChange(decodeParms)))
+            predictor = _getPredictor(decodeParms)
+            if predictor != 1:
+                stages.append(_PredictorStage(predictor, decodeParms))
+        elif filterType == "/ASCII85Decode" or filterType == "/A85":
+            stages.append(_ASCII85Stage())
+        elif filterType == "/Crypt":
+            decodeParams = stream.get("/DecodeParams", {})
+            if "/Name" not in decodeParams and "/Type" not in decodeParams:
+                pass
             else:
-                # unsupported filter
-                raise NotImplementedError("unsupported filter %s" % filterType)
-    return data
+                raise NotImplementedError("/Crypt filter with /Name or /Type not supported yet")
+        else:
+            # unsupported filter
+            raise NotImplementedError("unsupported filter %s" % filterType)
+    return stages
+
+
+def _runStage(stage, chunks, maxLength):
+    """
+    Feeds each chunk of data to a filter, in turn.
+
+    :return: a generator of the output of the filter
+    """
+    length = 0
+    for output in _stageOutputs(stage, chunks):
+        length += len(output)
+        if maxLength is not None and length > maxLength:
+            raise PdfReadError("Stream decodes to more than %d bytes" % maxLength)
+        if output:
+            yield output
+
+
+def _stageOutputs(stage, chunks):
+    for chunk in chunks:
+        for output in stage.decode(chunk):
+            yield output
+    # only once all of the data has been fed to the filter
+    for output in stage.flush():
+        yield output
+
+
+def _getPredictor(decodeParms):
+    predictor = 1
+    if decodeParms:
+        try:
+            predictor = decodeParms.get("/Predictor", 1)
+        except AttributeError:
+            pass    # usually an array with a null object was read
+    return predictor
+
+
+class _FlateStage(object):
+    """
+    Decompresses data a chunk at a time, producing at most ``chunkSize``
+    bytes at once (``CHUNK_SIZE`` if it is ``None``), and raising a
+    :class:`PdfReadError<PyPDF2.utils.PdfReadError>` as soon as the output
+    grows past ``maxLength``, before any more of it is decompressed.
+    """
+    def __init__(self, chunkSize, maxLength=None):
+        self.decompressor = zlib.decompressobj()
+        self.chunkSize = chunkSize or CHUNK_SIZE
+        self.maxLength = maxLength
+        self.length = 0
+
+    def decode(self, data):
+        while True:
+            output = self.decompressor.decompress(data, self._limit())
+            self._count(output)
+            yield output
+            data = self.decompressor.unconsumed_tail
+            # a full piece of output may leave more output to come, even
+            # once all of the input has been consumed
+            if not data and len(output) < self._limit():
+                break
+
+    def flush(self):
+        output = self.decompressor.flush()
+        self._count(output)
+        yield output
+
+    def _limit(self):
+        if self.maxLength is None:
+            return self.chunkSize
+        # one byte more than is allowed shows that the stream is too long
+        return max(1, min(self.chunkSize, self.maxLength - self.length + 1))
+
+    def _count(self, output):
+        self.length += len(output)
+        if self.maxLength is not None and self.length > self.maxLength:
+            raise PdfReadError("Stream decodes to more than %d bytes" % self.maxLength)
+
+
+class _PredictorStage(object):
+    """
+    Reverses the predictor of a stream (see :func:`undoPrediction`) a number
+    of whole rows at a time.
+    """
+    def __init__(self, predictor, decodeParms):
+        self.predictor = predictor
+        self.colors = decodeParms.get("/Colors", 1)
+        self.bitsPerComponent = decodeParms.get("/BitsPerComponent", 8)
+        self.columns = decodeParms.get("/Columns", 1)
+        self.rowLength = (self.colors * self.bitsPerComponent * self.columns + 7) // 8
+        self.png = 10 <= predictor <= 15
+        # PNG rows start with the filter byte
+        self.stride = self.rowLength + 1 if self.png else self.rowLength
+        if self.stride <= 0 or not (self.png or predictor == 2):
+            # reports the error
+            undoPrediction(b_(""), predictor, self.colors, self.bitsPerComponent, self.columns)
+        self.pending = bytearray()
+        # the last decoded row, which PNG filters refer to
+        self.previousRow = None
+
+    def decode(self, data):
+        self.pending += data
+        end = len(self.pending) - len(self.pending) % self.stride
+        if end:
+            rows = self.pending[:end]
+            del self.pending[:end]
+            yield self._undo(rows)
+
+    def flush(self):
+        if self.pending:
+            yield self._undo(self.pending)
+
+    def _undo(self, rows):
+        if self.png and self.previousRow is not None:
+            # decode the rows after the previous row, which is unfiltered
+            rows = b_("\x00") + self.previousRow + rows
+            output = undoPrediction(rows, self.predictor, self.colors, self.bitsPerComponent, self.columns)
+            output = output[self.rowLength:]
+        else:
+            output = undoPrediction(rows, self.predictor, self.colors, self.bitsPerComponent, self.columns)
+        self.previousRow = output[-self.rowLength:]
+        return output
+
+
+class _LZWStage(object):
+    """
+    Decodes LZW data a piece at a time.
+    """
+    # LZW expands data by up to a few thousand times, so the input is
+    # decoded in small pieces
+    FEED_SIZE = 4096
+
+    def __init__(self, earlyChange):
+        self.decoder = LZWDecode.decoder(earlyChange=earlyChange)
+
+    def decode(self, data):
+        for start in range(0, len(data), self.FEED_SIZE):
+            yield self.decoder.feed(data[start:start + self.FEED_SIZE])
+
+    def flush(self):
+        self.decoder.finish()
+        return ()
+
+
+# the white-space characters of PDF (PDF spec table 1), and vertical tab
+_WHITESPACE = b_(" \t\n\r\x0b\x0c\x00")
+
+# every byte but the digits of ASCII85 ("!" to "u"), "z" and the "~" of the
+# end-of-data marker, which are ignored
+_ASCII85_IGNORED = bytes(bytearray(c for c in range(256) if not (33 <= c <= 117 or c in (122, 126))))
+
+# maps each digit of ASCII85 to its value
+_ASCII85_VALUES = bytes(bytearray((c - 33) % 256 for c in range(256)))
+
+
+class _ASCIIHexStage(object):
+    """
+    Decodes hexadecimal data a piece at a time, up to the ``>`` which ends
+    it.
+    """
+    def __init__(self):
+        self.pending = b_("")   # an odd digit at the end of the last piece
+        self.ended = False
+
+    def decode(self, data):
+        if self.ended:
+            # anything after the end of the data is ignored
+            return
+        data = _asBytes(data)
+        end = data.find(b_(">"))
+        if end != -1:
+            data = data[:end]
+            self.ended = True
+        digits = self.pending + data.translate(None, _WHITESPACE)
+        split = len(digits) - len(digits) % 2
+        self.pending = digits[split:]
+        yield _unhexlify(digits[:split])
+
+    def flush(self):
+        if self.pending:
+            # a final odd digit is followed by a 0 (PDF spec section 7.4.2)
+            yield _unhexlify(self.pending + b_("0"))
+
+
+def _unhexlify(digits):
+    try:
+        return binascii.unhexlify(digits)
+    except (TypeError, ValueError):
+        # binascii.Error is a TypeError on Python 2
+        raise PdfReadError("Invalid hexadecimal digits in ASCIIHexDecode")
+
+
+class _ASCII85Stage(object):
+    """
+    Decodes ASCII85 data a piece at a time, in groups of five digits, up to
+    the ``~>`` which ends it.
+    """
+    def __init__(self):
+        self.pending = b_("")   # the digits of an incomplete group
+        self.started = False    # whether an opening <~ has been looked for
+        self.ended = False
+
+    def decode(self, data):
+        if self.ended:
+            return
+        digits = self.pending + _asBytes(data).translate(None, _ASCII85_IGNORED)
+        if not self.started:
+            if len(digits) < 2 and b_("<~").startswith(digits):
+                # this may yet be the opening <~
+                self.pending = digits
+                return
+            if digits.startswith(b_("<~")):
+                digits = digits[2:]
+            self.started = True
+        end = digits.find(b_("~"))
+        if end != -1:
+            digits = digits[:end]
+            self.ended = True
+        # the pending digits never contain a z, which is expanded here,
+        # before the digits of an incomplete group are held back
+        digits = _expandAscii85Zeros(digits)
+        split = len(digits) - len(digits) % 5
+        self.pending = digits[split:]
+        yield _decodeAscii85Groups(digits[:split])
+
+    def flush(self):
+        digits = self.pending
+        if not self.started and digits.startswith(b_("<")):
+            digits = b_("")
+        if len(digits) > 1:
+            # a final partial group of n digits is padded with "u" and
+            # decodes to n - 1 bytes
+            yield _decodeAscii85Groups(digits + b_("u") * (5 - len(digits)))[:len(digits) - 1]
+
+
+def _expandAscii85Zeros(digits):
+    """
+    :param digits: ASCII85 digits, starting at the start of a group
+    :return: the digits, with each ``z`` replaced by the group of zeros it
+        is short for
+    """
+    if b_("z") not in digits:
+        return digits
+    parts = digits.split(b_("z"))
+    length = 0
+    for part in parts[:-1]:
+        length += len(part)
+        # z is only short for a group where a group starts
+        if length % 5:
+            raise PdfReadError("Invalid z in ASCII85Decode")
+    return b_("!!!!!").join(parts)
+
+
+def _decodeAscii85Groups(digits):
+    """
+    :param digits: groups of five ASCII85 digits
+    :return: four bytes for each group
+    """
+    values = bytearray(digits.translate(_ASCII85_VALUES))
+    try:
+        return struct.pack(">%dL" % (len(values) // 5), *[
+            (((a * 85 + b) * 85 + c) * 85 + d) * 85 + e
+            for a, b, c, d, e in zip(values[0::5], values[1::5], values[2::5], values[3::5], values[4::5])])
+    except struct.error:
+        raise PdfReadError("Invalid group in ASCII85Decode")
+
+
+class _WholeDataStage(object):
+    """
+    A filter which can only decode all of its input at once.
+    """
+    def __init__(self, decode):
+        self.decodeAll = decode
+        self.pieces = []
+
+    def decode(self, data):
+        # the other filters need a copy of the data of memory-mapped files
+        self.pieces.append(data.tobytes() if isinstance(data, memoryview) else data)
+        return ()
+
+    def flush(self):
+        yield self.decodeAll(b_("").join(self.pieces))
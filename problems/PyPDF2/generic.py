@@ -608,7 +608,8 @@ class DictionaryObject(dict, PdfObject):
                 t = stream.tell()
                 length = pdf.getObject(length)
                 stream.seek(t, 0)
-            data["__streamdata__"] = stream.read(length)
+            dataOffset = stream.tell()
+            data["__streamdata__"] = utils.readBytes(stream, length)
             if debug: print("here")
             #if debug: print(binascii.hexlify(data["__streamdata__"]))
             e = readNonWhitespace(stream)
@@ -633,7 +634,13 @@ class DictionaryObject(dict, PdfObject):
         else:
             stream.seek(pos, 0)
         if "__streamdata__" in data:
-            return StreamObject.initializeFromDictionary(data)
+            dataLength = len(data["__streamdata__"])
+            retval = StreamObject.initializeFromDictionary(data)
+            if isinstance(retval, EncodedStreamObject):
+                retval.maxDecodedLength = getattr(pdf, "maxStreamLength", None)
+                retval.streamCache = getattr(pdf, "streamCache", None)
+                retval._source = (stream, dataOffset, dataLength)
+            return retval
         else:
             retval = DictionaryObject()
             retval.update(data)
@@ -820,17 +827,73 @@ class StreamObject(DictionaryObject):
 
 class DecodedStreamObject(StreamObject):
     def getData(self):
+        if isinstance(self._data, memoryview):
+            # the data of a memory-mapped file is copied when it is first used
+            self._data = self._data.tobytes()
         return self._data
 
     def setData(self, data):
         self._data = data
 
+    def iterData(self, chunkSize=filters.CHUNK_SIZE):
+        """
+        :return: a generator of the data of the stream, in pieces of at most
+            ``chunkSize`` bytes.
+        """
+        data = self._data
+        for start in range(0, len(data), chunkSize):
+            chunk = data[start:start + chunkSize]
+            yield chunk.tobytes() if isinstance(chunk, memoryview) else chunk
+
 
 class EncodedStreamObject(StreamObject):
+    # the most bytes that the stream may decode to, or None for no limit
+    maxDecodedLength = None
+    # the cache.StreamCache of the reader which read the stream, which keeps
+    # the decoded data in place of decodedSelf, or None
+    streamCache = None
+
     def __init__(self):
         self.decodedSelf = None
+        self._encodedData = None
+        # the file, offset and length of the encoded data, from which it is
+        # read again if it has been dropped
+        self._source = None
+
+    def _getEncodedData(self):
+        data = self._encodedData
+        if data is None and self._source is not None:
+            stream, offset, length = self._source
+            position = stream.tell()
+            stream.seek(offset, 0)
+            data = utils.readBytes(stream, length)
+            stream.seek(position, 0)
+        return data
+
+    def _setEncodedData(self, data):
+        self._encodedData = data
+        # e.g. decrypted data, which is not the data in the file
+        self._source = None
+
+    _data = property(_getEncodedData, _setEncodedData)
+
+    def _dropEncodedData(self):
+        """
+        Drops the encoded data if it can be read from the file again, and
+        is not already a view of a memory-mapped file.
+        """
+        if self._source is not None and not isinstance(self._encodedData, memoryview):
+            self._encodedData = None
 
     def getData(self):
+        cache = self.streamCache
+        if cache is not None:
+            data = cache.get(self)
+            if data is None:
+                data = filters.decodeStreamData(self, self.maxDecodedLength)
+                if cache.put(self, data) and cache.dropEncoded:
+                    self._dropEncodedData()
+            return data
         if self.decodedSelf:
             # cached version of decoded object
             return self.decodedSelf.getData()
@@ -838,13 +901,29 @@ class EncodedStreamObject(StreamObject):
             # create decoded object
             decoded = DecodedStreamObject()
 
-            decoded._data = filters.decodeStreamData(self)
+            decoded._data = filters.decodeStreamData(self, self.maxDecodedLength)
             for key, value in list(self.items()):
                 if not key in ("/Length", "/Filter", "/DecodeParms"):
                     decoded[key] = value
             self.decodedSelf = decoded
             return decoded._data
 
+    def iterData(self, chunkSize=filters.CHUNK_SIZE):
+        """
+        Decodes the stream a piece at a time, without keeping the decoded
+        data, unless it has already been decoded by :meth:`getData`.
+
+        :return: a generator of the decoded data of the stream, in pieces of
+            roughly ``chunkSize`` bytes.
+        """
+        if self.streamCache is not None:
+            data = self.streamCache.get(self)
+            if data is not None:
+                return (data[start:start + chunkSize] for start in range(0, len(data), chunkSize))
+        elif self.decodedSelf is not None:
+            return self.decodedSelf.iterData(chunkSize)
+        return filters.iterDecodedStreamData(self, self.maxDecodedLength, chunkSize)
+
     def setData(self, data):
         raise utils.PdfReadError("Creating EncodedStreamObject is not currently supported")
 
@@ -42,6 +42,9 @@ __author_email__ = "biziqe@mathieu.fenniak.net"
 __maintainer__ = "Phaseit, Inc."
 __maintainer_email = "PyPDF2@phaseit.net"
 
+import array
+import bisect
+import re
 import string
 import math
 import struct
@@ -65,6 +68,8 @@ import codecs
 from .generic import *
 from .utils import readNonWhitespace, readUntilWhitespace, ConvertFunctionsToVirtualList
 from .utils import isString, b_, u_, ord_, chr_, str_, formatWarning
+from .xref import XrefTable, XrefView, ObjectStreamView, TYPECODE as XREF_TYPECODE
+from .cache import ObjectCache
 
 if version_info < ( 2, 4 ):
    from sets import ImmutableSet as frozenset
@@ -1057,8 +1062,34 @@ class PdfFileReader(object):
     :param bool overwriteWarnings: Determines whether to override Python's
         ``warnings.py`` module with a custom implementation (defaults to
         ``True``).
+    :param bool useMmap: Map the file into memory instead of reading it, if
+        ``stream`` is a path or a file object with a file descriptor. The
+        file is then tokenized in place, and stream data is handed out
+        without copying until it is decoded. Defaults to ``False``.
+    :param int maxCachedObjects: The number of resolved objects to keep, the
+        least recently used being evicted and read again when needed.
+        Defaults to ``None``, which keeps every object.
+    :param int maxCachedBytes: The approximate size in bytes of the resolved
+        objects to keep, including their decoded stream data. Defaults to
+        ``None`` for no limit. See :class:`ObjectCache<cache.ObjectCache>`.
+    :param bool eagerObjectStreams: Read every object of a compressed object
+        stream (PDF 1.5) in one pass when the first of them is needed,
+        instead of one at a time. Faster when most of the objects of a
+        file are used, e.g. to walk or copy it. Defaults to ``False``.
+    :param int maxStreamLength: The most bytes that any one stream may
+        decode to. A stream which decodes to more, e.g. a decompression
+        bomb in an untrusted file, raises a
+        :class:`PdfReadError<PyPDF2.utils.PdfReadError>` when it is read.
+        Defaults to ``None`` for no limit.
+    :param streamCache: A :class:`StreamCache<cache.StreamCache>` to keep
+        the decoded data of the streams of the file in, which can limit its
+        size and drop encoded data once it has been decoded. Defaults to
+        ``None``, which keeps the decoded data of each stream on the stream
+        for as long as the stream is kept.
     """
-    def __init__(self, stream, strict=True, warndest = None, overwriteWarnings = True):
+    def __init__(self, stream, strict=True, warndest = None, overwriteWarnings = True, useMmap = False,
+                 maxCachedObjects = None, maxCachedBytes = None, eagerObjectStreams = False,
+                 maxStreamLength = None, streamCache = None):
         if overwriteWarnings:
             # have to dynamically override the default showwarning since there are no
             # public methods that specify the 'file' parameter
@@ -1072,12 +1103,22 @@ class PdfFileReader(object):
             warnings.showwarning = _showwarning
         self.strict = strict
         self.flattenedPages = None
-        self.resolvedObjects = {}
+        self._pageObjects = {}  # page number to page, for pages found by _findPage
+        self._lastPageTreeNode = None
+        self._numPages = None   # the /Count of the page tree
+        self.resolvedObjects = ObjectCache(maxCachedObjects, maxCachedBytes)
+        self._objectStreamIndexes = {}  # object stream number to its parsed header
+        self._lastObjectStream = None   # (number, decoded data) of the last object stream read
+        self.eagerObjectStreams = eagerObjectStreams
+        self.maxStreamLength = maxStreamLength
+        self.streamCache = streamCache
         self.xrefIndex = 0
         self._pageId2Num = None # map page IndirectRef number to Page Number
         if hasattr(stream, 'mode') and 'b' not in stream.mode:
             warnings.warn("PdfFileReader stream/file object is not in binary mode. It may not be read correctly.", utils.PdfReadWarning)
-        if isString(stream):
+        if useMmap and (isString(stream) or self._hasFileno(stream)):
+            stream = utils.mapFile(stream)
+        elif isString(stream):
             fileobj = open(stream, 'rb')
             stream = BytesIO(b_(fileobj.read()))
             fileobj.close()
@@ -1086,6 +1127,14 @@ class PdfFileReader(object):
 
         self._override_encryption = False
 
+    def _hasFileno(self, stream):
+        try:
+            stream.fileno()
+            return True
+        except (AttributeError, IOError, OSError, ValueError):
+            # e.g. a BytesIO, which raises io.UnsupportedOperation
+            return False
+
     def getDocumentInfo(self):
         """
         Retrieves the PDF file's document information dictionary, if it exists.
@@ -1152,6 +1201,16 @@ class PdfFileReader(object):
                 self._override_encryption = False
         else:
             if self.flattenedPages == None:
+                if self._numPages is None:
+                    root = self._getPageTreeRoot()
+                    count = root.get("/Count")
+                    # the /Count of the root is trusted once it matches
+                    # the /Count entries of its kids
+                    if isinstance(count, int) and count >= 0 and \
+                            self._getPageTreeIndex(root, {}, count) is not None:
+                        self._numPages = count
+                if self._numPages is not None:
+                    return self._numPages
                 self._flatten()
             return len(self.flattenedPages)
 
@@ -1173,9 +1232,81 @@ class PdfFileReader(object):
         ## ensure that we're not trying to access an encrypted PDF
         #assert not self.trailer.has_key("/Encrypt")
         if self.flattenedPages == None:
-            self._flatten()
+            numPages = self.getNumPages()
+            if self.flattenedPages == None:
+                if pageNumber < 0:
+                    pageNumber += numPages
+                if not 0 <= pageNumber < numPages:
+                    raise IndexError("list index out of range")
+                if pageNumber not in self._pageObjects:
+                    page = self._findPage(pageNumber)
+                    if page is None:
+                        # getNumPages now counts the pages of the whole tree
+                        self._flattenInconsistentTree()
+                        return self.flattenedPages[pageNumber]
+                    self._pageObjects[pageNumber] = page
+                return self._pageObjects[pageNumber]
         return self.flattenedPages[pageNumber]
 
+    def iterPages(self, release=False, start=0, stop=None):
+        """
+        Iterates over the pages of this PDF file in order.
+
+        :param bool release: Once the next page is requested, forget the
+            previous page, along with its content streams and their decoded
+            data, so that going through a document takes the same memory
+            whatever its length. A page which has been released is read
+            again from the file if it is needed later. Defaults to ``False``.
+        :param int start: The number of the first page. Defaults to ``0``.
+        :param int stop: The number of the page after the last one, or
+            ``None`` (the default) for the end of the document.
+        :return: a generator of :class:`PageObject<pdf.PageObject>` instances.
+        """
+        numPages = self.getNumPages()
+        pageNumber = start
+        while pageNumber < (numPages if stop is None else min(stop, numPages)):
+            page = self.getPage(pageNumber)
+            if self.flattenedPages is not None:
+                # the whole tree has been read, as its /Count entries were
+                # wrong, and may have a different number of pages
+                numPages = len(self.flattenedPages)
+            yield page
+            if release:
+                self._releasePage(pageNumber, page)
+            pageNumber += 1
+
+    def iterPageText(self, release=False, start=0, stop=None):
+        """
+        Iterates over the text of the pages of this PDF file in order, as
+        extracted by :meth:`extractText()<PageObject.extractText>`.
+
+        :param bool release: Forget each page once its text has been
+            extracted; see :meth:`iterPages()<PdfFileReader.iterPages>`.
+            Defaults to ``False``.
+        :param int start: The number of the first page. Defaults to ``0``.
+        :param int stop: The number of the page after the last one, or
+            ``None`` (the default) for the end of the document.
+        :return: a generator of strings.
+        """
+        for page in self.iterPages(release, start, stop):
+            yield page.extractText()
+
+    def _releasePage(self, pageNumber, page):
+        self._pageObjects.pop(pageNumber, None)
+        # the page dictionary, and its content streams, which are either
+        # referenced directly or by an array of references
+        references = [page.indirectRef]
+        contents = page.raw_get("/Contents") if "/Contents" in page else None
+        if isinstance(contents, IndirectObject):
+            references.append(contents)
+            key = (contents.generation, contents.idnum)
+            contents = self.resolvedObjects[key] if key in self.resolvedObjects else None
+        if isinstance(contents, ArrayObject):
+            references.extend(contents)
+        for reference in references:
+            if isinstance(reference, IndirectObject):
+                self.resolvedObjects.pop((reference.generation, reference.idnum), None)
+
     namedDestinations = property(lambda self:
                                   self.getNamedDestinations(), None, None)
     """
@@ -1493,17 +1624,130 @@ class PdfFileReader(object):
     """Read-only property accessing the
     :meth:`getPageMode()<PdfFileReader.getPageMode>` method."""
 
+    def _getPageTreeRoot(self):
+        catalog = self.trailer["/Root"].getObject()
+        return catalog["/Pages"].getObject()
+
+    def _findPage(self, pageNumber):
+        """
+        Finds a page without reading the whole page tree, by descending from
+        the root through the nodes whose ``/Count`` covers the page. The
+        page inherits the attributes of its ancestors.
+
+        :return: a :class:`PageObject<pdf.PageObject>`, or ``None`` if the
+            ``/Count`` entries do not match the tree.
+        """
+        first, count, node, index = self._lastPageTreeNode or (0, 0, None, None)
+        if not first <= pageNumber < first + count:
+            # start from the root, unless the page is under the node the last
+            # page was found in, as it is when the pages are read in order
+            first, count, node = 0, self._numPages, self._getPageTreeRoot()
+            index = self._getPageTreeIndex(node, {}, count)
+        visited = {}    # id to node, holding the nodes so that their ids are not reused
+        while index is not None and id(node) not in visited:
+            visited[id(node)] = node
+            kidRef, kidFirst, kidCount, isPage = self._findPageTreeKid(index, pageNumber - first)
+            if kidRef is None:
+                return None
+            inherit = index[4]
+            if isPage:
+                self._lastPageTreeNode = (first, count, node, index)
+                return self._makePageObject(kidRef.getObject(), inherit,
+                                            kidRef if isinstance(kidRef, IndirectObject) else None)
+            first += kidFirst
+            count = kidCount
+            node = kidRef.getObject()
+            index = self._getPageTreeIndex(node, inherit, count)
+        # the /Count entries are wrong, or the tree has a cycle
+        return None
+
+    def _getPageTreeIndex(self, node, parentInherit, count):
+        """
+        The index of the kids of a page tree node, kept on the node: a tuple
+        of (the number of the first page under each kid, the number of pages
+        under it, ``True`` if it is a page, the ``/Kids`` array, the
+        attributes the node's pages inherit).
+
+        :param int count: the number of pages under the node, according to
+            the ``/Count`` of the node (or of the root)
+        :return: the index, or ``None`` if the ``/Count`` entries of the
+            kids do not add up to ``count``.
+        """
+        if not hasattr(node, '_pageTreeIndex'):
+            inherit = dict(parentInherit)
+            for attr in self._inheritablePageAttributes:
+                if attr in node:
+                    inherit[attr] = node[attr]
+            kids = node["/Kids"] if "/Kids" in node else ()
+            starts, counts, isPages = [], [], []
+            total = 0
+            for kid in kids:
+                kid = kid.getObject()
+                t = kid["/Type"] if "/Type" in kid else ("/Pages" if "/Kids" in kid else "/Page")
+                if t == "/Pages":
+                    kidCount = kid["/Count"] if "/Count" in kid else None
+                    if not isinstance(kidCount, int) or kidCount < 0:
+                        return None
+                else:
+                    # nodes which are neither pages nor page tree nodes are skipped
+                    kidCount = 1 if t == "/Page" else 0
+                starts.append(total)
+                counts.append(kidCount)
+                isPages.append(t == "/Page")
+                total += kidCount
+            node._pageTreeIndex = (starts, counts, isPages, kids, inherit)
+        starts, counts = node._pageTreeIndex[:2]
+        if (starts[-1] + counts[-1] if starts else 0) != count:
+            return None
+        return node._pageTreeIndex
+
+    def _findPageTreeKid(self, index, pageNumber):
+        """
+        Finds the kid of a page tree node which holds one of its pages, by
+        binary search.
+
+        :return: a tuple of (the kid, the number of its first page and its
+            number of pages within the node, ``True`` if the kid is the page
+            itself), or of ``None`` if the node has no such page.
+        """
+        starts, counts, isPages, kids = index[:4]
+        i = bisect.bisect_right(starts, pageNumber) - 1
+        # kids without pages have the same start as the kid after them
+        while i >= 0 and counts[i] == 0:
+            i -= 1
+        if i < 0 or pageNumber >= starts[i] + counts[i]:
+            return None, None, None, None
+        return kids[i], starts[i], counts[i], isPages[i]
+
+    def _flattenInconsistentTree(self):
+        warnings.warn("The /Count entries of the page tree are inconsistent; reading the whole tree",
+                      utils.PdfReadWarning)
+        self._flatten()
+        self._pageObjects = {}
+        self._lastPageTreeNode = None
+
+    def _makePageObject(self, page, inherit, indirectRef):
+        for attr, value in list(inherit.items()):
+            # if the page has it's own value, it does not inherit the
+            # parent's value:
+            if attr not in page:
+                page[attr] = value
+        pageObj = PageObject(self, indirectRef)
+        pageObj.update(page)
+        return pageObj
+
+    _inheritablePageAttributes = (
+        NameObject("/Resources"), NameObject("/MediaBox"),
+        NameObject("/CropBox"), NameObject("/Rotate")
+        )
+
     def _flatten(self, pages=None, inherit=None, indirectRef=None):
-        inheritablePageAttributes = (
-            NameObject("/Resources"), NameObject("/MediaBox"),
-            NameObject("/CropBox"), NameObject("/Rotate")
-            )
+        inheritablePageAttributes = self._inheritablePageAttributes
         if inherit == None:
             inherit = dict()
         if pages == None:
             self.flattenedPages = []
-            catalog = self.trailer["/Root"].getObject()
-            pages = catalog["/Pages"].getObject()
+            pages = self._getPageTreeRoot()
 
         t = "/Pages"
         if "/Type" in pages:
@@ -1519,64 +1763,25 @@ class PdfFileReader(object):
                     addt["indirectRef"] = page
                 self._flatten(page.getObject(), inherit, **addt)
         elif t == "/Page":
-            for attr, value in list(inherit.items()):
-                # if the page has it's own value, it does not inherit the
-                # parent's value:
-                if attr not in pages:
-                    pages[attr] = value
-            pageObj = PageObject(self, indirectRef)
-            pageObj.update(pages)
-            self.flattenedPages.append(pageObj)
+            self.flattenedPages.append(self._makePageObject(pages, inherit, indirectRef))
 
     def _getObjectFromStream(self, indirectReference):
         # indirect reference to object in object stream
-        # read the entire object stream into memory
         debug = False
-        stmnum, idx = self.xref_objStm[indirectReference.idnum]
+        stmnum, idx = self._xrefTable.getCompressed(indirectReference.idnum)
         if debug: print(("Here1: %s %s"%(stmnum, idx)))
-        objStm = IndirectObject(stmnum, 0, self).getObject()
-        if debug: print(("Here2: objStm=%s.. stmnum=%s data=%s"%(objStm, stmnum, objStm.getData())))
-        # This is an xref to a stream, so its type better be a stream
-        assert objStm['/Type'] == '/ObjStm'
+        firstRead = stmnum not in self._objectStreamIndexes
+        positions, n, first, streamData = self._getObjectStreamIndex(stmnum)
         # /N is the number of indirect objects in the stream
-        assert idx < objStm['/N']
-        streamData = BytesIO(b_(objStm.getData()))
-        for i in range(objStm['/N']):
-            readNonWhitespace(streamData)
-            streamData.seek(-1, 1)
-            objnum = NumberObject.readFromStream(streamData)
-            readNonWhitespace(streamData)
-            streamData.seek(-1, 1)
-            offset = NumberObject.readFromStream(streamData)
-            readNonWhitespace(streamData)
-            streamData.seek(-1, 1)
-            if objnum != indirectReference.idnum:
-                # We're only interested in one object
-                continue
+        assert idx < n
+        if firstRead and self.eagerObjectStreams:
+            # the requested object is read below, and cached by getObject
+            self._readObjectStream(stmnum, first, positions, streamData, indirectReference.idnum)
+        if indirectReference.idnum in positions:
+            i, offset = positions[indirectReference.idnum]
             if self.strict and idx != i:
                 raise utils.PdfReadError("Object is in wrong index.")
-            streamData.seek(objStm['/First']+offset, 0)
-            if debug:
-                pos = streamData.tell()
-                streamData.seek(0, 0)
-                lines = streamData.readlines()
-                for i in range(0, len(lines)):
-                    print((lines[i]))
-                streamData.seek(pos, 0)
-            try:
-                obj = readObject(streamData, self)
-            except utils.PdfStreamError as e:
-                # Stream object cannot be read. Normally, a critical error, but
-                # Adobe Reader doesn't complain, so continue (in strict mode?)
-                e = sys.exc_info()[1]
-                warnings.warn("Invalid stream (index %d) within object %d %d: %s" % \
-                      (i, indirectReference.idnum, indirectReference.generation, e), utils.PdfReadWarning)
-
-                if self.strict:
-                    raise utils.PdfReadError("Can't read object stream: %s"%e)
-                # Replace with null. Hopefully it's nothing important.
-                obj = NullObject()
-            return obj
+            return self._readObjectFromStream(first, streamData, offset, i, indirectReference.idnum)
 
         if self.strict: raise utils.PdfReadError("This is a fatal error in strict mode.")
         return NullObject()
@@ -1588,12 +1793,11 @@ class PdfFileReader(object):
                                                 indirectReference.idnum)
         if retval != None:
             return retval
+        start = self._xrefTable.getOffset(indirectReference.idnum, indirectReference.generation)
         if indirectReference.generation == 0 and \
-                        indirectReference.idnum in self.xref_objStm:
+                        self._xrefTable.getCompressed(indirectReference.idnum) is not None:
             retval = self._getObjectFromStream(indirectReference)
-        elif indirectReference.generation in self.xref and \
-                indirectReference.idnum in self.xref[indirectReference.generation]:
-            start = self.xref[indirectReference.generation][indirectReference.idnum]
+        elif start is not None:
             if debug: print(("  Uncompressed Object", indirectReference.idnum, indirectReference.generation, ":", start))
             self.stream.seek(start, 0)
             idnum, generation = self.readObjectHeader(self.stream)
@@ -1633,6 +1837,66 @@ class PdfFileReader(object):
                     indirectReference.idnum, retval)
         return retval
 
+    def _getObjectStreamIndex(self, stmnum):
+        """
+        Parses the header of an object stream, once. The header is kept by
+        the reader, keyed by the number of the stream, so that it is not
+        parsed again when the stream is evicted from a bounded cache. The
+        decoded data of the last object stream read is kept as well, since
+        the objects of a stream tend to be read together; the data of any
+        other stream is decoded again.
+
+        :return: a tuple of (a dict of the number of each object in the
+            stream to its (index, offset), the number of objects in the
+            stream, the offset of its first object, a stream of the decoded
+            data)
+        """
+        if self._lastObjectStream is not None and self._lastObjectStream[0] == stmnum:
+            return self._objectStreamIndexes[stmnum] + (self._lastObjectStream[1],)
+        objStm = IndirectObject(stmnum, 0, self).getObject()
+        # This is an xref to a stream, so its type better be a stream
+        assert objStm['/Type'] == '/ObjStm'
+        data = b_(objStm.getData())
+        if stmnum not in self._objectStreamIndexes:
+            n = objStm['/N']
+            # the header is N pairs of integers: object number, offset
+            numbers = [int(token) for token in data[:objStm['/First']].split()[:2 * n]]
+            positions = {}
+            for i in range(len(numbers) // 2):
+                # only the first of any duplicate object numbers is read
+                positions.setdefault(numbers[2 * i], (i, numbers[2 * i + 1]))
+            self._objectStreamIndexes[stmnum] = (positions, n, objStm['/First'])
+        self._lastObjectStream = (stmnum, BytesIO(data))
+        return self._objectStreamIndexes[stmnum] + (self._lastObjectStream[1],)
+
+    def _readObjectFromStream(self, first, streamData, offset, i, idnum):
+        streamData.seek(first+offset, 0)
+        try:
+            return readObject(streamData, self)
+        except utils.PdfStreamError as e:
+            # Stream object cannot be read. Normally, a critical error, but
+            # Adobe Reader doesn't complain, so continue (in strict mode?)
+            e = sys.exc_info()[1]
+            warnings.warn("Invalid stream (index %d) within object %d %d: %s" % \
+                  (i, idnum, 0, e), utils.PdfReadWarning)
+
+            if self.strict:
+                raise utils.PdfReadError("Can't read object stream: %s"%e)
+            # Replace with null. Hopefully it's nothing important.
+            return NullObject()
+
+    def _readObjectStream(self, stmnum, first, positions, streamData, skip):
+        """
+        Reads the objects of an object stream in one pass, and caches the
+        ones which the cross-reference index locates in this stream, except
+        for object number ``skip``.
+        """
+        for idnum, (i, offset) in sorted(positions.items(), key=lambda item: item[1]):
+            if idnum == skip or self._xrefTable.getCompressed(idnum) != (stmnum, i) or \
+                    (0, idnum) in self.resolvedObjects:
+                continue
+            self.cacheIndirectObject(0, idnum, self._readObjectFromStream(first, streamData, offset, i, idnum))
+
     def _decryptObject(self, obj, key):
         if isinstance(obj, ByteStringObject) or isinstance(obj, TextStringObject):
             obj = createStringObject(utils.RC4_encrypt(key, obj.original_bytes))
@@ -1673,6 +1937,32 @@ class PdfFileReader(object):
         elif debug: print(("cache miss: %d %d"%(idnum, generation)))
         return out
 
+    def getCacheStats(self):
+        """
+        Retrieves the counters of the cache of resolved objects.
+
+        :return: a dict of the number of cache ``hits``, ``misses`` and
+            ``evictions``, and the number of ``objects`` cached and their
+            approximate size in ``bytes`` (``None`` unless
+            ``maxCachedBytes`` is set).
+        :rtype: dict
+        """
+        return self.resolvedObjects.stats()
+
+    def getStreamCacheStats(self):
+        """
+        Retrieves the counters of the cache of decoded stream data.
+
+        :return: a dict of the number of cache ``hits``, ``misses`` and
+            ``evictions``, the number of ``streams`` whose data is cached,
+            its size in ``bytes`` and the largest size it has had,
+            ``peakBytes``, or ``None`` if the reader has no ``streamCache``.
+        :rtype: dict
+        """
+        if self.streamCache is None:
+            return None
+        return self.streamCache.stats()
+
     def cacheIndirectObject(self, generation, idnum, obj):
         # return None # Sometimes we want to turn off cache for debugging.
         if (generation, idnum) in self.resolvedObjects:
@@ -1713,8 +2003,7 @@ class PdfFileReader(object):
                 raise utils.PdfReadError("startxref not found")
 
         # read all cross reference tables and their trailers
-        self.xref = {}
-        self.xref_objStm = {}
+        self._xrefTable = XrefTable()
         self.trailer = DictionaryObject()
         while True:
             # load the xref table
@@ -1742,43 +2031,11 @@ class PdfFileReader(object):
                     size = readObject(stream, self)
                     readNonWhitespace(stream)
                     stream.seek(-1, 1)
-                    cnt = 0
-                    while cnt < size:
-                        line = stream.read(20)
-
-                        # It's very clear in section 3.4.3 of the PDF spec
-                        # that all cross-reference table lines are a fixed
-                        # 20 bytes (as of PDF 1.7). However, some files have
-                        # 21-byte entries (or more) due to the use of \r\n
-                        # (CRLF) EOL's. Detect that case, and adjust the line
-                        # until it does not begin with a \r (CR) or \n (LF).
-                        while line[0] in b_("\x0D\x0A"):
-                            stream.seek(-20 + 1, 1)
-                            line = stream.read(20)
-
-                        # On the other hand, some malformed PDF files
-                        # use a single character EOL without a preceeding
-                        # space.  Detect that case, and seek the stream
-                        # back one character.  (0-9 means we've bled into
-                        # the next xref entry, t means we've bled into the
-                        # text "trailer"):
-                        if line[-1] in b_("0123456789t"):
-                            stream.seek(-1, 1)
-
-                        offset, generation = line[:16].split(b_(" "))
-                        offset, generation = int(offset), int(generation)
-                        if generation not in self.xref:
-                            self.xref[generation] = {}
-                        if num in self.xref[generation]:
-                            # It really seems like we should allow the last
-                            # xref table in the file to override previous
-                            # ones. Since we read the file backwards, assume
-                            # any existing key is already set correctly.
-                            pass
-                        else:
-                            self.xref[generation][num] = offset
-                        cnt += 1
-                        num += 1
+                    # It really seems like we should allow the last xref
+                    # table in the file to override previous ones. Since we
+                    # read the file backwards, existing entries are kept.
+                    offsets, generations = _readXrefTableEntries(stream, size)
+                    self._xrefTable.addTableEntries(num, offsets, generations)
                     readNonWhitespace(stream)
                     stream.seek(-1, 1)
                     trailertag = stream.read(7)
@@ -1804,7 +2061,6 @@ class PdfFileReader(object):
                 xrefstream = readObject(stream, self)
                 assert xrefstream["/Type"] == "/XRef"
                 self.cacheIndirectObject(generation, idnum, xrefstream)
-                streamData = BytesIO(b_(xrefstream.getData()))
                 # Index pairs specify the subsections in the dictionary. If
                 # none create one subsection that spans everything.
                 idx_pairs = xrefstream.get("/Index", [0, xrefstream.get("/Size")])
@@ -1814,59 +2070,20 @@ class PdfFileReader(object):
                 if self.strict and len(entrySizes) > 3:
                     raise utils.PdfReadError("Too many entry sizes: %s" %entrySizes)
 
-                def getEntry(i):
-                    # Reads the correct number of bytes for each entry. See the
-                    # discussion of the W parameter in PDF spec table 17.
-                    if entrySizes[i] > 0:
-                        d = streamData.read(entrySizes[i])
-                        return convertToInt(d, entrySizes[i])
-
-                    # PDF Spec Table 17: A value of zero for an element in the
-                    # W array indicates...the default value shall be used
-                    if i == 0:  return 1 # First value defaults to 1
-                    else:       return 0
-
-                def used_before(num, generation):
-                    # We move backwards through the xrefs, don't replace any.
-                    return num in self.xref.get(generation, []) or \
-                            num in self.xref_objStm
-
-                # Iterate through each subsection
+                # The subsections must increase
+                subsections = list(self._pairs(idx_pairs))
                 last_end = 0
-                for start, size in self._pairs(idx_pairs):
-                    # The subsections must increase
+                for start, size in subsections:
                     assert start >= last_end
                     last_end = start + size
-                    for num in range(start, start+size):
-                        # The first entry is the type
-                        xref_type = getEntry(0)
-                        # The rest of the elements depend on the xref_type
-                        if xref_type == 0:
-                            # linked list of free objects
-                            next_free_object = getEntry(1)
-                            next_generation = getEntry(2)
-                        elif xref_type == 1:
-                            # objects that are in use but are not compressed
-                            byte_offset = getEntry(1)
-                            generation = getEntry(2)
-                            if generation not in self.xref:
-                                self.xref[generation] = {}
-                            if not used_before(num, generation):
-                                self.xref[generation][num] = byte_offset
-                                if debug: print(("XREF Uncompressed: %s %s"%(
-                                                num, generation)))
-                        elif xref_type == 2:
-                            # compressed objects
-                            objstr_num = getEntry(1)
-                            obstr_idx = getEntry(2)
-                            generation = 0 # PDF spec table 18, generation is 0
-                            if not used_before(num, generation):
-                                if debug: print(("XREF Compressed: %s %s %s"%(
-                                        num, objstr_num, obstr_idx)))
-                                self.xref_objStm[num] = (objstr_num, obstr_idx)
-                        elif self.strict:
-                            raise utils.PdfReadError("Unknown xref type: %s"%
-                                                        xref_type)
+                nums = [num for start, size in subsections for num in range(start, start+size)]
+
+                # Decode every entry of every subsection at once, one column
+                # (type, field 1, field 2) at a time. We move backwards
+                # through the xrefs, so existing entries are not replaced.
+                xref_types, fields1, fields2 = _readXrefStreamColumns(
+                        xrefstream.getData(), entrySizes, len(nums))
+                self._xrefTable.addStreamEntries(nums, xref_types, fields1, fields2, self.strict)
 
                 trailerKeys = "/Root", "/Encrypt", "/Info", "/ID"
                 for key in trailerKeys:
@@ -1902,10 +2119,10 @@ class PdfFileReader(object):
         #if not zero-indexed, verify that the table is correct; change it if necessary
         if self.xrefIndex and not self.strict:
             loc = stream.tell()
-            for gen in self.xref:
+            for gen in self._xrefTable.generations():
                 if gen == 65535: continue
-                for id in self.xref[gen]:
-                    stream.seek(self.xref[gen][id], 0)
+                for id in self._xrefTable.objectNumbers(gen):
+                    stream.seek(self._xrefTable.getOffset(id, gen), 0)
                     try:
                         pid, pgen = self.readObjectHeader(stream)
                     except ValueError:
@@ -1919,6 +2136,21 @@ class PdfFileReader(object):
     def _zeroXref(self, generation):
         self.xref[generation] = dict( (k-self.xrefIndex, v) for (k, v) in list(self.xref[generation].items()) )
 
+    xref = property(lambda self: XrefView(self._xrefTable), None, None)
+    """
+    Read-only property giving the byte offset of each uncompressed object, as
+    a dict of generation to dict of object number to offset. This is a view
+    of the compact table the reader keeps internally.
+    """
+
+    xref_objStm = property(lambda self: ObjectStreamView(self._xrefTable), None, None)
+    """
+    Read-only property giving the location of each compressed object, as a
+    dict of object number to a tuple of (object stream number, index within
+    the stream). This is a view of the compact table the reader keeps
+    internally.
+    """
+
     def _pairs(self, array):
         i = 0
         while True:
@@ -2589,36 +2821,41 @@ class PageObject(DictionaryObject):
 
         :return: a unicode string object.
         """
-        text = u_("")
+        text = []
         content = self["/Contents"].getObject()
         if not isinstance(content, ContentStream):
-            content = ContentStream(content, self.pdf)
+            content = ContentStream(content, self.pdf, textOnly=True)
         # Note: we check all strings are TextStringObjects.  ByteStringObjects
         # are strings where the byte->string encoding was unknown, so adding
         # them to the text here would be gibberish.
-        for operands, operator in content.operations:
-            if operator == b_("Tj"):
+        operations = content.rawOperations
+        if operations is None:
+            operations = content.operations
+        showText, nextLineShowText, nextLineSpacingShowText, showTextArray, nextLine = \
+            b_("Tj"), b_("'"), b_('"'), b_("TJ"), b_("T*")
+        for operands, operator in operations:
+            if operator == showText:
                 _text = operands[0]
                 if isinstance(_text, TextStringObject):
-                    text += _text
-            elif operator == b_("T*"):
-                text += "\n"
-            elif operator == b_("'"):
-                text += "\n"
+                    text.append(_text)
+            elif operator == nextLine:
+                text.append("\n")
+            elif operator == nextLineShowText:
+                text.append("\n")
                 _text = operands[0]
                 if isinstance(_text, TextStringObject):
-                    text += operands[0]
-            elif operator == b_('"'):
+                    text.append(_text)
+            elif operator == nextLineSpacingShowText:
                 _text = operands[2]
                 if isinstance(_text, TextStringObject):
-                    text += "\n"
-                    text += _text
-            elif operator == b_("TJ"):
+                    text.append("\n")
+                    text.append(_text)
+            elif operator == showTextArray:
                 for i in operands[0]:
                     if isinstance(i, TextStringObject):
-                        text += i
-                text += "\n"
-        return text
+                        text.append(i)
+                text.append("\n")
+        return u_("").join(text)
 
     mediaBox = createRectangleAccessor("/MediaBox", ())
     """
@@ -2657,10 +2894,70 @@ class PageObject(DictionaryObject):
     """
 
 
+def _isPlainNumber(data, start, stop):
+    # like readObject, a number which starts an indirect reference within the
+    # next 20 bytes is read as one, and a number at the end of the stream is
+    # an error
+    return stop < len(data) and (data[start:start + 1] in NumberSigns or
+                                 not IndirectPattern.match(data, start, start + 20))
+
+
 class ContentStream(DecodedStreamObject):
-    def __init__(self, stream, pdf):
+    """
+    The operations of a content stream, as a list of (operands, operator).
+
+    The stream is tokenized in a single pass over its bytes. Numbers and
+    names, which make up most operands, are kept as the bytes they were read
+    from, and arrays of them as lists, until :attr:`operations` is first
+    used, when they are converted into PDF objects. Errors in such operands
+    are only raised then.
+
+    Until then, ``rawOperations`` holds the operations as they were read,
+    with the operands of each in a tuple; it is ``None`` afterwards, since
+    the operations may have been changed.
+    """
+    # the whitespace before a token, followed by a name, an operator, a
+    # literal string without escapes or nested parentheses, a comment, a
+    # number or the start of an array. Any other token (dictionaries,
+    # hexadecimal strings and other literal strings) is left to readObject.
+    tokenPattern = re.compile(b_(r"[ \n\r\t\x00]*(?:(/[^\s()<>\[\]{}/%]*)|([A-Za-z'\"][^\s()<>\[\]{}/%]*)|"
+                                 r"\(([^()\\]*)\)|(%[^\r\n]*)|([+,\-.0-9]+)|(\[))?"))
+    # the whitespace before an element of an array, as skipped by
+    # ArrayObject.readFromStream, followed by a name, a literal string
+    # without escapes or nested parentheses, a number, or the start or end
+    # of an array
+    arrayTokenPattern = re.compile(b_(r"[ \t\n\r\x0b\x0c]*(?:(/[^\s()<>\[\]{}/%]*)|\(([^()\\]*)\)|"
+                                      r"([+,\-.0-9]+)|(\[)|(\]))?"))
+
+    # the operators which show text, which are all extractText looks at
+    textOperators = frozenset(b_(operator) for operator in ("Tj", "TJ", "'", '"', "T*"))
+    # a run of whitespace, comments, and whole operations whose operands are
+    # numbers and names and whose operator is not BT (begin text), BI (begin
+    # inline image) or one which shows text, which text-only parsing skips
+    # over between text objects. No token can be split into two, so that an
+    # operation which is only partly matched is given back quickly, and in
+    # one piece. Anything else, e.g. the "R" of an indirect reference, ends
+    # the run, and is read as usual.
+    nonTextPattern = re.compile(b_(r"(?:[ \n\r\t\x00]+|%[^\r\n]*|"
+                                   r"(?:(?:[+,\-.0-9]+(?![+,\-.0-9])|/[^\s()<>\[\]{}/%]*(?![^\s()<>\[\]{}/%]))"
+                                   r"[ \n\r\t\x00]*)*"
+                                   r"(?!(?:B[TI]|T[jJ*]|['\"])(?:[\s()<>\[\]{}/%]|$)|R(?![a-zA-Z]))"
+                                   r"[A-Za-z'\"][^\s()<>\[\]{}/%]*(?![^\s()<>\[\]{}/%]))*"))
+    # the end of the data of an inline image: "EI", whitespace, then "Q"
+    inlineImageEndPattern = re.compile(b_(r"EI[ \n\r\t\x00]+(?=Q)"))
+
+    def __init__(self, stream, pdf, textOnly=False):
+        """
+        :param stream: a stream, or an array of streams to be joined
+        :param pdf: the reader of the stream
+        :param bool textOnly: only keep the operations which show text,
+            without converting the operands of any other operation, and
+            skip over the operations outside text objects (``BT`` ...
+            ``ET``) which cannot show text, e.g. for extracting the text of a
+            page. Defaults to ``False``.
+        """
         self.pdf = pdf
-        self.operations = []
+        self._operations = None
         # stream may be a StreamObject or an ArrayObject containing
         # multiple StreamObjects to be cat'd together.
         stream = stream.getObject()
@@ -2668,45 +2965,158 @@ class ContentStream(DecodedStreamObject):
             data = b_("")
             for s in stream:
                 data += s.getObject().getData()
-            stream = BytesIO(b_(data))
         else:
-            stream = BytesIO(b_(stream.getData()))
-        self.__parseContentStream(stream)
+            data = stream.getData()
+        self.rawOperations = self.__parseContentStream(b_(data), textOnly)
 
-    def __parseContentStream(self, stream):
-        # file("f:\\tmp.txt", "w").write(stream.read())
-        stream.seek(0, 0)
+    def __parseContentStream(self, data, textOnly=False):
+        operations = []
         operands = []
+        match = self.tokenPattern.match
+        beginImage = b_("BI")
+        beginText = b_("BT")
+        endText = b_("ET")
+        textOperators = self.textOperators
+        # whether every operation is read, which in text-only mode is only
+        # within text objects
+        inText = not textOnly
+        end = len(data)
+        pos = 0
+        stream = None
+        skip = self.nonTextPattern.match
         while True:
-            peek = readNonWhitespace(stream)
-            if peek == b_('') or ord_(peek) == 0:
-                break
-            stream.seek(-1, 1)
-            if peek.isalpha() or peek == b_("'") or peek == b_('"'):
-                operator = utils.readUntilRegex(stream,
-                        NameObject.delimiterPattern, True)
-                if operator == b_("BI"):
-                    # begin inline image - a completely different parsing
-                    # mechanism is required, of course... thanks buddy...
-                    assert operands == []
-                    ii = self._readInlineImage(stream)
-                    self.operations.append((ii, b_("INLINE IMAGE")))
-                else:
-                    self.operations.append((operands, operator))
+            if not inText and not operands:
+                # skip to the next operation which may show text
+                pos = skip(data, pos).end()
+            m = match(data, pos)
+            kind = m.lastindex
+            pos = m.end()
+            if kind == 1:
+                # name
+                operands.append(m.group(1))
+                continue
+            elif kind == 2:
+                operator = m.group(2)
+                if operator != beginImage:
+                    if not textOnly:
+                        operations.append((tuple(operands), operator))
+                    elif operator == beginText:
+                        inText = True
+                    elif operator == endText:
+                        inText = False
+                    elif operator in textOperators:
+                        operations.append((tuple(operands), operator))
                     operands = []
-            elif peek == b_('%'):
-                # If we encounter a comment in the content stream, we have to
-                # handle it here.  Typically, readObject will handle
-                # encountering a comment -- but readObject assumes that
-                # following the comment must be the object we're trying to
-                # read.  In this case, it could be an operator instead.
-                while peek not in (b_('\r'), b_('\n')):
-                    peek = stream.read(1)
+                    continue
+                # begin inline image - a completely different parsing
+                # mechanism is required, of course... thanks buddy...
+                assert operands == []
+                if stream is None:
+                    stream = BytesIO(data)
+                stream.seek(pos)
+                ii = self._readInlineImage(stream, data)
+                if not textOnly:
+                    operations.append((ii, b_("INLINE IMAGE")))
+                pos = stream.tell()
+                continue
+            elif kind == 3:
+                operands.append(createStringObject(m.group(3)))
+                continue
+            elif kind == 4:
+                # comment
+                continue
+            elif kind == 5:
+                if _isPlainNumber(data, m.start(5), pos):
+                    operands.append(m.group(5))
+                    continue
+                pos = m.start(5)
+            elif kind == 6:
+                array = self._readArray(data, pos)
+                if array is not None:
+                    operands.append(array[0])
+                    pos = array[1]
+                    continue
+                # read the whole array again with readObject
+                pos = m.start(6)
+            elif pos == end:
+                break
+            if stream is None:
+                stream = BytesIO(data)
+            stream.seek(pos)
+            operands.append(readObject(stream, None))
+            pos = stream.tell()
+        return operations
+
+    def _readArray(self, data, pos):
+        """
+        Reads the elements of an array which are names, numbers, simple
+        literal strings or arrays, with names and numbers kept as bytes.
+
+        :return: a tuple of (a list of the elements, the position after the
+            array), or ``None`` if the array contains anything else.
+        """
+        elements = []
+        match = self.arrayTokenPattern.match
+        while True:
+            m = match(data, pos)
+            kind = m.lastindex
+            pos = m.end()
+            if kind == 1:
+                elements.append(m.group(1))
+            elif kind == 2:
+                elements.append(createStringObject(m.group(2)))
+            elif kind == 3 and _isPlainNumber(data, m.start(3), pos):
+                elements.append(m.group(3))
+            elif kind == 4:
+                array = self._readArray(data, pos)
+                if array is None:
+                    return None
+                elements.append(array[0])
+                pos = array[1]
+            elif kind == 5:
+                return elements, pos
             else:
-                operands.append(readObject(stream, None))
+                return None
+
+    def _buildOperand(self, operand):
+        if type(operand) is list:
+            return ArrayObject([self._buildOperand(element) for element in operand])
+        if type(operand) is not utils.bytes_type:
+            return operand
+        if operand[:1] == NameObject.surfix:
+            try:
+                return NameObject(operand.decode('utf-8'))
+            except (UnicodeEncodeError, UnicodeDecodeError):
+                return readObject(BytesIO(operand), None)
+        elif NumberObject.ByteDot in operand:
+            return FloatObject(operand)
+        else:
+            return NumberObject(operand)
 
-    def _readInlineImage(self, stream):
-        # begin reading just after the "BI" - begin image
+    def _buildOperations(self, operations):
+        inlineImage = b_("INLINE IMAGE")
+        return [(operands if operator == inlineImage else [self._buildOperand(operand) for operand in operands],
+                 operator) for operands, operator in operations]
+
+    def _getOperations(self):
+        if self._operations is None:
+            self._operations = self._buildOperations(self.rawOperations)
+            self.rawOperations = None
+        return self._operations
+
+    def _setOperations(self, operations):
+        self._operations = operations
+        self.rawOperations = None
+
+    operations = property(_getOperations, _setOperations)
+    """
+    The list of (operands, operator) of the stream, with every operand a PDF
+    object. It may be changed to change the stream.
+    """
+
+    def _readInlineImage(self, stream, data):
+        # begin reading just after the "BI" - begin image, where stream is a
+        # BytesIO of data
         # first read the dictionary of settings.
         settings = DictionaryObject()
         while True:
@@ -2723,35 +3133,15 @@ class ContentStream(DecodedStreamObject):
         # left at beginning of ID
         tmp = stream.read(3)
         assert tmp[:2] == b_("ID")
-        data = b_("")
-        while True:
-            # Read the inline image, while checking for EI (End Image) operator.
-            tok = stream.read(1)
-            if tok == b_("E"):
-                # Check for End Image
-                tok2 = stream.read(1)
-                if tok2 == b_("I"):
-                    # Data can contain EI, so check for the Q operator.
-                    tok3 = stream.read(1)
-                    info = tok + tok2
-                    # We need to find whitespace between EI and Q.
-                    has_q_whitespace = False
-                    while tok3 in utils.WHITESPACES:
-                        has_q_whitespace = True
-                        info += tok3
-                        tok3 = stream.read(1)
-                    if tok3 == b_("Q") and has_q_whitespace:
-                        stream.seek(-1, 1)
-                        break
-                    else:
-                        stream.seek(-1,1)
-                        data += info
-                else:
-                    stream.seek(-1, 1)
-                    data += tok
-            else:
-                data += tok
-        return {"settings": settings, "data": data}
+        # Data can contain EI, so the end of the image is EI (End Image)
+        # followed by whitespace and the Q operator, which is left to be read
+        # next.
+        start = stream.tell()
+        m = self.inlineImageEndPattern.search(data, start)
+        if m is None:
+            raise utils.PdfStreamError("Stream has ended unexpectedly")
+        stream.seek(m.end())
+        return {"settings": settings, "data": data[start:m.start()]}
 
     def _getData(self):
         newdata = BytesIO()
@@ -2773,7 +3163,11 @@ class ContentStream(DecodedStreamObject):
         return newdata.getvalue()
 
     def _setData(self, value):
-        self.__parseContentStream(BytesIO(b_(value)))
+        operations = self.__parseContentStream(b_(value))
+        if self.rawOperations is not None:
+            self.rawOperations.extend(operations)
+        else:
+            self._operations.extend(self._buildOperations(operations))
 
     _data = property(_getData, _setData)
 
@@ -2842,6 +3236,145 @@ class DocumentInformation(DictionaryObject):
     """The "raw" version of producer; can return a ``ByteStringObject``."""
 
 
+# A cross-reference table entry: a 10 digit offset and a 5 digit generation,
+# followed by the entry type. Entries should be exactly 20 bytes, but some
+# files use CRLF (or longer) line endings, or single character EOLs without a
+# preceding space, so any whitespace is allowed around each entry.
+XREF_ENTRY_RE = re.compile(b_(r"[\x00\t\n\x0c\r ]*(\d{10}) (\d{5})(?: ?[fn])?"))
+# An entry of exactly 20 bytes, as in most files
+XREF_STANDARD_ENTRY_RE = re.compile(b_(r"(\d{10}) (\d{5}) [fn](?: \n| \r|\r\n)"))
+# The number of standard entries matched at once, which bounds the memory
+# used by the matches
+XREF_CHUNK_SIZE = 4096
+
+
+def _readXrefTableEntries(stream, size):
+    """
+    Reads one subsection of a cross-reference table from a single buffer,
+    leaving the stream just after its last entry.
+
+    :param stream: the stream, positioned at the first entry
+    :param int size: the number of entries in the subsection
+    :return: a tuple of two arrays: the offset and the generation of each
+        entry
+    """
+    start = stream.tell()
+    # leave room for CRLF line endings
+    data = stream.read(size * 21 + 2)
+    offsets = array.array(XREF_TYPECODE)
+    generations = array.array(XREF_TYPECODE)
+    # while the entries are the standard 20 bytes, find them a chunk at a
+    # time: matches are 20 bytes long, so a chunk of ``n`` entries is complete
+    # if ``n`` are found
+    done = 0
+    while done < size:
+        count = min(XREF_CHUNK_SIZE, size - done)
+        found = XREF_STANDARD_ENTRY_RE.findall(data, done * 20, (done + count) * 20)
+        if len(found) != count:
+            break
+        offsets.extend([int(offset) for offset, generation in found])
+        generations.extend([int(generation) for offset, generation in found])
+        done += count
+    # any remaining entries are matched one by one
+    match = XREF_ENTRY_RE.match
+    pos = done * 20
+    while done < size:
+        m = match(data, pos)
+        if m is None or m.end() == len(data):
+            # the entry may continue past the end of the buffer
+            more = stream.read((size - done) * 21 + 32)
+            if more:
+                data += more
+                continue
+            if m is None:
+                raise utils.PdfReadError("xref table read error")
+        offsets.append(int(m.group(1)))
+        generations.append(int(m.group(2)))
+        pos = m.end()
+        done += 1
+    stream.seek(start + pos, 0)
+    return offsets, generations
+
+
+def _arrayTypecode(itemsize):
+    # Finds the typecode of unsigned array items of the given size, if any
+    for typecode in ("B", "H", "I", "L", "Q"):
+        try:
+            if array.array(typecode).itemsize == itemsize:
+                return typecode
+        except ValueError:
+            # "Q" is not available before Python 3.3
+            pass
+    return None
+
+_UNSIGNED_TYPECODES = dict((size, _arrayTypecode(size)) for size in (1, 2, 4, 8))
+
+
+def _unpackColumn(data, offset, width, stride, count):
+    """
+    Unpacks the big-endian unsigned integers of one column of a table of
+    fixed width rows, such as the entries of a cross-reference stream.
+
+    :param data: the rows, as bytes
+    :param int offset: the offset of the column within a row
+    :param int width: the width of the column in bytes (1-8)
+    :param int stride: the width of a row in bytes
+    :param int count: the number of rows
+    :return: a sequence of ``count`` integers
+    """
+    column = data[offset:offset + stride * count]
+    if width == 1:
+        return bytearray(column[::stride])
+    itemsize = min(size for size in (2, 4, 8) if size >= width)
+    typecode = _UNSIGNED_TYPECODES[itemsize]
+    if typecode is None:
+        return [convertToInt(column[i:i + width], width)
+                for i in range(0, stride * count, stride)]
+    # copy each byte of the column into a buffer of zero padded items,
+    # then reinterpret the buffer as an array of integers
+    padded = bytearray(itemsize * count)
+    for byte in range(width):
+        padded[itemsize - width + byte::itemsize] = column[byte::stride]
+    values = array.array(typecode)
+    if hasattr(values, "frombytes"):
+        values.frombytes(bytes(padded))
+    else:
+        values.fromstring(bytes(padded))
+    if sys.byteorder == "little":
+        values.byteswap()
+    return values
+
+
+def _readXrefStreamColumns(data, entrySizes, count):
+    """
+    Decodes the entries of a cross-reference stream in bulk.
+
+    :param data: the decoded data of the stream
+    :param entrySizes: the ``/W`` array of the stream
+    :param int count: the number of entries
+    :return: a tuple of three sequences of ``count`` integers: the types of
+        the entries and their second and third fields
+    """
+    stride = sum(entrySizes)
+    if len(data) < stride * count:
+        # a truncated stream reads as zeros
+        data = data + b_("\x00") * (stride * count - len(data))
+    columns = []
+    offset = 0
+    for i in range(3):
+        width = entrySizes[i]
+        if width > 8:
+            raise utils.PdfReadError("invalid size in convertToInt")
+        if width > 0:
+            columns.append(_unpackColumn(data, offset, width, stride, count))
+        else:
+            # PDF Spec Table 17: A value of zero for an element in the
+            # W array indicates...the default value shall be used
+            columns.append([1 if i == 0 else 0] * count)
+        offset += width
+    return tuple(columns)
+
+
 def convertToInt(d, size):
     if size > 8:
         raise utils.PdfReadError("invalid size in convertToInt")
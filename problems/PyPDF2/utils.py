@@ -32,7 +32,10 @@ __author__ = "Mathieu Fenniak"
 __author_email__ = "biziqe@mathieu.fenniak.net"
 
 
+import mmap
+import re
 import sys
+from io import BytesIO
 
 try:
     import __builtin__ as builtins
@@ -75,6 +78,19 @@ def readUntilWhitespace(stream, maxchars=None):
     Reads non-whitespace characters and returns them.
     Stops upon encountering whitespace or when maxchars is reached.
     """
+    if isinstance(stream, mmap.mmap):
+        pos = stream.tell()
+        end = len(stream)
+        if maxchars:
+            end = min(end, pos + maxchars)
+        m = _NON_SPACE_RE.match(stream, pos, end)
+        txt = stream[pos:m.end()]
+        if (maxchars and len(txt) == maxchars) or m.end() == len(stream):
+            _mmapSeek(stream, m.end())
+        else:
+            # skip the whitespace, as a read would
+            _mmapSeek(stream, m.end() + 1)
+        return txt
     txt = b_("")
     while True:
         tok = stream.read(1)
@@ -110,6 +126,11 @@ def skipOverWhitespace(stream):
 
 
 def skipOverComment(stream):
+    if isinstance(stream, mmap.mmap):
+        pos = stream.tell()
+        if stream[pos:pos + 1] == b_('%'):
+            _mmapSeek(stream, _COMMENT_RE.match(stream, pos).end())
+        return
     tok = stream.read(1)
     stream.seek(-1, 1)
     if tok == b_('%'):
@@ -123,6 +144,17 @@ def readUntilRegex(stream, regex, ignore_eof=False):
     Raise PdfStreamError on premature end-of-file.
     :param bool ignore_eof: If true, ignore end-of-line and return immediately
     """
+    if isinstance(stream, mmap.mmap):
+        pos = stream.tell()
+        m = regex.search(stream, pos)
+        if m is None:
+            if not ignore_eof:
+                raise PdfStreamError("Stream has ended unexpectedly")
+            end = len(stream)
+        else:
+            end = m.start()
+        _mmapSeek(stream, end)
+        return stream[pos:end]
     name = b_('')
     while True:
         tok = stream.read(16)
@@ -141,6 +173,60 @@ def readUntilRegex(stream, regex, ignore_eof=False):
     return name
 
 
+class MappedFile(mmap.mmap):
+    """
+    A read-only memory map of a file, for :class:`PdfFileReader<pdf.PdfFileReader>`.
+    It is read like the file itself, and the tokenizing functions above
+    search it in place instead of reading it a byte at a time.
+    """
+    def seek(self, offset, whence=0):
+        try:
+            _mmapSeek(self, offset, whence)
+        except ValueError:
+            # as in a BytesIO, seeking past the end is allowed, and reads
+            # nothing, and relative seeks stop at the start
+            if whence == 0 and offset < 0:
+                raise
+            if whence == 1:
+                offset += self.tell()
+            elif whence == 2:
+                offset += len(self)
+            _mmapSeek(self, max(0, min(offset, len(self))))
+
+
+def mapFile(fileobj):
+    """
+    Maps a file into memory for reading.
+
+    :param fileobj: the path of the file, or a file object opened in binary
+        mode.
+    :return: a :class:`MappedFile`. Empty files cannot be mapped, and are
+        returned as a ``BytesIO``.
+    """
+    if isString(fileobj):
+        with open(fileobj, 'rb') as f:
+            return mapFile(f)
+    fileobj.seek(0, 2)
+    if fileobj.tell() == 0:
+        return BytesIO()
+    # the map keeps its own handle, so the file can be closed afterwards
+    return MappedFile(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def readBytes(stream, length):
+    """
+    Reads up to ``length`` bytes. From a memory-mapped file they are returned
+    as a ``memoryview`` of the map instead of a copy, where the Python version
+    supports it.
+    """
+    if _MEMORYVIEW_MMAP and isinstance(stream, mmap.mmap) and length >= 0:
+        pos = stream.tell()
+        end = min(pos + length, len(stream))
+        _mmapSeek(stream, end)
+        return memoryview(stream)[pos:end]
+    return stream.read(length)
+
+
 class ConvertFunctionsToVirtualList(object):
     def __init__(self, lengthFunction, getFunction):
         self.lengthFunction = lengthFunction
@@ -293,3 +379,12 @@ def hexStr(num):
 
 
 WHITESPACES = [b_(x) for x in [' ', '\n', '\r', '\t', '\x00']]
+
+# patterns used to tokenize memory-mapped files in place
+_NON_SPACE_RE = re.compile(b_('[^ \t\n\r\x0b\x0c]*'))
+_COMMENT_RE = re.compile(b_('%[^\n\r]*[\n\r]?'))
+
+_mmapSeek = mmap.mmap.seek
+
+# Python 2 cannot make memoryviews of memory maps
+_MEMORYVIEW_MMAP = sys.version_info[0] >= 3
@@ -0,0 +1,354 @@
+"""
+Compact index of the objects in a PDF file, as read from its cross-reference
+tables and streams.
+
+Large documents have hundreds of thousands of objects, so rather than a dict
+per generation the index keeps typed arrays indexed by object number. Almost
+every object has generation 0; the few that do not are kept in a small
+overflow dict. :class:`XrefView` and :class:`ObjectStreamView` present the
+index through the dict-of-dicts API that ``PdfFileReader.xref`` and
+``PdfFileReader.xref_objStm`` have always had.
+"""
+
+import array
+import itertools
+
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:  # Py2
+    from collections import Mapping, MutableMapping
+
+from .utils import PdfReadError
+
+
+def _signedTypecode():
+    # "q" is not available before Python 3.3; "l" is 64 bits on most Unix
+    # platforms there
+    try:
+        array.array("q")
+        return "q"
+    except ValueError:
+        return "l"
+
+TYPECODE = _signedTypecode()
+
+# marks an empty slot in the arrays
+ABSENT = -1
+
+# the arrays only grow to this many objects (24MB in all), so that a malformed
+# object number cannot exhaust memory; objects with higher numbers are kept in
+# dicts
+DENSE_LIMIT = 1 << 20
+
+
+class XrefTable(object):
+    """
+    The location of every object in a PDF file.
+
+    For each object number ``num``:
+
+    * ``offsets[num]`` is the byte offset of the object with generation 0,
+    * ``streamNumbers[num]`` and ``streamIndexes[num]`` are the object stream
+      holding the object, and its index within that stream, if the object is
+      compressed,
+
+    or ``ABSENT``. Objects with other generations, or numbers beyond
+    ``DENSE_LIMIT``, are kept in ``overflow``, a dict of generation to dict
+    of object number to byte offset, and ``sparseCompressed``, a dict of
+    object number to (object stream number, index).
+    """
+    def __init__(self):
+        self.offsets = array.array(TYPECODE)
+        self.streamNumbers = array.array(TYPECODE)
+        self.streamIndexes = array.array(TYPECODE)
+        self.overflow = {}
+        self.sparseCompressed = {}
+
+    def reserve(self, size):
+        """
+        Grows the arrays to hold at least ``size`` objects, up to
+        ``DENSE_LIMIT``.
+        """
+        missing = min(size, DENSE_LIMIT) - len(self.offsets)
+        if missing > 0:
+            filler = array.array(TYPECODE, [ABSENT]) * missing
+            self.offsets.extend(filler)
+            self.streamNumbers.extend(filler)
+            self.streamIndexes.extend(filler)
+
+    def _grow(self, num):
+        # grow geometrically, as table sizes are only known after the entries
+        self.reserve(max(num + 1, 2 * len(self.offsets)))
+
+    def getOffset(self, num, generation):
+        """
+        :return: the byte offset of an uncompressed object, or ``None`` if
+            it is not in the table.
+        """
+        if generation == 0 and 0 <= num < len(self.offsets):
+            offset = self.offsets[num]
+            return None if offset == ABSENT else offset
+        return self.overflow.get(generation, {}).get(num)
+
+    def setOffset(self, num, generation, offset):
+        if generation == 0 and 0 <= num < DENSE_LIMIT:
+            if num >= len(self.offsets):
+                self._grow(num)
+            self.offsets[num] = offset
+        else:
+            self.overflow.setdefault(generation, {})[num] = offset
+
+    def removeOffset(self, num, generation):
+        if self.getOffset(num, generation) is None:
+            raise KeyError(num)
+        if generation == 0 and 0 <= num < len(self.offsets):
+            self.offsets[num] = ABSENT
+        else:
+            del self.overflow[generation][num]
+
+    def getCompressed(self, num):
+        """
+        :return: a tuple of (object stream number, index within the stream)
+            for a compressed object, or ``None`` if it is not in the table.
+        """
+        if 0 <= num < len(self.streamNumbers):
+            stmnum = self.streamNumbers[num]
+            if stmnum == ABSENT:
+                return None
+            return stmnum, self.streamIndexes[num]
+        return self.sparseCompressed.get(num)
+
+    def setCompressed(self, num, stmnum, idx):
+        if 0 <= num < DENSE_LIMIT:
+            if num >= len(self.streamNumbers):
+                self._grow(num)
+            self.streamNumbers[num] = stmnum
+            self.streamIndexes[num] = idx
+        else:
+            self.sparseCompressed[num] = (stmnum, idx)
+
+    def removeCompressed(self, num):
+        if self.getCompressed(num) is None:
+            raise KeyError(num)
+        if 0 <= num < len(self.streamNumbers):
+            self.streamNumbers[num] = ABSENT
+            self.streamIndexes[num] = ABSENT
+        else:
+            del self.sparseCompressed[num]
+
+    def isUsed(self, num, generation):
+        """
+        :return: ``True`` if an earlier (i.e. more recent) cross-reference
+            section has already located the object.
+        """
+        return self.getOffset(num, generation) is not None or \
+            self.getCompressed(num) is not None
+
+    def addTableEntries(self, first, entryOffsets, entryGenerations):
+        """
+        Adds the entries of one subsection of a cross-reference table. Objects
+        which are already in the table are not replaced, since the sections
+        are read from the most recent backwards.
+
+        :param int first: the number of the first object in the subsection
+        :param entryOffsets: the byte offset of each entry
+        :param entryGenerations: the generation of each entry
+        """
+        if entryOffsets:
+            self.reserve(first + len(entryOffsets))
+        offsets = self.offsets
+        dense = len(offsets)
+        num = first
+        for offset, generation in zip(entryOffsets, entryGenerations):
+            if generation == 0 and 0 <= num < dense:
+                if offsets[num] == ABSENT:
+                    offsets[num] = offset
+            elif self.getOffset(num, generation) is None:
+                self.setOffset(num, generation, offset)
+            num += 1
+
+    def addStreamEntries(self, nums, types, fields1, fields2, strict):
+        """
+        Adds the entries of a cross-reference stream. Objects which are
+        already in the table are not replaced.
+
+        :param nums: the object number of each entry
+        :param types: the type of each entry: 0 (free), 1 (uncompressed) or
+            2 (compressed)
+        :param fields1: the byte offset, or object stream number, of each
+            entry
+        :param fields2: the generation, or index within the object stream,
+            of each entry
+        :param bool strict: raise an error on entries of unknown type
+        """
+        if nums:
+            self.reserve(max(nums) + 1)
+        offsets = self.offsets
+        streamNumbers = self.streamNumbers
+        streamIndexes = self.streamIndexes
+        dense = len(offsets)
+        for num, xref_type, field1, field2 in zip(nums, types, fields1, fields2):
+            if xref_type == 0:
+                # linked list of free objects
+                pass
+            elif xref_type == 1:
+                # objects that are in use but are not compressed
+                if field2 == 0 and 0 <= num < dense:
+                    if offsets[num] == ABSENT and streamNumbers[num] == ABSENT:
+                        offsets[num] = field1
+                elif not self.isUsed(num, field2):
+                    self.setOffset(num, field2, field1)
+            elif xref_type == 2:
+                # compressed objects, whose generation is 0 (PDF spec
+                # table 18)
+                if 0 <= num < dense:
+                    if offsets[num] == ABSENT and streamNumbers[num] == ABSENT:
+                        streamNumbers[num] = field1
+                        streamIndexes[num] = field2
+                elif not self.isUsed(num, 0):
+                    self.setCompressed(num, field1, field2)
+            elif strict:
+                raise PdfReadError("Unknown xref type: %s" % xref_type)
+
+    def generations(self):
+        """
+        :return: a list of the generations which have uncompressed objects.
+        """
+        generations = set(generation for generation in self.overflow if self.overflow[generation])
+        for offset in self.offsets:
+            if offset != ABSENT:
+                generations.add(0)
+                break
+        return sorted(generations)
+
+    def objectNumbers(self, generation):
+        """
+        :return: an iterator over the numbers of the uncompressed objects of
+            a generation, in ascending order.
+        """
+        sparse = sorted(self.overflow.get(generation, {}))
+        if generation == 0:
+            dense = (num for num, offset in enumerate(self.offsets) if offset != ABSENT)
+            return itertools.chain(dense, sparse)
+        return iter(sparse)
+
+    def compressedNumbers(self):
+        """
+        :return: an iterator over the numbers of the compressed objects, in
+            ascending order.
+        """
+        dense = (num for num, stmnum in enumerate(self.streamNumbers) if stmnum != ABSENT)
+        return itertools.chain(dense, sorted(self.sparseCompressed))
+
+    def replaceGeneration(self, generation, objects):
+        """
+        Replaces every uncompressed object of a generation.
+
+        :param dict objects: object number to byte offset
+        """
+        if generation == 0:
+            for num in range(len(self.offsets)):
+                self.offsets[num] = ABSENT
+            self.overflow.pop(0, None)
+            for num, offset in objects.items():
+                self.setOffset(num, 0, offset)
+        else:
+            self.overflow[generation] = dict(objects)
+
+    def memoryUsage(self):
+        """
+        :return: the approximate size of the table in bytes.
+        """
+        size = sum(a.itemsize * len(a) for a in (self.offsets, self.streamNumbers, self.streamIndexes))
+        # a dict entry costs roughly 100 bytes, including the boxed ints
+        entries = sum(len(objects) for objects in self.overflow.values()) + len(self.sparseCompressed)
+        return size + 100 * entries
+
+
+class XrefGenerationView(MutableMapping):
+    """
+    The uncompressed objects of one generation, as a dict of object number to
+    byte offset.
+    """
+    def __init__(self, table, generation):
+        self.table = table
+        self.generation = generation
+
+    def __getitem__(self, num):
+        offset = self.table.getOffset(num, self.generation)
+        if offset is None:
+            raise KeyError(num)
+        return offset
+
+    def __contains__(self, num):
+        return self.table.getOffset(num, self.generation) is not None
+
+    def __setitem__(self, num, offset):
+        self.table.setOffset(num, self.generation, offset)
+
+    def __delitem__(self, num):
+        self.table.removeOffset(num, self.generation)
+
+    def __iter__(self):
+        return self.table.objectNumbers(self.generation)
+
+    def __len__(self):
+        return sum(1 for num in self)
+
+
+class XrefView(Mapping):
+    """
+    The uncompressed objects of a table, as a dict of generation to dict of
+    object number to byte offset.
+    """
+    def __init__(self, table):
+        self.table = table
+
+    def __getitem__(self, generation):
+        if generation not in self:
+            raise KeyError(generation)
+        return XrefGenerationView(self.table, generation)
+
+    def __contains__(self, generation):
+        if generation == 0:
+            return generation in self.table.generations()
+        return bool(self.table.overflow.get(generation))
+
+    def __setitem__(self, generation, objects):
+        self.table.replaceGeneration(generation, objects)
+
+    def __iter__(self):
+        return iter(self.table.generations())
+
+    def __len__(self):
+        return len(self.table.generations())
+
+
+class ObjectStreamView(MutableMapping):
+    """
+    The compressed objects of a table, as a dict of object number to a tuple
+    of (object stream number, index within the stream).
+    """
+    def __init__(self, table):
+        self.table = table
+
+    def __getitem__(self, num):
+        location = self.table.getCompressed(num)
+        if location is None:
+            raise KeyError(num)
+        return location
+
+    def __contains__(self, num):
+        return self.table.getCompressed(num) is not None
+
+    def __setitem__(self, num, location):
+        self.table.setCompressed(num, location[0], location[1])
+
+    def __delitem__(self, num):
+        self.table.removeCompressed(num)
+
+    def __iter__(self):
+        return self.table.compressedNumbers()
+
+    def __len__(self):
+        return sum(1 for num in self)
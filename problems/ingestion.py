@@ -0,0 +1,147 @@
+"""
+Background processing of uploaded PDFs.
+
+Uploads are queued as IngestionJob rows, which hold the contents of the uploaded PDFs, and parsed by IngestionWorker
+(see the run_ingestion_workers command). The PDFs are parsed from memory and never written to disk. Each job is parsed
+in a child process of its own, with a fixed number running at once. A child which runs for longer than the time limit is
+killed, and the address space of each child can be capped so that a malformed PDF cannot exhaust the memory of the
+server. Jobs left running by a worker which stopped without finishing them are queued again by the other workers.
+"""
+import multiprocessing
+import time
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, where memory limits are not enforced
+    resource = None
+
+from django import db
+
+from . import pdf_parser
+from .models import IngestionJob
+
+# the number of seconds past its time limit after which a running job is taken to have been abandoned by its worker,
+# which allows for the time a worker takes to notice that a child has run out of time
+STALE_MARGIN = 60
+
+
+def parse_files(problem_pdf, solution_pdf):
+    """
+    Parses the PDFs of a job
+    :param problem_pdf: The contents of the problem PDF, or None if there is none
+    :param solution_pdf: The contents of the solution PDF, or None if there is none
+    :return: A dictionary with 'problem' and 'solution' keys, each holding the parsed data or None
+    """
+    return {
+        'problem': pdf_parser.parse_problem_pdf(problem_pdf) if problem_pdf else None,
+        'solution': pdf_parser.parse_solution_pdf(solution_pdf) if solution_pdf else None,
+    }
+
+
+def run_job(connection, problem_pdf, solution_pdf, memory_limit):
+    """
+    The entry point of the child process which parses a job. The outcome is sent back to the worker as a tuple of
+    (parsed data, error message).
+    :param connection: The child's end of the pipe to the worker
+    :param problem_pdf: The contents of the problem PDF, or None if there is none
+    :param solution_pdf: The contents of the solution PDF, or None if there is none
+    :param memory_limit: The maximum size of the child's address space in megabytes, or 0 for no limit
+    :return: None
+    """
+    if memory_limit and resource is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        outcome = (parse_files(problem_pdf, solution_pdf), '')
+    except MemoryError:
+        outcome = (None, 'The PDF could not be processed within the memory limit.')
+    except Exception as e:
+        outcome = (None, 'The PDF could not be read (%s).' % e)
+    connection.send(outcome)
+    connection.close()
+
+
+class IngestionWorker(object):
+    """
+    A class for running queued ingestion jobs in a bounded number of child processes
+    """
+    def __init__(self, workers, timeout, memory_limit):
+        """
+        :param workers: The maximum number of jobs to parse at once
+        :param timeout: The number of seconds a job may run for before it is killed
+        :param memory_limit: The maximum address space of each child process in megabytes, or 0 for no limit
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.running = {}
+        self.next_recovery = 0
+
+    def run(self, poll_interval=1.0, once=False):
+        """
+        Processes jobs until interrupted
+        :param poll_interval: The number of seconds to wait between checks of an empty queue
+        :param once: If True, return as soon as the queue is empty and every job has finished
+        :return: None
+        """
+        while True:
+            self.collect()
+            if time.time() >= self.next_recovery:
+                IngestionJob.recover_stale(self.timeout + STALE_MARGIN, exclude=self.running)
+                self.next_recovery = time.time() + self.timeout
+            while len(self.running) < self.workers:
+                job = IngestionJob.claim_next()
+                if job is None:
+                    break
+                self.start(job)
+            if not self.running:
+                if once:
+                    return
+                time.sleep(poll_interval)
+            else:
+                time.sleep(0.05)
+
+    def start(self, job):
+        """
+        Starts parsing a job in a new child process
+        :param job: The claimed job
+        :return: None
+        """
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        # the child must not share the worker's database connection
+        db.connections.close_all()
+        process = multiprocessing.Process(target=run_job,
+                                          args=(sender, job.problem_pdf, job.solution_pdf, self.memory_limit))
+        # the child is daemonic so that it cannot outlive the worker. It extracts the pages of a PDF in a single process
+        # (see pdf_parser.extract_text), which keeps each job to one CPU and to its own memory limit.
+        process.daemon = True
+        process.start()
+        sender.close()
+        # the child has the PDFs, so the worker does not hold on to them while the job runs
+        job.problem_pdf = job.solution_pdf = None
+        self.running[job.id] = (job, process, receiver, time.time() + self.timeout)
+
+    def collect(self):
+        """
+        Records the outcome of every job which has finished, failed or run out of time
+        :return: None
+        """
+        for job_id, (job, process, receiver, deadline) in list(self.running.items()):
+            if receiver.poll():
+                try:
+                    result, error = receiver.recv()
+                except EOFError:
+                    result, error = None, 'The PDF could not be processed.'
+                process.join()
+            elif not process.is_alive():
+                result, error = None, 'The PDF could not be processed (exit code %s).' % process.exitcode
+            elif time.time() > deadline:
+                process.terminate()
+                process.join()
+                result, error = None, 'The PDF took longer than %d seconds to process.' % self.timeout
+            else:
+                continue
+            receiver.close()
+            del self.running[job_id]
+            job.finish(result, error)
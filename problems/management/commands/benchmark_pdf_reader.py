@@ -0,0 +1,201 @@
+import multiprocessing
+import os
+import tempfile
+import zlib
+from io import BytesIO
+
+try:
+    import tracemalloc
+except ImportError:  # Py2
+    tracemalloc = None
+
+from django.core.management.base import BaseCommand
+
+from PyPDF2 import PdfFileReader
+from PyPDF2.cache import StreamCache
+
+from problems import pdf_parser
+
+from .benchmark_pdfs import best_time
+
+# the number of objects stored in each object stream of a generated PDF
+OBJECTS_PER_STREAM = 100
+
+
+def generate_pdf(pages, objects, xref_stream=False, object_streams=False, lines=1, compress=False):
+    """
+    Generates a PDF with a large number of objects, e.g. a contest packet with many pages
+    :param pages: The number of pages
+    :param objects: The number of filler objects, which are not referenced by any page
+    :param xref_stream: True to index the objects with a compressed cross-reference stream (PDF 1.5) instead of a
+    cross-reference table
+    :param object_streams: True to store the filler objects in compressed object streams (needs xref_stream)
+    :param lines: The number of lines of text on each page
+    :param compress: True to compress the contents of each page with FlateDecode
+    :return: The contents of the PDF
+    """
+    # objects 1-3 are the catalog, the page tree and the font, followed by a page and its contents for every page
+    bodies = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        ('<< /Type /Pages /Kids [%s] /Count %d >>'
+         % (' '.join('%d 0 R' % (4 + 2 * i) for i in range(pages)), pages)).encode('ascii'),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    for i in range(pages):
+        text = ('BT /F1 12 Tf 72 720 Td (Problem %d: find the shortest path.) Tj ET' % (i + 1)).encode('ascii')
+        text += b''.join((' BT /F1 12 Tf 72 %d Td (Line %d of the problem statement.) Tj ET' % (720 - 14 * j, j))
+                         .encode('ascii') for j in range(1, lines))
+        bodies.append(('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> '
+                       '/Contents %d 0 R >>' % (5 + 2 * i)).encode('ascii'))
+        if compress:
+            text = zlib.compress(text)
+            bodies.append(('<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(text)).encode('ascii') + text +
+                          b'\nendstream')
+        else:
+            bodies.append(('<< /Length %d >>\nstream\n' % len(text)).encode('ascii') + text + b'\nendstream')
+    fillers = [('<< /Filler %d /Data [1 2 3] /Name (filler) >>' % i).encode('ascii') for i in range(objects)]
+
+    # the entries of the cross-reference index, as (type, field 1, field 2) for objects 1 onwards
+    entries = []
+    output = BytesIO()
+    output.write(b'%PDF-1.5\n%\xe2\xe3\xcf\xd3\n')
+
+    def write_object(body):
+        entries.append((1, output.tell(), 0))
+        output.write(('%d 0 obj\n' % len(entries)).encode('ascii') + body + b'\nendobj\n')
+
+    for body in bodies:
+        write_object(body)
+    if object_streams:
+        # each object stream follows the objects it contains
+        for start in range(0, len(fillers), OBJECTS_PER_STREAM):
+            chunk = fillers[start:start + OBJECTS_PER_STREAM]
+            first = len(entries) + 1
+            stream_number = first + len(chunk)
+            header = []
+            data = []
+            position = 0
+            for i, body in enumerate(chunk):
+                entries.append((2, stream_number, i))
+                header.append('%d %d' % (first + i, position))
+                data.append(body)
+                position += len(body) + 1
+            header = (' '.join(header) + '\n').encode('ascii')
+            payload = zlib.compress(header + b'\n'.join(data) + b'\n')
+            write_object(('<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode /Length %d >>\nstream\n'
+                          % (len(chunk), len(header), len(payload))).encode('ascii') + payload + b'\nendstream')
+    else:
+        for body in fillers:
+            write_object(body)
+
+    root = '/Root 1 0 R'
+    if xref_stream:
+        xref_offset = output.tell()
+        entries.append((1, xref_offset, 0))
+        size = len(entries) + 1
+        rows = [b'\x00\x00\x00\x00\x00\xff\xff'] + [
+            bytes(bytearray([kind, (field1 >> 24) & 0xff, (field1 >> 16) & 0xff, (field1 >> 8) & 0xff, field1 & 0xff,
+                             (field2 >> 8) & 0xff, field2 & 0xff]))
+            for kind, field1, field2 in entries]
+        payload = zlib.compress(b''.join(rows))
+        output.write(('%d 0 obj\n<< /Type /XRef /Size %d /W [1 4 2] %s /Filter /FlateDecode /Length %d >>\nstream\n'
+                      % (size - 1, size, root, len(payload))).encode('ascii') + payload + b'\nendstream\nendobj\n')
+    else:
+        xref_offset = output.tell()
+        output.write(('xref\n0 %d\n0000000000 65535 f \n' % (len(entries) + 1)).encode('ascii'))
+        output.write(b''.join(('%010d 00000 n \n' % offset).encode('ascii') for kind, offset, generation in entries))
+        output.write(('trailer\n<< /Size %d %s >>\n' % (len(entries) + 1, root)).encode('ascii'))
+    output.write(('startxref\n%d\n%%%%EOF\n' % xref_offset).encode('ascii'))
+    return output.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Time opening, and extracting the text of, large generated PDFs with PyPDF2'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objects', type=int, default=100000,
+                            help='The number of objects in each generated PDF')
+        parser.add_argument('--pages', type=int, default=200,
+                            help='The number of pages in each generated PDF')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='The number of times each PDF is read; the fastest run is reported')
+        parser.add_argument('--workers', type=int, nargs='*',
+                            help='The numbers of processes to extract the text of a PDF with in parallel (defaults to '
+                                 'powers of two up to the number of CPUs)')
+
+    def handle(self, *args, **options):
+        variants = [
+            ('xref table', {}),
+            ('xref stream', {'xref_stream': True}),
+            ('xref stream, object streams', {'xref_stream': True, 'object_streams': True}),
+        ]
+        # each PDF is read from a file, either read into memory or memory-mapped
+        sources = [('read', {}), ('mmap', {'useMmap': True})]
+        self.stdout.write('%-30s %6s %10s %10s %12s %12s' % ('PDF', 'source', 'objects', 'size MB', 'open ms',
+                                                             'extract ms'))
+        for name, kwargs in variants:
+            data = generate_pdf(options['pages'], options['objects'], **kwargs)
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+                pdf_file.write(data)
+            try:
+                for source, reader_kwargs in sources:
+                    def extract():
+                        reader = PdfFileReader(pdf_file.name, **reader_kwargs)
+                        return [reader.getPage(page).extractText() for page in range(reader.getNumPages())]
+
+                    open_time = best_time(lambda: PdfFileReader(pdf_file.name, **reader_kwargs), options['repeat'])
+                    extract_time = best_time(extract, options['repeat'])
+                    self.stdout.write('%-30s %6s %10d %10.1f %12.1f %12.1f'
+                                      % (name, source, options['objects'] + 2 * options['pages'] + 3, len(data) / 1e6,
+                                         open_time * 1000, extract_time * 1000))
+            finally:
+                os.remove(pdf_file.name)
+
+        # parallel extraction of a contest packet with a few paragraphs on every page, memory-mapped by each process
+        workers = options['workers'] or [2 ** i for i in range(multiprocessing.cpu_count().bit_length())]
+        data = generate_pdf(options['pages'], 0, lines=20)
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+            pdf_file.write(data)
+        try:
+            self.stdout.write('')
+            self.stdout.write('%-30s %10s %12s %10s' % ('parallel extraction', 'workers', 'extract ms', 'speedup'))
+            sequential_time = None
+            for count in workers:
+                extract_time = best_time(lambda: pdf_parser.extract_text_parallel(pdf_file.name, count),
+                                         options['repeat'])
+                sequential_time = sequential_time or extract_time
+                self.stdout.write('%-30s %10d %12.1f %9.2fx' % ('%d pages' % options['pages'], count,
+                                                                extract_time * 1000, sequential_time / extract_time))
+        finally:
+            os.remove(pdf_file.name)
+
+        # the memory taken up by the decoded page contents of a contest packet, kept on each stream or in a stream cache
+        data = generate_pdf(options['pages'], 0, lines=200, compress=True)
+        limit = pdf_parser.STREAM_CACHE_BYTES
+        caches = [
+            ('on each stream', lambda: None),
+            ('cache %dKB' % (limit // 1024), lambda: StreamCache(limit)),
+            ('cache %dKB, drop encoded' % (limit // 1024), lambda: StreamCache(limit, dropEncoded=True)),
+            ('cache 64KB, drop encoded', lambda: StreamCache(64 * 1024, dropEncoded=True)),
+        ]
+        self.stdout.write('')
+        self.stdout.write('%-30s %12s %12s %12s' % ('decoded streams', 'extract ms', 'peak MB', 'cached MB'))
+        for name, create_cache in caches:
+            def extract():
+                reader = PdfFileReader(BytesIO(data), streamCache=create_cache())
+                # the pages are kept, as they are by getPage
+                pages = [reader.getPage(page) for page in range(reader.getNumPages())]
+                return reader, [page.extractText() for page in pages]
+
+            extract_time = best_time(extract, options['repeat'])
+            if tracemalloc is not None:
+                tracemalloc.start()
+                reader, texts = extract()
+                peak = '%12.1f' % (tracemalloc.get_traced_memory()[1] / 1e6)
+                tracemalloc.stop()
+            else:
+                reader, texts = extract()
+                peak = '%12s' % '-'
+            stats = reader.getStreamCacheStats()
+            cached = '%12.1f' % (stats['peakBytes'] / 1e6) if stats else '%12s' % '-'
+            self.stdout.write('%-30s %12.1f %s %s' % (name, extract_time * 1000, peak, cached))
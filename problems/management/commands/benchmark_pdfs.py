@@ -0,0 +1,69 @@
+import glob
+import os
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+
+from PyPDF2 import PdfFileReader
+
+from problems import pdf_parser
+
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))), 'examples')
+
+
+def best_time(function, repeat):
+    """
+    Times a function
+    :param function: A function which takes no arguments
+    :param repeat: The number of times to run the function
+    :return: The fastest time the function took, in seconds
+    """
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = 'Time the stages of parsing problem and solution PDFs, by default on the PDFs in examples/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*',
+                            help='The PDFs to parse (defaults to every PDF in examples/)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='The number of times each stage is run; the fastest run is reported')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or sorted(glob.glob(os.path.join(EXAMPLES_DIRECTORY, '*.pdf')))
+        repeat = options['repeat']
+        totals = [0, 0.0, 0.0, 0.0]
+        self.stdout.write('%-45s %6s %12s %12s %12s' % ('file', 'pages', 'extract ms', 'lines ms', 'sections ms'))
+        for path in paths:
+            with open(path, 'rb') as pdf_file:
+                contents = pdf_file.read()
+
+            def extract():
+                reader = PdfFileReader(BytesIO(contents))
+                return [reader.getPage(page).extractText() for page in range(reader.getNumPages())]
+
+            texts = extract()
+            lines = [line for text in texts for line in pdf_parser.reassemble_lines(text.split('\n'))]
+
+            extract_time = best_time(extract, repeat)
+            lines_time = best_time(
+                lambda: [line for text in texts for line in pdf_parser.reassemble_lines(text.split('\n'))], repeat)
+            sections_time = best_time(
+                lambda: (pdf_parser.read_sections(lines[1:], pdf_parser.PROBLEM_HEADINGS),
+                         pdf_parser.read_sections(lines, pdf_parser.SOLUTION_HEADINGS)), repeat)
+            self.stdout.write('%-45s %6d %12.2f %12.3f %12.3f' % (os.path.basename(path)[:45], len(texts),
+                                                                   extract_time * 1000, lines_time * 1000,
+                                                                   sections_time * 1000))
+            for i, value in enumerate((len(texts), extract_time, lines_time, sections_time)):
+                totals[i] += value
+        self.stdout.write('%-45s %6d %12.2f %12.3f %12.3f' % ('total', totals[0], totals[1] * 1000, totals[2] * 1000,
+                                                               totals[3] * 1000))
@@ -0,0 +1,264 @@
+import multiprocessing
+import os
+import time
+import zipfile
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from problems import pdf_parser, search
+from problems.models import Category, CategoryIndex, Content, Problem, Solution
+
+SOLUTION_SUFFIX = '_solution'
+
+# the category types set from the parsed data, along with the key of the tag string in the parsed data and the
+# many-to-many relation which stores them
+PROBLEM_CATEGORIES = [('paradigm', 'paradigms', Problem.categories)]
+SOLUTION_CATEGORIES = [
+    ('complexity', 'complexity', Solution.complexity),
+    ('language', 'languages', Solution.language),
+    ('algorithm', 'algorithms', Solution.algorithms),
+    ('data-structure', 'data_structures', Solution.data_structures),
+]
+
+
+def read_entry(entry):
+    """
+    Locates a PDF found by the import
+    :param entry: A tuple of the form (path of the zip archive or None, path of the PDF)
+    :return: The path of a PDF in a directory, which the parser maps into memory, or the contents of a PDF in a zip
+    archive
+    """
+    archive, path = entry
+    if archive is None:
+        return path
+    with zipfile.ZipFile(archive) as zip_file:
+        return zip_file.read(path)
+
+
+def parse_pair(pair):
+    """
+    Parses a problem PDF and its solution PDF. Run in the worker processes, so it never touches the database.
+    :param pair: A tuple of the form (name, problem entry, solution entry or None), see read_entry
+    :return: A dictionary holding the name, the parsed problem and solution (or None), the number of files and pages
+    read, and the errors raised while parsing each file
+    """
+    name, problem_entry, solution_entry = pair
+    outcome = {'name': name, 'problem': None, 'solution': None, 'files': 0, 'pages': 0, 'errors': []}
+    for kind, entry, parse in (('problem', problem_entry, pdf_parser.parse_problem_lines),
+                               ('solution', solution_entry, pdf_parser.parse_solution_lines)):
+        if entry is None:
+            continue
+        outcome['files'] += 1
+        try:
+            # the pages are counted by the reader which extracts their text
+            pages, lines = pdf_parser.read_pdf_lines(read_entry(entry))
+            outcome['pages'] += pages
+            outcome[kind] = parse(lines)
+        except Exception as e:
+            outcome['errors'].append('%s: %s' % (entry[1], str(e) or e.__class__.__name__))
+    return outcome
+
+
+def category_names(tags):
+    """
+    Splits a tag string in the same way as Category.resolve
+    :param tags: A string of comma separated category names
+    :return: A list of the distinct category names
+    """
+    names = [name.strip().lower() for name in (tags or '').split(',')]
+    return [name for i, name in enumerate(names) if name and name not in names[:i]]
+
+
+def to_time_limit(value):
+    """
+    Converts a parsed time limit to a number
+    :param value: The time limit found in a solution PDF
+    :return: The time limit as a float, or 0 if it is not a number
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Command(BaseCommand):
+    help = 'Import problems, and their solutions, from a directory or zip archive of PDFs. The solution to ' \
+           '"name.pdf" is read from "name%s.pdf" if it exists.' % SOLUTION_SUFFIX
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='A directory or zip archive containing the PDFs')
+        parser.add_argument('--user',
+                            help='The username of the user the imported problems are created by (required)')
+        parser.add_argument('--public', action='store_true',
+                            help='Make the imported problems and solutions public')
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='The number of processes to parse with')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='The number of problems written to the database in each transaction')
+
+    def handle(self, *args, **options):
+        if not options['user']:
+            raise CommandError('The user the problems are created by must be given with --user')
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError('User "%s" does not exist' % options['user'])
+        pairs, failures = self.find_pairs(options['path'])
+        for failure in failures:
+            self.stderr.write(failure)
+
+        start = time.time()
+        files = pages = imported = skipped = 0
+        batch = []
+        pool = multiprocessing.Pool(options['workers'])
+        try:
+            for outcome in pool.imap_unordered(parse_pair, pairs):
+                files += outcome['files']
+                pages += outcome['pages']
+                for error in outcome['errors']:
+                    failures.append(error)
+                    self.stderr.write('Could not parse %s' % error)
+                if outcome['problem'] is not None:
+                    batch.append(outcome)
+                if len(batch) >= options['batch_size']:
+                    added = self.write_batch(batch, user, options['public'])
+                    imported += added
+                    skipped += len(batch) - added
+                    batch = []
+            if batch:
+                added = self.write_batch(batch, user, options['public'])
+                imported += added
+                skipped += len(batch) - added
+        finally:
+            pool.close()
+            pool.join()
+
+        elapsed = max(time.time() - start, 1e-6)
+        self.stdout.write('Imported %d problems (%d skipped as duplicates) from %d files, %d pages in %.1fs'
+                          % (imported, skipped, files, pages, elapsed))
+        self.stdout.write('%.1f files/s, %.1f pages/s, %d failures' % (files / elapsed, pages / elapsed, len(failures)))
+
+    def find_pairs(self, path):
+        """
+        Finds the PDFs to import and matches each problem to its solution
+        :param path: A directory or zip archive containing the PDFs
+        :return: A tuple of (a list of (name, problem entry, solution entry or None) tuples, a list of error messages
+        for solutions with no problem)
+        """
+        if os.path.isdir(path):
+            entries = [(None, os.path.join(directory, file_name))
+                       for directory, subdirectories, file_names in os.walk(path)
+                       for file_name in file_names]
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as zip_file:
+                entries = [(path, member) for member in zip_file.namelist()]
+        else:
+            raise CommandError('%s is not a directory or a zip archive' % path)
+
+        problems = {}
+        solutions = {}
+        for entry in sorted(entries):
+            name, extension = os.path.splitext(entry[1])
+            if extension.lower() != '.pdf':
+                continue
+            if name.endswith(SOLUTION_SUFFIX):
+                solutions[name[:-len(SOLUTION_SUFFIX)]] = entry
+            else:
+                problems[name] = entry
+        pairs = [(name, problems[name], solutions.get(name)) for name in sorted(problems)]
+        failures = ['%s: no problem PDF was found for this solution' % solutions[name][1]
+                    for name in sorted(solutions) if name not in problems]
+        return pairs, failures
+
+    def write_batch(self, batch, user, public):
+        """
+        Creates the problems, contents, solutions and categorisations of a batch of parsed PDFs in a single transaction.
+        Problems whose titles already exist are skipped.
+        :param batch: A list of the outcomes of parse_pair
+        :param user: The user the problems are created by
+        :param public: True if the problems and solutions should be public
+        :return: The number of problems created
+        """
+        max_title = Problem._meta.get_field('title').max_length
+        with transaction.atomic():
+            outcomes = {}
+            for outcome in batch:
+                title = outcome['problem']['title'].strip()[:max_title]
+                if title and title not in outcomes:
+                    outcomes[title] = outcome
+            for title in Problem.objects.filter(title__in=list(outcomes)).values_list('title', flat=True):
+                del outcomes[title]
+            if not outcomes:
+                return 0
+
+            Problem.objects.bulk_create([Problem(created_by=user, title=title, problem_privacy=not public)
+                                         for title in outcomes])
+            # bulk_create does not set primary keys on every database, so look them up by their unique titles
+            problem_ids = dict(Problem.objects.filter(title__in=list(outcomes)).values_list('title', 'id'))
+
+            contents = []
+            solutions = []
+            index_entries = []
+            for title, outcome in outcomes.items():
+                problem = outcome['problem']
+                content = Content(problem_id=problem_ids[title],
+                                  problem_description=problem['problem_description'],
+                                  example_input=problem['example_input'],
+                                  example_output=problem['example_output'])
+                content.render_markdown_fields()
+                contents.append(content)
+                solution = Solution(problem_id=problem_ids[title], solution_privacy=not public)
+                if outcome['solution'] is not None:
+                    parsed = outcome['solution']
+                    solution.solution_description = parsed['solution_description']
+                    solution.links = parsed['links']
+                    solution.example_code = parsed['example_code']
+                    solution.time_limit = to_time_limit(parsed['time_limit'])
+                solution.render_markdown_fields()
+                solutions.append(solution)
+                index_entries.append((problem_ids[title], {
+                    'title': title,
+                    'problem_description': content.problem_description,
+                    'example_input': content.example_input,
+                    'example_output': content.example_output,
+                    'solution_description': solution.solution_description,
+                }))
+            Content.objects.bulk_create(contents)
+            Solution.objects.bulk_create(solutions)
+            # bulk_create skips the save methods, so the full-text index is updated here
+            search.index_problems(index_entries)
+            solution_ids = dict(Solution.objects.filter(problem_id__in=list(problem_ids.values()))
+                                .values_list('problem_id', 'id'))
+
+            tags = [(problem_ids[title], outcome['problem'], outcome['solution'] or {})
+                    for title, outcome in outcomes.items()]
+            for category_type, key, relation in PROBLEM_CATEGORIES:
+                self.add_categories(category_type, relation, [(problem_id, problem_id, problem.get(key))
+                                                               for problem_id, problem, solution in tags])
+            for category_type, key, relation in SOLUTION_CATEGORIES:
+                self.add_categories(category_type, relation, [(problem_id, solution_ids[problem_id], solution.get(key))
+                                                               for problem_id, problem, solution in tags])
+        return len(outcomes)
+
+    def add_categories(self, category_type, relation, tagged):
+        """
+        Categorises a batch of new problems or solutions with a few bulk inserts, and adds them to the category index
+        :param category_type: The type of the categories, e.g. "paradigm" or "data-structure"
+        :param relation: The many-to-many relation which stores the categories, e.g. Problem.categories
+        :param tagged: A list of tuples of the form (problem id, id of the object to categorise, tag string)
+        :return: None
+        """
+        names = [(problem_id, object_id, category_names(tags)) for problem_id, object_id, tags in tagged]
+        all_names = set(name for problem_id, object_id, object_names in names for name in object_names)
+        if not all_names:
+            return
+        categories = dict((c.name, c) for c in Category.resolve(','.join(sorted(all_names)), category_type))
+        through = relation.through
+        source = relation.field.m2m_field_name()
+        target = relation.field.m2m_reverse_field_name()
+        through.objects.bulk_create([through(**{source + '_id': object_id, target + '_id': categories[name].id})
+                                     for problem_id, object_id, object_names in names for name in object_names])
+        CategoryIndex.objects.bulk_create([CategoryIndex(problem_id=problem_id, type=category_type, name=name)
+                                           for problem_id, object_id, object_names in names for name in object_names])
@@ -0,0 +1,72 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from problems.models import Content, Solution
+from problems.rendering import RENDERER_VERSION, markdown_to_html
+
+
+def render_batch(batch):
+    """
+    Renders the markdown fields of a batch of objects. Run in the worker processes, so it never touches the database.
+    :param batch: A list of tuples of the form (primary key, markdown source of each field)
+    :return: A list of tuples of the form (primary key, rendered HTML of each field)
+    """
+    return [(row[0], [markdown_to_html(source) for source in row[1:]]) for row in batch]
+
+
+class Command(BaseCommand):
+    help = 'Re-render the HTML of the markdown fields in the archive which were rendered by another version of the ' \
+           'renderer, e.g. after upgrading markdown2'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='The number of processes to render with')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='The number of objects sent to a worker at a time')
+        parser.add_argument('--force', action='store_true',
+                            help='Re-render every object, including those already rendered by the current renderer')
+
+    def handle(self, *args, **options):
+        pool = multiprocessing.Pool(options['workers'])
+        try:
+            for model in (Content, Solution):
+                start = time.time()
+                count = self.rerender(model, pool, options['workers'], options['batch_size'], options['force'])
+                self.stdout.write('Re-rendered %d %s objects in %.1fs' % (count, model.__name__, time.time() - start))
+        finally:
+            pool.close()
+            pool.join()
+
+    def rerender(self, model, pool, workers, batch_size, force=False):
+        """
+        Re-renders the markdown fields of the objects of a model which were rendered by another version of the
+        renderer. Objects are read in chunks of one batch per worker, rendered in parallel, and each chunk is written
+        back in a single transaction.
+        :param model: A model with markdown fields, i.e. Content or Solution
+        :param pool: The pool of worker processes
+        :param workers: The number of worker processes
+        :param batch_size: The number of objects sent to a worker at a time
+        :param force: True to re-render every object, whichever version rendered it
+        :return: The number of objects re-rendered
+        """
+        fields = model.MARKDOWN_FIELDS
+        objects = model.objects.all() if force else model.objects.exclude(renderer_version=RENDERER_VERSION)
+        count = 0
+        last_pk = 0
+        while True:
+            rows = list(objects.filter(pk__gt=last_pk).order_by('pk')
+                        .values_list('pk', *fields)[:batch_size * workers])
+            if not rows:
+                return count
+            last_pk = rows[-1][0]
+            batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+            with transaction.atomic():
+                for batch in pool.map(render_batch, batches):
+                    for pk, html in batch:
+                        model.objects.filter(pk=pk).update(renderer_version=RENDERER_VERSION,
+                                                           **dict((field + '_html', value)
+                                                                  for field, value in zip(fields, html)))
+            count += len(rows)
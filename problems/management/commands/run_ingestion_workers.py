@@ -0,0 +1,25 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+
+from problems.ingestion import IngestionWorker
+
+
+class Command(BaseCommand):
+    help = 'Parse uploaded problem and solution PDFs queued by the upload page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='The maximum number of PDFs to parse at once')
+        parser.add_argument('--timeout', type=int, default=60,
+                            help='The number of seconds a job may run for before it is killed')
+        parser.add_argument('--memory-limit', type=int, default=512,
+                            help='The maximum memory of each parsing process in megabytes (0 for no limit)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='The number of seconds to wait between checks of an empty queue')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of waiting for new jobs')
+
+    def handle(self, *args, **options):
+        worker = IngestionWorker(options['workers'], options['timeout'], options['memory_limit'])
+        worker.run(poll_interval=options['poll_interval'], once=options['once'])
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 13:11
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_category_index(apps, schema_editor):
+    """
+    Index the categories of every problem and solution already in the database
+    """
+    Problem = apps.get_model('problems', 'Problem')
+    Solution = apps.get_model('problems', 'Solution')
+    CategoryIndex = apps.get_model('problems', 'CategoryIndex')
+    entries = set()
+    for problem in Problem.objects.prefetch_related('categories'):
+        for category in problem.categories.all():
+            entries.add((problem.id, 'paradigm', category.name))
+    relations = [
+        ('complexity', 'complexity'),
+        ('language', 'language'),
+        ('algorithms', 'algorithm'),
+        ('data_structures', 'data-structure'),
+    ]
+    for solution in Solution.objects.prefetch_related(*[relation for relation, category_type in relations]):
+        for relation, category_type in relations:
+            for category in getattr(solution, relation).all():
+                entries.add((solution.problem_id, category_type, category.name))
+    CategoryIndex.objects.bulk_create([
+        CategoryIndex(problem_id=problem_id, type=category_type, name=name)
+        for problem_id, category_type, name in entries
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=200)),
+                ('name', models.CharField(max_length=200)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='problems.Problem')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='categoryindex',
+            unique_together=set([('type', 'name', 'problem')]),
+        ),
+        migrations.RunPython(build_category_index, migrations.RunPython.noop),
+    ]
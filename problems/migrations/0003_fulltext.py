@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    """
+    Create the full-text index of problems and fill it with the problems already in the database
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE problems_fulltext USING fts5("
+        "title, problem_description, example_input, example_output, solution_description, "
+        "tokenize = 'porter unicode61')")
+    schema_editor.execute(
+        "INSERT INTO problems_fulltext "
+        "(rowid, title, problem_description, example_input, example_output, solution_description) "
+        "SELECT p.id, p.title, COALESCE(c.problem_description, ''), COALESCE(c.example_input, ''), "
+        "COALESCE(c.example_output, ''), COALESCE(s.solution_description, '') "
+        "FROM problems_problem p "
+        "LEFT JOIN problems_content c ON c.problem_id = p.id "
+        "LEFT JOIN problems_solution s ON s.problem_id = p.id "
+        "GROUP BY p.id")
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE problems_fulltext")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0002_categoryindex'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
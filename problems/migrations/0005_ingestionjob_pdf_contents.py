@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+
+from django.db import migrations, models
+
+
+def load_pdf_contents(apps, schema_editor):
+    """
+    Moves the PDFs of unfinished jobs from the upload directory into the jobs themselves
+    """
+    IngestionJob = apps.get_model('problems', 'IngestionJob')
+    for job in IngestionJob.objects.all():
+        for file_field, pdf_field in (('problem_file', 'problem_pdf'), ('solution_file', 'solution_pdf')):
+            path = getattr(job, file_field)
+            if not path or not os.path.exists(path):
+                continue
+            if job.status in ('pending', 'running'):
+                with open(path, 'rb') as pdf_file:
+                    setattr(job, pdf_field, pdf_file.read())
+            os.remove(path)
+        job.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0004_ingestionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionjob',
+            name='problem_pdf',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingestionjob',
+            name='solution_pdf',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(load_pdf_contents, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='ingestionjob',
+            name='problem_file',
+        ),
+        migrations.RemoveField(
+            model_name='ingestionjob',
+            name='solution_file',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 14:46
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_ingestionjob_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='renderer_version',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='solution',
+            name='renderer_version',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
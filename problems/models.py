@@ -2,12 +2,15 @@ from __future__ import unicode_literals
 from hashlib import md5
 import random
 import datetime
-import markdown2
+import json
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
 from django.core.mail import send_mail
+from django.utils import timezone
+
+from . import rendering, search
 
 class Account(models.Model):
     """
@@ -65,6 +68,35 @@ class Category(models.Model):
     class Meta:
         unique_together = ['name', 'type']
 
+    @classmethod
+    def resolve(cls, names, category_type):
+        """
+        A helper method for looking up the categories named in a tag string, creating any which do not exist yet
+        :param names: A string of comma separated category names
+        :param category_type: The type of the categories, e.g. "paradigm" or "data-structure"
+        :return: A list of Category objects, in the order they were named
+        """
+        names = [name.strip().lower() for name in names.split(',')]
+        names = [name for i, name in enumerate(names) if name and name not in names[:i]]
+        if not names:
+            return []
+        categories = dict((c.name, c) for c in cls.objects.filter(type=category_type, name__in=names))
+        missing = [name for name in names if name not in categories]
+        if missing:
+            try:
+                with transaction.atomic():
+                    cls.objects.bulk_create([cls(name=name, type=category_type) for name in missing])
+            except IntegrityError:
+                # another request created some of the same categories first, and none of these were created, so
+                # find the ones it created and create the rest one at a time
+                categories.update((c.name, c) for c in cls.objects.filter(type=category_type, name__in=missing))
+                for name in missing:
+                    if name not in categories:
+                        categories[name] = cls.objects.get_or_create(name=name, type=category_type)[0]
+            else:
+                categories.update((c.name, c) for c in cls.objects.filter(type=category_type, name__in=missing))
+        return [categories[name] for name in names]
+
 
 class Problem(models.Model):
     """
@@ -81,35 +113,94 @@ class Problem(models.Model):
     class Meta:
         unique_together = ['title']
 
-    def add_paradigms(self, paradigms):
+    def save(self, *args, **kwargs):
         """
-        A helper function for adding new paradigms to the categories field
-        :param paradigms: A string representing the paradigms which should be on the field
+        An extension to the default save method. This one updates the full-text index after writing the object to the
+        database.
         :return: The saved object
         """
-        if self.categories:
-            self.remove_paradigms()
-        for p in paradigms.split(','):
-            if p == '' or p == ' ':
-                pass
-            else:
-                paradigm, c = Category.objects.get_or_create(name=p.strip().lower(), type="paradigm")
-                self.categories.add(paradigm)
-        self.save()
+        super(Problem, self).save(*args, **kwargs)
+        search.index_problem(self.id, title=self.title)
+
+    def delete(self, *args, **kwargs):
+        """
+        An extension to the default delete method. This one removes the problem from the full-text index.
+        :return: None
+        """
+        search.unindex_problem(self.id)
+        super(Problem, self).delete(*args, **kwargs)
 
+    def add_paradigms(self, paradigms):
+        """
+        A helper function for setting the paradigms on the categories field
+        :param paradigms: A string representing the paradigms which should be on the field
+        :return: None
+        """
+        categories = Category.resolve(paradigms, "paradigm")
+        self.categories.set(categories)
+        CategoryIndex.update_problem(self.id, "paradigm", categories)
 
     def remove_paradigms(self):
         """
         A helper function to remove paradigms from the categories field
-        :return: The saved object
+        :return: None
         """
-        paradigms = self.categories.all()
-        for p in paradigms:
-            self.categories.remove(p)
-        self.save()
+        self.categories.clear()
+        CategoryIndex.update_problem(self.id, "paradigm", [])
 
 
-class Content(models.Model):
+class MarkdownModel(models.Model):
+    """
+    An abstract model for models with markdown formatted fields. Each field in MARKDOWN_FIELDS is stored alongside an
+    HTML version of itself in the field of the same name ending in _html. The version of the renderer which last
+    rendered the _html fields is stored alongside them.
+    """
+    renderer_version = models.CharField(max_length=100, blank=True)
+
+    MARKDOWN_FIELDS = []
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        An extension to the default from_db method. This one remembers the markdown each _html field was rendered from.
+        :return: The loaded object
+        """
+        instance = super(MarkdownModel, cls).from_db(db, field_names, values)
+        instance._rendered_markdown = dict((field, getattr(instance, field)) for field in cls.MARKDOWN_FIELDS
+                                           if field in field_names and field + '_html' in field_names)
+        return instance
+
+    def render_markdown_fields(self):
+        """
+        A helper method for updating the _html fields. Only fields whose markdown has changed since they were last
+        rendered, or whose HTML is missing, are rendered again, unless the HTML was rendered by another version of the
+        renderer, in which case every field is.
+        :return: None
+        """
+        rendered = getattr(self, '_rendered_markdown', {})
+        if self.renderer_version != rendering.RENDERER_VERSION:
+            rendered = {}
+            self.renderer_version = rendering.RENDERER_VERSION
+        for field in self.MARKDOWN_FIELDS:
+            source = getattr(self, field)
+            if rendered.get(field) != source or not getattr(self, field + '_html'):
+                setattr(self, field + '_html', self.get_html(source))
+                rendered[field] = source
+        self._rendered_markdown = rendered
+
+    def get_html(self, content):
+        """
+        A helper method for saving markdown formatted strings in HTML friendly formatting
+        :param content: A string with markdown formatting
+        :return: An HTML friendly version of the original string
+        """
+        return rendering.render_markdown(content)
+
+
+class Content(MarkdownModel):
     """
     A model storing the data necessary to describe the contents of a problem
     """
@@ -121,27 +212,23 @@ class Content(models.Model):
     example_output = models.TextField(default="No example output provided.")
     example_output_html = models.TextField()
 
+    MARKDOWN_FIELDS = ['problem_description', 'example_input', 'example_output']
+
     def save(self, *args, **kwargs):
         """
-        An extension to the default save method. This one updated the _html fields before writing the object to the
-        database.
+        An extension to the default save method. This one updates any out of date _html fields before writing the
+        object to the database, and updates the full-text index afterwards.
         :return: The saved object
         """
-        self.problem_description_html = self.get_html(self.problem_description)
-        self.example_input_html = self.get_html(self.example_input)
-        self.example_output_html = self.get_html(self.example_output)
+        self.render_markdown_fields()
         super(Content, self).save(*args, **kwargs)
-
-    def get_html(self, content):
-        """
-        A helper method for saving markdown formatted strings in HTML friendly formatting
-        :param content: A string with markdown formatting
-        :return: An HTML friendly version of the original string
-        """
-        return markdown2.markdown(content, extras=["fenced-code-blocks"])
+        search.index_problem(self.problem_id,
+                             problem_description=self.problem_description,
+                             example_input=self.example_input,
+                             example_output=self.example_output)
 
 
-class Solution(models.Model):
+class Solution(MarkdownModel):
     """
     A model storing all of the data necessary to create a solution to a problem
     """
@@ -159,128 +246,102 @@ class Solution(models.Model):
     data_structures = models.ManyToManyField(Category, blank=True, related_name="data_structures")
     algorithms = models.ManyToManyField(Category, blank=True, related_name="algorithms")
 
-    def save(self, *args, **kwargs):
+    MARKDOWN_FIELDS = ['solution_description', 'links', 'example_code']
+    CATEGORY_RELATIONS = ['problem__categories', 'data_structures', 'algorithms', 'complexity', 'language']
+
+    @classmethod
+    def for_problems(cls, problems):
         """
-        An extension to the default save method. This one updated the _html fields before writing the object to the
-        database.
-        :return: The saved object
+        A helper method for loading the solutions to a set of problems in bulk. The problem and every category relation
+        are fetched up front, so all_defaults and get_all_categories do not hit the database again.
+        :param problems: A queryset of the problems whose solutions should be loaded
+        :return: A queryset of solutions which costs a fixed number of queries, regardless of the number of problems
         """
-        self.solution_description_html = self.get_html(self.solution_description)
-        self.links_html = self.get_html(self.links)
-        self.example_code_html = self.get_html(self.example_code)
-        super(Solution, self).save(*args, **kwargs)
+        return cls.objects.filter(problem__in=problems)\
+            .select_related('problem')\
+            .prefetch_related(*cls.CATEGORY_RELATIONS)
 
-    def get_html(self, content):
+    def save(self, *args, **kwargs):
         """
-        A helper method for saving markdown formatted strings in HTML friendly formatting
-        :param content: A string with markdown formatting
-        :return: An HTML friendly version of the original string
+        An extension to the default save method. This one updates any out of date _html fields before writing the
+        object to the database, and updates the full-text index afterwards.
+        :return: The saved object
         """
-        return markdown2.markdown(content, extras=["fenced-code-blocks"])
+        self.render_markdown_fields()
+        super(Solution, self).save(*args, **kwargs)
+        search.index_problem(self.problem_id, solution_description=self.solution_description)
 
     def add_complexity(self, complexities):
         """
-        A helper function for adding new complexities to the complexity field
-        :param paradigms: A string representing the complexities which should be on the field
-        :return: The saved object
+        A helper function for setting the complexities on the complexity field
+        :param complexities: A string representing the complexities which should be on the field
+        :return: None
         """
-        if self.complexity:
-            self.remove_complexity()
-        for complexity in complexities.split(','):
-            if complexity == '' or complexity == ' ':
-                pass
-            else:
-                complex, c = Category.objects.get_or_create(name=complexity.strip().lower(), type="complexity")
-                self.complexity.add(complex)
-        self.save()
+        categories = Category.resolve(complexities, "complexity")
+        self.complexity.set(categories)
+        CategoryIndex.update_problem(self.problem_id, "complexity", categories)
 
     def remove_complexity(self):
         """
         A helper function to remove complexities from the complexity field
-        :return: The saved object
+        :return: None
         """
-        complexity = self.complexity.all()
-        for c in complexity:
-            self.complexity.remove(c)
-            self.save()
+        self.complexity.clear()
+        CategoryIndex.update_problem(self.problem_id, "complexity", [])
 
     def add_language(self, langs):
         """
-        A helper function for adding new languages to the language field
-        :param paradigms: A string representing the languages which should be on the field
-        :return: The saved object
+        A helper function for setting the languages on the language field
+        :param langs: A string representing the languages which should be on the field
+        :return: None
         """
-        if self.language:
-            self.remove_languages()
-        for lang in langs.split(','):
-            if lang == '' or lang == ' ':
-                pass
-            else:
-                language, l = Category.objects.get_or_create(name=lang.strip().lower(), type="language")
-                self.language.add(language)
-        self.save()
+        categories = Category.resolve(langs, "language")
+        self.language.set(categories)
+        CategoryIndex.update_problem(self.problem_id, "language", categories)
 
     def remove_languages(self):
         """
         A helper function to remove languages from the language field
-        :return: The saved object
+        :return: None
         """
-        languages = self.language.all()
-        for l in languages:
-            self.language.remove(l)
-        self.save()
+        self.language.clear()
+        CategoryIndex.update_problem(self.problem_id, "language", [])
 
     def add_algorithms(self, algorithms):
         """
-        A helper function for adding new algorithms to the algorithms field
-        :param paradigms: A string representing the algorithms which should be on the field
-        :return: The saved object
+        A helper function for setting the algorithms on the algorithms field
+        :param algorithms: A string representing the algorithms which should be on the field
+        :return: None
         """
-        if self.algorithms:
-            self.remove_algorithms()
-        for a in algorithms.split(','):
-            if a == '' or a == ' ':
-                pass
-            else:
-                algorithm, a = Category.objects.get_or_create(name=a.strip().lower(), type="algorithm")
-                self.algorithms.add(algorithm)
-        self.save()
+        categories = Category.resolve(algorithms, "algorithm")
+        self.algorithms.set(categories)
+        CategoryIndex.update_problem(self.problem_id, "algorithm", categories)
 
     def remove_algorithms(self):
         """
         A helper function to remove algorithms from the algorithms field
-        :return: The saved object
+        :return: None
         """
-        algorithms = self.algorithms.all()
-        for a in algorithms:
-            self.algorithms.remove(a)
-        self.save()
+        self.algorithms.clear()
+        CategoryIndex.update_problem(self.problem_id, "algorithm", [])
 
     def add_ds(self, data_structures):
         """
-        A helper function for adding new data structures to the data_structures field
-        :param paradigms: A string representing the data structures which should be on the field
-        :return: The saved object
+        A helper function for setting the data structures on the data_structures field
+        :param data_structures: A string representing the data structures which should be on the field
+        :return: None
         """
-        if self.data_structures:
-            self.remove_ds()
-        for ds in data_structures.split(','):
-            if ds == '' or ds == ' ':
-                pass
-            else:
-                data_structure, d = Category.objects.get_or_create(name=ds.strip().lower(), type="data-structure")
-                self.data_structures.add(data_structure)
-        self.save()
+        categories = Category.resolve(data_structures, "data-structure")
+        self.data_structures.set(categories)
+        CategoryIndex.update_problem(self.problem_id, "data-structure", categories)
 
     def remove_ds(self):
         """
         A helper function to remove data structures from the data_structures field
-        :return: The saved object
+        :return: None
         """
-        ds = self.data_structures.all()
-        for d in ds:
-            self.data_structures.remove(d)
-        self.save()
+        self.data_structures.clear()
+        CategoryIndex.update_problem(self.problem_id, "data-structure", [])
 
     def all_defaults(self):
         """
@@ -315,6 +376,42 @@ class Solution(models.Model):
         return categories
 
 
+class CategoryIndex(models.Model):
+    """
+    A model denormalising the categorisation of problems and their solutions into a single inverted index, keyed by the
+    type and name of each category. It is kept current by the category helpers on Problem and Solution.
+    """
+    problem = models.ForeignKey(Problem)
+    type = models.CharField(max_length=200)
+    name = models.CharField(max_length=200)
+
+    class Meta:
+        unique_together = ['type', 'name', 'problem']
+
+    @classmethod
+    def update_problem(cls, problem_id, category_type, categories):
+        """
+        A helper method for replacing the index entries of one type of categorisation for a problem
+        :param problem_id: The unique identifier for the problem whose entries should be replaced
+        :param category_type: The type of category being indexed, e.g. "paradigm" or "data-structure"
+        :param categories: The Category objects the problem now belongs to for this type
+        :return: None
+        """
+        cls.objects.filter(problem_id=problem_id, type=category_type).delete()
+        names = set(c.name for c in categories)
+        cls.objects.bulk_create([cls(problem_id=problem_id, type=category_type, name=name) for name in names])
+
+    @classmethod
+    def problems_in(cls, category_type, names):
+        """
+        A helper method for looking up the problems which belong to any of the given categories
+        :param category_type: The type of category being searched, e.g. "paradigm" or "data-structure"
+        :param names: A list of the names of the categories being searched
+        :return: A queryset of problem ids, suitable for use in an id__in filter
+        """
+        return cls.objects.filter(type=category_type, name__in=names).values('problem_id')
+
+
 class Challenge(models.Model):
     """
     A model storing all of the data necessary to manage a challenge
@@ -323,3 +420,88 @@ class Challenge(models.Model):
     date = models.DateField()
     time = models.TimeField(default=datetime.time(0))
     problems = models.ManyToManyField(Problem)
+
+
+class IngestionJob(models.Model):
+    """
+    A model representing the parsing of an uploaded problem and/or solution PDF. Jobs are queued by the upload page and
+    processed in the background by the ingestion workers (see the run_ingestion_workers command). The workers run apart
+    from the web server, so the uploaded PDFs are kept with the job until it finishes, and are only loaded by the worker
+    which parses them.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+    # the number of times a job is claimed before it is failed, if its workers keep stopping before it finishes
+    MAX_ATTEMPTS = 3
+    created_by = models.ForeignKey(User)
+    status = models.CharField(max_length=20, choices=STATUSES, default=PENDING, db_index=True)
+    problem_pdf = models.BinaryField(null=True, blank=True)
+    solution_pdf = models.BinaryField(null=True, blank=True)
+    result = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    # the fields holding the uploaded PDFs, which pages showing the progress of a job leave unloaded
+    PDF_FIELDS = ['problem_pdf', 'solution_pdf']
+
+    @classmethod
+    def claim_next(cls):
+        """
+        A helper method for taking the oldest pending job off the queue. Safe to call from several workers at once.
+        :return: The claimed job, now marked as running, or None if there are no pending jobs
+        """
+        while True:
+            job_id = cls.objects.filter(status=cls.PENDING).order_by('id').values_list('id', flat=True).first()
+            if job_id is None:
+                return None
+            claimed = cls.objects.filter(id=job_id, status=cls.PENDING).update(status=cls.RUNNING,
+                                                                               started=timezone.now(),
+                                                                               attempts=models.F('attempts') + 1)
+            if claimed:
+                return cls.objects.get(id=job_id)
+
+    @classmethod
+    def recover_stale(cls, timeout, exclude=()):
+        """
+        A helper method for recovering jobs which are still marked as running long after they were claimed, because
+        the worker running them stopped before recording their outcome. Such jobs are queued again, unless they have
+        been claimed MAX_ATTEMPTS times, in which case they are failed.
+        :param timeout: The number of seconds since being claimed after which a running job is stale
+        :param exclude: The ids of jobs which should be left alone, e.g. those still being run by the caller
+        :return: The number of jobs recovered
+        """
+        cutoff = timezone.now() - datetime.timedelta(seconds=timeout)
+        stale = cls.objects.filter(status=cls.RUNNING, started__lt=cutoff).exclude(id__in=list(exclude))
+        requeued = stale.filter(attempts__lt=cls.MAX_ATTEMPTS).update(status=cls.PENDING, started=None)
+        # the jobs which were queued again are no longer running, so only those out of attempts are left
+        failed = stale.update(status=cls.FAILED, error='The PDF could not be processed.', finished=timezone.now(),
+                              problem_pdf=None, solution_pdf=None)
+        return requeued + failed
+
+    def finish(self, result=None, error=''):
+        """
+        A helper method for recording the outcome of a job. The uploaded PDFs are discarded, as they are no longer needed.
+        :param result: A dictionary of the data parsed from the PDFs, if the job succeeded
+        :param error: A description of what went wrong, if the job failed
+        :return: None
+        """
+        self.problem_pdf = None
+        self.solution_pdf = None
+        self.status = self.FAILED if error else self.DONE
+        self.result = json.dumps(result) if result is not None else ''
+        self.error = error
+        self.finished = timezone.now()
+        self.save()
+
+    def get_result(self):
+        """
+        A helper method for reading the data parsed from the PDFs
+        :return: A dictionary with 'problem' and 'solution' keys, each holding the parsed data or None
+        """
+        return json.loads(self.result) if self.result else {'problem': None, 'solution': None}
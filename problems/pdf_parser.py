@@ -0,0 +1,354 @@
+"""
+Extraction of the problems and solutions in uploaded PDFs.
+
+These functions only depend on the PDF itself, so they can run outside of a request, e.g. in the ingestion workers.
+"""
+import multiprocessing
+from io import BytesIO
+from itertools import chain
+
+from PyPDF2 import PdfFileReader, utils
+from PyPDF2.cache import StreamCache
+
+# the headings of each kind of PDF, mapped to the string which ends each line of text under them
+PROBLEM_HEADINGS = {
+    'problem description': '\n',
+    'sample input': '\n',
+    'sample output': '\n',
+    'paradigms': '\n',
+}
+SOLUTION_HEADINGS = {
+    'complexity': '\n',
+    'links': '\n',
+    'example code': '\n',
+    'time limit': ',',
+    'languages': ',',
+    'algorithms': ',',
+    'data structures': ',',
+}
+
+# the approximate number of bytes of objects each reader keeps once they have been read, and of decoded stream data,
+# such as page contents, so that the memory used to read a PDF does not grow with its number of pages
+READER_CACHE_BYTES = 8 * 1024 * 1024
+STREAM_CACHE_BYTES = 8 * 1024 * 1024
+
+# the most bytes that any stream of an uploaded PDF may decode to, so that a small, highly compressed upload cannot
+# exhaust memory
+MAX_STREAM_BYTES = 64 * 1024 * 1024
+
+# extract_text_parallel extracts the text of PDFs with at least this many pages in several processes; starting the
+# processes and opening the PDF in each of them takes longer than extracting a few pages
+PARALLEL_MIN_PAGES = 32
+
+# the number of page ranges given to each process, so that a process which finishes early can take another range
+RANGES_PER_WORKER = 4
+
+# the reader of the PDF opened by each process of extract_text_parallel
+_worker_reader = None
+
+
+def parse_solution_pdf(source):
+    """
+    Parses a PDF containing the solution to a problem
+    :param source: The name of the file to be parsed, the contents of the PDF, or a binary file object (see open_pdf)
+    :return: A dictionary containing the initial data for the solution form, along with strings representing the
+    languages, algorithms, data structures and complexities by which the solution has been categorised
+    """
+    return parse_solution_lines(read_pdf_lines(source)[1])
+
+
+def parse_solution_lines(lines):
+    """
+    Parses the text of a PDF containing the solution to a problem
+    :param lines: An iterable of the lines of the PDF (see read_pdf_lines)
+    :return: See parse_solution_pdf
+    """
+    sections = read_sections(lines, SOLUTION_HEADINGS)
+    solution_description = sections[None]
+    complexity = sections['complexity']
+    links = sections['links']
+    example_code = sections['example code']
+    language = sections['languages']
+    data_structures = sections['data structures']
+    algorithms = sections['algorithms']
+    time_limit = sections['time limit']
+
+    reject_char = [' ', '', '\n']
+    # clean up languages
+    temp_language = ""
+    for l in language.split(','):
+        if l in reject_char:
+            pass
+        else:
+            temp_language += l + ','
+    language = temp_language[:-1]
+    # clean up complexity
+    temp_complexity = ""
+    for c in complexity.split(','):
+        if c in reject_char:
+            pass
+        else:
+            temp_complexity += c + ','
+    complexity = temp_complexity[:-1]
+    # clean up datastructures input
+    temp_ds = ""
+    for ds in data_structures.split(','):
+        if ds in reject_char:
+            pass
+        else:
+            temp_ds += ds + ','
+    data_structures = temp_ds[:-1]
+    # clean up time limit input
+    for char in time_limit:
+        try:
+            int(char)
+        except ValueError:
+            if char == '.':
+                pass
+            else:
+                time_limit = time_limit.replace(char, '')
+    if time_limit == '.':
+        time_limit = float(0)
+
+    return {
+        'solution_description': solution_description if solution_description != "" else "No solution description has been provided.",
+        'links': links.strip() if links != "" else "No links.",
+        'example_code': example_code if example_code != "" else "No example solution code.",
+        'time_limit': time_limit if time_limit != "" else 0,
+        'languages': language.strip(),
+        'algorithms': algorithms.strip(),
+        'data_structures': data_structures.strip(),
+        'complexity': complexity.strip(),
+    }
+
+
+def parse_problem_pdf(source):
+    """
+    Parses a PDF of a problem
+    :param source: The name of the file containing the problem, the contents of the PDF, or a binary file object (see
+    open_pdf)
+    :return: A dictionary containing the initial data for the problem and content forms, along with a string
+    representing the paradigms by which the problem should be categorised
+    """
+    return parse_problem_lines(read_pdf_lines(source)[1])
+
+
+def parse_problem_lines(lines):
+    """
+    Parses the text of a PDF of a problem
+    :param lines: An iterable of the lines of the PDF (see read_pdf_lines)
+    :return: See parse_problem_pdf
+    """
+    lines = iter(lines)
+    title = next(lines, None)
+    first_line = next(lines, None)
+    if first_line is None:
+        raise ValueError('The PDF does not contain a title followed by the problem')
+    sections = read_sections(chain([first_line], lines), PROBLEM_HEADINGS)
+    problem_description = sections['problem description']
+    sample_input = sections['sample input']
+    sample_output = sections['sample output']
+    paradigms = sections['paradigms']
+
+    return {
+        'title': title,
+        'problem_description': problem_description,
+        'example_input': sample_input if sample_input != "" else "No sample input provided.",
+        'example_output': sample_output if sample_output != "" else "No sample output provided.",
+        'paradigms': paradigms,
+    }
+
+
+def open_pdf(source):
+    """
+    Opens a PDF for reading. PDFs which are already in memory, or already open, are read from where they are rather than
+    being written out to a file first.
+    :param source: The name of the file, the contents of the PDF as bytes, or a seekable binary file object (e.g. an
+    uploaded file)
+    :return: A tuple of (a seekable binary stream of the PDF, True if the stream was opened here and must be closed)
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        # wrapping bytes in BytesIO shares the buffer instead of copying it
+        return BytesIO(source), True
+    if hasattr(source, 'read'):
+        source.seek(0)
+        return source, False
+    # files are memory-mapped so that the reader can tokenize them in place. The reader's objects may still refer to
+    # the map after it is done, so it is left to be closed when they are garbage collected.
+    return utils.mapFile(source), False
+
+
+def open_reader(pdf_file):
+    """
+    Creates a reader for a PDF, with the limits on the memory it may use. Decoded streams are kept in a cache of their
+    own, and their encoded data is dropped once they are decoded (and read again if they are evicted), so that only one
+    copy of each is held.
+    :param pdf_file: A seekable binary stream of the PDF (see open_pdf)
+    :return: A PdfFileReader, whose getCacheStats and getStreamCacheStats report the memory taken up by its caches
+    """
+    return PdfFileReader(pdf_file, maxCachedBytes=READER_CACHE_BYTES, maxStreamLength=MAX_STREAM_BYTES,
+                         streamCache=StreamCache(STREAM_CACHE_BYTES, dropEncoded=True))
+
+
+def read_pdf_lines(source):
+    """
+    Reads the text of a PDF (see extract_text)
+    :param source: The name of the file to be read in, the contents of the PDF, or a binary file object (see open_pdf)
+    :return: A tuple of (the number of pages, a list containing the contents of the PDF on a line-by-line basis)
+    """
+    num_pages, texts = extract_text(source)
+    return num_pages, [line for text in texts for line in reassemble_lines(text.split('\n'))]
+
+
+def extract_text(source):
+    """
+    Extracts the text of every page of a PDF in this process, by a single reader. This is how the PDFs of the ingestion
+    jobs and of import_pdfs are read: both already parse several PDFs side by side, in daemonic processes which cannot
+    start processes of their own.
+    :param source: The name of the file, the contents of the PDF, or a binary file object (see open_pdf)
+    :return: A tuple of (the number of pages, a list of the text of each page, in order)
+    """
+    pdf_file, opened = open_pdf(source)
+    try:
+        texts = list(open_reader(pdf_file).iterPageText(release=True))
+    finally:
+        if opened:
+            pdf_file.close()
+    # the pages are counted as they are read, which corrects the count of a page tree which gives the wrong number
+    return len(texts), texts
+
+
+def extract_text_parallel(source, workers=None):
+    """
+    Extracts the text of every page of a PDF in a pool of processes, each of which opens the PDF itself and extracts
+    disjoint ranges of its pages. PDFs with fewer than PARALLEL_MIN_PAGES pages, or a single worker, are extracted in
+    this process instead (see extract_text). Neither the ingestion jobs nor import_pdfs use this, as they run in
+    daemonic processes; it is for reading a single large PDF from a process which is not daemonic, such as a
+    management command (see benchmark_pdf_reader).
+    :param source: The name of the file, the contents of the PDF, or a binary file object (see open_pdf)
+    :param workers: The number of processes, by default the number of CPUs
+    :return: See extract_text
+    """
+    pdf_file, opened = open_pdf(source)
+    try:
+        reader = open_reader(pdf_file)
+        num_pages = reader.getNumPages()
+        workers = min(workers or multiprocessing.cpu_count(), num_pages)
+        if num_pages < PARALLEL_MIN_PAGES or workers <= 1:
+            texts = list(reader.iterPageText(release=True))
+            return len(texts), texts
+        if hasattr(source, 'read'):
+            # file objects cannot be shared with other processes, so the PDF is read into memory
+            pdf_file.seek(0)
+            source = pdf_file.read()
+        elif isinstance(source, (bytearray, memoryview)):
+            # the contents are sent to each process, and memoryviews cannot be pickled
+            source = bytes(source)
+    finally:
+        if opened:
+            pdf_file.close()
+    return num_pages, _extract_text_pool(source, num_pages, workers)
+
+
+def _extract_text_pool(source, num_pages, workers):
+    """
+    Extracts the text of every page of a PDF in a pool of processes
+    :param source: The name of the file, which each process memory-maps, or the contents of the PDF as bytes
+    :param num_pages: The number of pages in the PDF
+    :param workers: The number of processes
+    :return: A list of the text of each page, in order
+    """
+    # ceiling division, so that there are at most RANGES_PER_WORKER ranges per process
+    range_size = -(-num_pages // (workers * RANGES_PER_WORKER))
+    ranges = [(start, min(start + range_size, num_pages)) for start in range(0, num_pages, range_size)]
+    pool = multiprocessing.Pool(workers, initializer=_open_worker_reader, initargs=(source,))
+    try:
+        # map returns the results in the order of the ranges, whichever process finishes first
+        texts = pool.map(_extract_worker_range, ranges)
+    finally:
+        pool.close()
+        pool.join()
+    return [text for range_texts in texts for text in range_texts]
+
+
+def _open_worker_reader(source):
+    """
+    Opens the PDF in a process of extract_text_parallel
+    :param source: The name of the file or the contents of the PDF
+    """
+    global _worker_reader
+    pdf_file, opened = open_pdf(source)
+    _worker_reader = open_reader(pdf_file)
+
+
+def _extract_worker_range(page_range):
+    """
+    Extracts the text of a range of pages in a process of extract_text_parallel
+    :param page_range: A tuple of (the number of the first page, the number of the page after the last)
+    :return: A list of the text of each page in the range
+    """
+    start, stop = page_range
+    return list(_worker_reader.iterPageText(release=True, start=start, stop=stop))
+
+
+def reassemble_lines(list_of_lines):
+    """
+    Joins the fragments of text extracted from a page back into lines. Fragments are joined until a blank line (' ')
+    is reached, which is dropped, except that a fragment followed directly by a blank line is kept as it is, along with
+    the blank line.
+    :param list_of_lines: The text of a page, split on newlines
+    :return: A generator of the reassembled lines of the page
+    """
+    max_index = len(list_of_lines) - 1
+    line = 0
+    while line <= max_index:
+        # last line of the page, or a line followed by a blank line: keep it as it is
+        if line == max_index or list_of_lines[line + 1] == ' ':
+            for section in list_of_lines[line:line + 2]:
+                yield section
+            line += 2
+        else:
+            end = line
+            while end <= max_index and list_of_lines[end] != ' ':
+                end += 1
+            yield ''.join(list_of_lines[line:end])
+            # continue from the line after the blank one
+            line = end + 1
+
+
+def split_sections(lines, headings):
+    """
+    Splits the lines of a PDF into the sections under each heading, in a single pass
+    :param lines: An iterable of the lines of the PDF
+    :param headings: A collection of the lowercase headings which start a section
+    :return: A generator of tuples of the form (lowercase heading, list of the lines in its section). The lines before
+    the first heading are yielded under the heading None.
+    """
+    heading = None
+    section = []
+    for line in lines:
+        lowered = line.lower()
+        if lowered in headings:
+            yield heading, section
+            heading = lowered
+            section = []
+        else:
+            section.append(line)
+    yield heading, section
+
+
+def read_sections(lines, headings):
+    """
+    Reads the text under each heading of a PDF. A heading which appears more than once has the text of every section
+    it starts.
+    :param lines: An iterable of the lines of the PDF
+    :param headings: A dictionary of the lowercase headings which start a section, each mapped to the string which
+    ends every line of that section
+    :return: A dictionary mapping None (the text before the first heading) and every heading to its text
+    """
+    sections = dict((heading, "") for heading in headings)
+    sections[None] = ""
+    for heading, section in split_sections(lines, headings):
+        separator = headings.get(heading, '\n')
+        sections[heading] += ''.join(line + separator for line in section)
+    return sections
@@ -0,0 +1,51 @@
+"""
+Rendering of the markdown fields of problems and solutions to HTML.
+
+Rendered HTML is cached under a hash of the markdown source and the renderer configuration, so text which has been
+rendered before (for example the default "No links." strings) is never rendered twice.
+"""
+import hashlib
+
+import markdown2
+from django.core.cache import cache
+
+MARKDOWN_EXTRAS = ["fenced-code-blocks"]
+
+# identifies the output of the renderer; changing the markdown2 version or the extras changes every cache key
+RENDERER_VERSION = '%s:%s' % (markdown2.__version__, ','.join(sorted(MARKDOWN_EXTRAS)))
+
+# rendered HTML only depends on its source, so cached entries never go stale
+CACHE_TIMEOUT = None
+
+
+def markdown_to_html(source):
+    """
+    Renders markdown to HTML, bypassing the cache
+    :param source: A string with markdown formatting
+    :return: An HTML friendly version of the original string
+    """
+    return markdown2.markdown(source, extras=MARKDOWN_EXTRAS)
+
+
+def cache_key(source):
+    """
+    Creates the cache key for the rendered version of some markdown
+    :param source: A string with markdown formatting
+    :return: A string which identifies the source and the renderer configuration
+    """
+    digest = hashlib.sha1((RENDERER_VERSION + '\0' + source).encode('utf-8')).hexdigest()
+    return 'markdown:' + digest
+
+
+def render_markdown(source):
+    """
+    Renders markdown to HTML, reusing the cached HTML if the same source has been rendered before
+    :param source: A string with markdown formatting
+    :return: An HTML friendly version of the original string
+    """
+    key = cache_key(source)
+    html = cache.get(key)
+    if html is None:
+        html = markdown_to_html(source)
+        cache.set(key, html, CACHE_TIMEOUT)
+    return html
@@ -0,0 +1,133 @@
+"""
+Full-text search over the text of problems and their solutions.
+
+The text is kept in an SQLite FTS5 table (created by migration 0003), with one row per problem whose rowid is the id of
+the problem. Each model updates its own columns of that row when it is saved, and searches are ranked with BM25.
+"""
+import re
+
+from django.db import connection
+
+FULLTEXT_TABLE = 'problems_fulltext'
+
+# the indexed columns, in table order, along with the weight each has when ranking results
+FULLTEXT_COLUMNS = [
+    ('title', 10.0),
+    ('problem_description', 2.0),
+    ('example_input', 1.0),
+    ('example_output', 1.0),
+    ('solution_description', 1.0),
+]
+
+# the maximum number of ranked results returned by a single search
+SEARCH_LIMIT = 1000
+
+WORD_REGEX = re.compile(r'\w+', re.UNICODE)
+
+
+def fulltext_enabled():
+    """
+    Determines whether the database supports the full-text index
+    :return: True if the database is SQLite, otherwise False
+    """
+    return connection.vendor == 'sqlite'
+
+
+def index_problem(problem_id, **fields):
+    """
+    Updates the full-text index entry for a problem. Only the columns which are given are changed.
+    :param problem_id: The unique identifier for the problem
+    :param fields: The new text for each column to be updated, e.g. title="..."
+    :return: None
+    """
+    if not fulltext_enabled() or not fields:
+        return
+    columns = list(fields.keys())
+    values = [fields[column] or '' for column in columns]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'UPDATE %s SET %s WHERE rowid = %%s' % (FULLTEXT_TABLE, ', '.join('%s = %%s' % c for c in columns)),
+            values + [problem_id])
+        if cursor.rowcount == 0:
+            cursor.execute(
+                'INSERT INTO %s (rowid, %s) VALUES (%%s, %s)' % (FULLTEXT_TABLE, ', '.join(columns),
+                                                                ', '.join(['%s'] * len(columns))),
+                [problem_id] + values)
+
+
+def index_problems(entries):
+    """
+    Replaces the full-text index entries of many problems at once, with a single delete and a single insert
+    :param entries: A list of tuples of the form (problem id, dictionary of the text of every column)
+    :return: None
+    """
+    if not fulltext_enabled() or not entries:
+        return
+    columns = [column for column, weight in FULLTEXT_COLUMNS]
+    with connection.cursor() as cursor:
+        cursor.executemany('DELETE FROM %s WHERE rowid = %%s' % FULLTEXT_TABLE,
+                           [[problem_id] for problem_id, fields in entries])
+        cursor.executemany(
+            'INSERT INTO %s (rowid, %s) VALUES (%%s, %s)' % (FULLTEXT_TABLE, ', '.join(columns),
+                                                            ', '.join(['%s'] * len(columns))),
+            [[problem_id] + [fields.get(column) or '' for column in columns] for problem_id, fields in entries])
+
+
+def unindex_problem(problem_id):
+    """
+    Removes a problem from the full-text index
+    :param problem_id: The unique identifier for the problem
+    :return: None
+    """
+    if not fulltext_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM %s WHERE rowid = %%s' % FULLTEXT_TABLE, [problem_id])
+
+
+def match_expression(terms):
+    """
+    Converts the terms typed by a user into an FTS5 query which matches problems containing every word
+    :param terms: A string of search terms
+    :return: A string suitable for the right hand side of MATCH, or an empty string if there are no words to search
+    """
+    return ' '.join('"%s"' % word for word in WORD_REGEX.findall(terms))
+
+
+def ranked_problem_ids(terms, problems=None, limit=SEARCH_LIMIT):
+    """
+    Searches the full-text index. The problems are restricted to the given queryset within the ranked query, so that
+    the limit applies to the problems which are actually shown.
+    :param terms: A string of search terms
+    :param problems: A queryset of the problems which may be returned (e.g. those matching the other filters), or None
+    for any problem
+    :param limit: The maximum number of results
+    :return: A list of the ids of the matching problems, from the most to the least relevant
+    """
+    expression = match_expression(terms)
+    if not fulltext_enabled() or not expression:
+        return []
+    weights = ', '.join(str(weight) for column, weight in FULLTEXT_COLUMNS)
+    where = '{table} MATCH %s'
+    params = [expression]
+    if problems is not None:
+        subquery, subquery_params = problems.values_list('id', flat=True).order_by().query.sql_with_params()
+        where += ' AND rowid IN ({subquery})'
+        params.extend(subquery_params)
+    else:
+        subquery = ''
+    with connection.cursor() as cursor:
+        cursor.execute(
+            ('SELECT rowid FROM {table} WHERE ' + where + ' ORDER BY bm25({table}, {weights}) LIMIT %s')
+            .format(table=FULLTEXT_TABLE, weights=weights, subquery=subquery),
+            params + [limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def is_searchable(terms):
+    """
+    Determines whether a full-text search can be run for the terms typed by a user
+    :param terms: A string of search terms
+    :return: True if the full-text index is available and the terms contain at least one word, otherwise False
+    """
+    return fulltext_enabled() and bool(match_expression(terms))
@@ -1,3 +1,1454 @@
-from django.test import TestCase
+import base64
+import binascii
+import multiprocessing
+import datetime
+import hashlib
+import os
+import shutil
+import tempfile
+import warnings
+import zlib
+from io import BytesIO, StringIO
+from random import Random
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.db import IntegrityError, connection
+from django.db.models.query import QuerySet
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from PyPDF2 import PdfFileReader, filters, xref
+from PyPDF2.cache import ObjectCache, StreamCache, approximateSize
+from PyPDF2.generic import (ArrayObject, ByteStringObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject,
+                            IndirectObject, NameObject, NumberObject)
+from PyPDF2.pdf import ContentStream
+from PyPDF2.utils import MappedFile, PdfReadError, PdfStreamError, mapFile, readBytes
+from PyPDF2.xref import ObjectStreamView, XrefTable, XrefView
+
+from . import pdf_parser, rendering, search, views
+from .management.commands import import_pdfs
+from .management.commands.benchmark_pdf_reader import generate_pdf
+from .ingestion import IngestionWorker
+from .models import Account, Category, CategoryIndex, Content, IngestionJob, Problem, Solution
+
+
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+
+# digests of the cross-reference entries, and of the text of every page, which the original PyPDF2 read from each of
+# the example PDFs (see example_xref_digest and example_text_digest)
+EXAMPLE_DIGESTS = {
+    'ShoppingMalls.pdf': ('06a64a1bdfe80f1283a3439a21b53c14770e551f', '5246ba155d2bd97e7d8097a9815d0885db92addf'),
+    'columned_example.pdf': ('0a874cb4ecb938ece2b3873a6aca402000b0dd1f', '21478dc0e0dd1853d619c5182743b96070d268af'),
+    'multiple_cover_page_example.pdf': ('06551145e3d7f0f74f8abc0220f0979b57cd39e6',
+                                        'a9e46cd249d02b26caf9fb0910046af89ebe66c2'),
+    'no_title_example.pdf': ('46e75ce3e7ca5b0d2d402d0bc6e76d889cd3d111', '652c1478483b4b9fbf6b9cbe60878fe7b30e05b2'),
+    'origin_example.pdf': ('42fff666de16877eb0239bfdeeae59be81040dea', '783e2adf27a97bb8fbcd19fb488c16c0663c5486'),
+    'single_example.pdf': ('bf2bfb2004ce5dafd2eae1bab1fbc19f7df64cb1', '562541dc68afbb063fc369a15b914003f1dddc6f'),
+    'single_with_image_example.pdf': ('1413953f5fd6120b29db4f41af00a401e5320419',
+                                      'e1ae15840075224d5eadc75c0d3132ebcc6e8b3e'),
+    'single_with_solution.pdf': ('bfcae037d6c4c5a5e480d6a42d5ca84d1d402b74',
+                                 'eb9c545e073f68ba9cb7472a50a53675a73dc9e1'),
+}
+
+
+def example_path(name):
+    """
+    :return: The path of one of the example PDFs
+    """
+    return os.path.join(EXAMPLES_DIRECTORY, name)
+
+
+def example_xref_digest(reader):
+    """
+    :return: A digest of the cross-reference entries of a reader, both of uncompressed and of compressed objects
+    """
+    entries = sorted((generation, number, offset) for generation in reader.xref
+                     for number, offset in reader.xref[generation].items())
+    compressed = sorted((number, tuple(entry)) for number, entry in reader.xref_objStm.items())
+    return hashlib.sha1(repr((entries, compressed)).encode('ascii')).hexdigest()
+
+
+def example_text_digest(texts):
+    """
+    :param texts: An iterable of the text of each page of a PDF
+    :return: A digest of the text
+    """
+    return hashlib.sha1(''.join(text + '\n=====PAGE=====\n' for text in texts).encode('utf-8')).hexdigest()
+
+
+def make_pdf(bodies):
+    """
+    Builds a PDF with a cross-reference table
+    :param bodies: The body of each object, as bytes, starting with object 1, which must be the catalog
+    :return: The contents of the PDF
+    """
+    output = BytesIO()
+    output.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(bodies, 1):
+        offsets.append(output.tell())
+        output.write(('%d 0 obj\n' % number).encode('ascii') + body + b'\nendobj\n')
+    xref_offset = output.tell()
+    output.write(('xref\n0 %d\n0000000000 65535 f \n' % (len(bodies) + 1)).encode('ascii'))
+    output.write(b''.join(('%010d 00000 n \n' % offset).encode('ascii') for offset in offsets))
+    output.write(('trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                  % (len(bodies) + 1, xref_offset)).encode('ascii'))
+    return output.getvalue()
+
+
+def stream_body(data, filters=''):
+    """
+    :param data: The encoded data of a stream
+    :param filters: The /Filter entry of the stream, if any
+    :return: The body of a stream object
+    """
+    entries = '/Length %d' % len(data) + (' /Filter %s' % filters if filters else '')
+    return ('<< %s >>\nstream\n' % entries).encode('ascii') + data + b'\nendstream'
+
+
+def encoded_stream(data, filter_name):
+    """
+    :return: An EncodedStreamObject of some encoded data and the name of its filter
+    """
+    stream = EncodedStreamObject()
+    stream._data = data
+    stream[NameObject('/Filter')] = NameObject(filter_name)
+    return stream
+
+
+def deflate_bomb(megabytes):
+    """
+    :return: A deflate stream which inflates to a number of megabytes of zeros
+    """
+    compressor = zlib.compressobj(9)
+    return b''.join(compressor.compress(b'\0' * (1 << 20)) for i in range(megabytes)) + compressor.flush()
+
+
+def two_page_pdf(root_count, kid_count=None):
+    """
+    Builds a PDF with two pages, whose page tree may give the wrong number of pages
+    :param root_count: The /Count of the root of the page tree
+    :param kid_count: The /Count of a page tree node between the root and the pages, or None for the pages to be kids of
+    the root
+    :return: The contents of the PDF
+    """
+    bodies = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        ('<< /Type /Pages /Kids [%s] /Count %d >>' % ('3 0 R 4 0 R' if kid_count is None else '7 0 R',
+                                                     root_count)).encode('ascii'),
+        b'<< /Type /Page /Parent 2 0 R /Contents 5 0 R >>',
+        b'<< /Type /Page /Parent 2 0 R /Contents 6 0 R >>',
+        stream_body(b'BT (page one) Tj ET'),
+        stream_body(b'BT (page two) Tj ET'),
+    ]
+    if kid_count is not None:
+        bodies.append(('<< /Type /Pages /Parent 2 0 R /Kids [3 0 R 4 0 R] /Count %d >>' % kid_count).encode('ascii'))
+    return make_pdf(bodies)
+
+
+def text_pdf(pages):
+    """
+    Builds a PDF of lines of text
+    :param pages: A list of the lines of text on each page
+    :return: The contents of the PDF
+    """
+    bodies = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        ('<< /Type /Pages /Kids [%s] /Count %d >>'
+         % (' '.join('%d 0 R' % (3 + 2 * i) for i in range(len(pages))), len(pages))).encode('ascii'),
+    ]
+    for i, lines in enumerate(pages):
+        bodies.append(('<< /Type /Page /Parent 2 0 R /Contents %d 0 R >>' % (4 + 2 * i)).encode('ascii'))
+        bodies.append(stream_body(b'BT ' + b' T* '.join(b'(' + line.encode('ascii') + b') Tj' for line in lines)
+                                  + b' ET'))
+    return make_pdf(bodies)
+
+
+def problem_pdf(title, paradigms='graphs'):
+    """
+    :return: The contents of a problem PDF
+    """
+    return text_pdf([[title, ' ', 'Problem Description', ' ', 'Find the path from %s.' % title, ' ', 'Paradigms', ' ',
+                      paradigms, ' ']])
+
+
+def solution_pdf(languages='python'):
+    """
+    :return: The contents of a solution PDF
+    """
+    return text_pdf([['Use a queue.', ' ', 'Languages', ' ', languages, ' ', 'Time Limit', ' ', '1.5', ' ']])
+
+
+def create_problem(user, title, public=True, difficulty=0, paradigms='', languages='', algorithms='',
+                   data_structures='', complexity=''):
+    """
+    Creates a problem, along with its content and solution, in the same way as the Add Problem page
+    :return: The problem
+    """
+    problem = Problem.objects.create(created_by=user, title=title, problem_privacy=not public, difficulty=difficulty)
+    Content.objects.create(problem=problem, problem_description='The %s problem.' % title)
+    solution = Solution.objects.create(problem=problem, solution_privacy=not public)
+    problem.add_paradigms(paradigms)
+    solution.add_language(languages)
+    solution.add_algorithms(algorithms)
+    solution.add_ds(data_structures)
+    solution.add_complexity(complexity)
+    return problem
+
+
+def content_stream(data, text_only=False):
+    """
+    :return: A ContentStream of some data
+    """
+    stream = DecodedStreamObject()
+    stream.setData(data)
+    return ContentStream(stream, None, text_only)
+
+
+def operation_types(operations):
+    """
+    :return: The operations of a content stream, with the type of each operand
+    """
+    return [([(type(operand).__name__, operand) for operand in operands], operator)
+            for operands, operator in operations]
+
+
+def png_predict(data, row_length, bytes_per_pixel, filter_types):
+    """
+    Applies PNG filters to some data, one byte at a time
+    :param filter_types: The filter of each row, repeated as needed
+    :return: The filtered rows, each starting with its filter byte
+    """
+    rows = [bytearray(data[i:i + row_length]) for i in range(0, len(data), row_length)]
+    output = bytearray()
+    for number, row in enumerate(rows):
+        previous = rows[number - 1] if number else bytearray(row_length)
+        filter_type = filter_types[number % len(filter_types)]
+        output.append(filter_type)
+        for i, byte in enumerate(row):
+            left = row[i - bytes_per_pixel] if i >= bytes_per_pixel else 0
+            up = previous[i]
+            up_left = previous[i - bytes_per_pixel] if i >= bytes_per_pixel else 0
+            estimate = left + up - up_left
+            paeth = min((abs(estimate - left), 0, left), (abs(estimate - up), 1, up),
+                        (abs(estimate - up_left), 2, up_left))[2]
+            predicted = [0, left, up, (left + up) // 2, paeth][filter_type]
+            output.append((byte - predicted) & 0xff)
+    return bytes(output)
+
+
+def tiff_predict(data, row_length, colors, bits_per_component, columns):
+    """
+    Applies TIFF predictor 2 to some data, one component at a time
+    :return: The predicted data
+    """
+    mask = (1 << bits_per_component) - 1
+    output = bytearray()
+    for start in range(0, len(data), row_length):
+        row = int.from_bytes(data[start:start + row_length], 'big')
+        count = row_length * 8 // bits_per_component
+        components = [(row >> (bits_per_component * (count - 1 - i))) & mask for i in range(count)]
+        # the bits after the last sample of a row are left as they are
+        differences = [(components[i] - (components[i - colors] if i >= colors else 0)) & mask
+                       if i < colors * columns else components[i] for i in range(count)]
+        output += sum(value << (bits_per_component * (count - 1 - i))
+                      for i, value in enumerate(differences)).to_bytes(row_length, 'big')
+    return bytes(output)
+
+
+def lzw_encode(data, early_change=1, clear_when_full=True):
+    """
+    Encodes some data with LZW, starting with a clear code
+    :param early_change: The /EarlyChange of the stream
+    :param clear_when_full: True to clear the table once it is full, or False to keep using it as it is
+    :return: The encoded data
+    """
+    codes = [(256, 9)]
+    state = {}
+
+    def clear():
+        state.update(table={bytes([i]): i for i in range(256)}, width=9, first=True,
+                     # the decoder adds each entry to its table one code later than the encoder does
+                     decoder_size=258)
+
+    def emit(code):
+        codes.append((code, state['width']))
+        if not state['first'] and state['decoder_size'] < 4096:
+            state['decoder_size'] += 1
+        state['first'] = False
+        if state['decoder_size'] + early_change >= 1 << state['width'] and state['width'] < 12:
+            state['width'] += 1
+
+    clear()
+    word = b''
+    for byte in data:
+        candidate = word + bytes([byte])
+        if candidate in state['table']:
+            word = candidate
+            continue
+        emit(state['table'][word])
+        if len(state['table']) < 4096 - 2:
+            state['table'][candidate] = len(state['table']) + 2
+        elif clear_when_full:
+            codes.append((256, state['width']))
+            clear()
+        word = bytes([byte])
+    if word:
+        emit(state['table'][word])
+    codes.append((257, state['width']))
+    value = 0
+    bits = 0
+    for code, width in codes:
+        value = (value << width) | code
+        bits += width
+    return (value << (-bits % 8)).to_bytes((bits + 7) // 8, 'big')
+
+
+class PageTreeTests(SimpleTestCase):
+    def setUp(self):
+        # the inconsistent trees are reported with a warning
+        catcher = warnings.catch_warnings()
+        catcher.__enter__()
+        self.addCleanup(catcher.__exit__)
+        warnings.simplefilter('ignore')
+
+    def test_correct_count(self):
+        reader = PdfFileReader(BytesIO(two_page_pdf(2)))
+        self.assertEqual(reader.getNumPages(), 2)
+        self.assertEqual(reader.getPage(1).extractText(), 'page two')
+        self.assertIsNone(reader.flattenedPages)
+
+    def test_root_count_too_high(self):
+        reader = PdfFileReader(BytesIO(two_page_pdf(3)))
+        self.assertEqual(reader.getNumPages(), 2)
+        self.assertEqual([reader.getPage(i).extractText() for i in range(reader.getNumPages())],
+                         ['page one', 'page two'])
+        self.assertEqual(list(PdfFileReader(BytesIO(two_page_pdf(3))).iterPageText()), ['page one', 'page two'])
+
+    def test_root_count_too_low(self):
+        reader = PdfFileReader(BytesIO(two_page_pdf(1)))
+        self.assertEqual(reader.getNumPages(), 2)
+        self.assertEqual(list(reader.iterPageText()), ['page one', 'page two'])
+
+    def test_node_count_wrong(self):
+        for count in (1, 3):
+            reader = PdfFileReader(BytesIO(two_page_pdf(count, count)))
+            # the node is only read once a page under it is needed
+            self.assertEqual(list(reader.iterPageText()), ['page one', 'page two'])
+            self.assertEqual(reader.getNumPages(), 2)
+
+
+class PageIterationTests(SimpleTestCase):
+    def setUp(self):
+        # the example PDFs have errors which the reader warns about
+        catcher = warnings.catch_warnings()
+        catcher.__enter__()
+        self.addCleanup(catcher.__exit__)
+        warnings.simplefilter('ignore')
+        self.pages = [['line %d of page %d' % (line, page) for line in range(3)] for page in range(5)]
+        self.pdf = text_pdf(self.pages)
+
+    def expected_text(self, start=0, stop=None):
+        return ['\n'.join(lines) for lines in self.pages[start:stop]]
+
+    def test_pages_match_get_page(self):
+        reader = PdfFileReader(BytesIO(self.pdf))
+        pages = list(reader.iterPages())
+        self.assertEqual(pages, [reader.getPage(i) for i in range(reader.getNumPages())])
+        self.assertEqual([page.extractText() for page in pages], self.expected_text())
+
+    def test_start_and_stop(self):
+        reader = PdfFileReader(BytesIO(self.pdf))
+        for start, stop in ((0, None), (2, None), (1, 3), (4, 100), (3, 3), (6, None)):
+            self.assertEqual(list(reader.iterPageText(start=start, stop=stop)), self.expected_text(start, stop))
+
+    def test_released_pages_are_read_again(self):
+        reader = PdfFileReader(BytesIO(self.pdf))
+        self.assertEqual(list(reader.iterPageText(release=True)), self.expected_text())
+        self.assertEqual(reader._pageObjects, {})
+        # neither the pages nor their content streams are kept
+        self.assertEqual(sorted(number for generation, number in reader.resolvedObjects), [1, 2])
+        self.assertEqual(list(reader.iterPageText(release=True)), self.expected_text())
+        self.assertEqual(reader.getPage(2).extractText(), self.expected_text(2, 3)[0])
+
+    def test_examples_match_the_original_reader(self):
+        for name, (xref_digest, text_digest) in sorted(EXAMPLE_DIGESTS.items()):
+            reader = PdfFileReader(example_path(name))
+            self.assertEqual(example_text_digest(reader.iterPageText(release=True)), text_digest, name)
+
+
+class StreamDecodingTests(SimpleTestCase):
+    def test_pieces_match_whole_stream(self):
+        data = bytes(bytearray(i * 7 % 251 for i in range(300000)))
+        stream = encoded_stream(zlib.compress(data), '/FlateDecode')
+        for chunk_size in (1, 1000, filters.CHUNK_SIZE, None):
+            self.assertEqual(b''.join(filters.iterDecodedStreamData(stream, None, chunk_size)), data)
+        self.assertEqual(stream.getData(), data)
+
+    def decode_in_pieces(self, stream, chunk_size):
+        return b''.join(filters.iterDecodedStreamData(stream, None, chunk_size))
+
+    def test_ascii85(self):
+        stream = encoded_stream(b'<~9jqo^BlbD-BleB1DJ+*+F(f,q~>', '/ASCII85Decode')
+        for chunk_size in (1, 2, 3, 7, None):
+            self.assertEqual(self.decode_in_pieces(stream, chunk_size), b'Man is distinguished')
+
+    def test_ascii85_zeros(self):
+        for data, decoded in ((b'z', b'\0' * 4), (b'z~>', b'\0' * 4), (b'<~z~>', b'\0' * 4),
+                              (b'9jqo^z~>', b'Man \0\0\0\0'), (b'zz!!~>', b'\0' * 9)):
+            stream = encoded_stream(data, '/ASCII85Decode')
+            self.assertEqual(filters.ASCII85Decode.decode(data), decoded)
+            # the z falls on either side of a chunk boundary
+            for chunk_size in (1, 2, 4, 5, None):
+                self.assertEqual(self.decode_in_pieces(stream, chunk_size), decoded)
+
+    def test_ascii85_zeros_inside_a_group(self):
+        for chunk_size in (1, None):
+            with self.assertRaises(PdfReadError):
+                self.decode_in_pieces(encoded_stream(b'!!z!!!~>', '/ASCII85Decode'), chunk_size)
+
+    def test_ascii85_round_trips(self):
+        data = bytes(Random(5).getrandbits(8) for i in range(5000)) + b'\0' * 12 + b'end'
+        encoded = base64.a85encode(data, wrapcol=75, adobe=True)
+        self.assertEqual(filters.ASCII85Decode.decode(encoded), data)
+        stream = encoded_stream(encoded, '/ASCII85Decode')
+        for chunk_size in (1, 3, 1000, None):
+            self.assertEqual(self.decode_in_pieces(stream, chunk_size), data)
+
+    def test_ascii_hex(self):
+        data = bytes(range(256)) * 20
+        hexadecimal = binascii.hexlify(data)
+        # whitespace anywhere is ignored, as is anything after the >
+        encoded = b' \n'.join(hexadecimal[i:i + 63] for i in range(0, len(hexadecimal), 63)).upper() + b'> 00'
+        self.assertEqual(filters.ASCIIHexDecode.decode(encoded), data)
+        stream = encoded_stream(encoded, '/ASCIIHexDecode')
+        for chunk_size in (1, 2, 63, None):
+            self.assertEqual(self.decode_in_pieces(stream, chunk_size), data)
+
+    def test_ascii_hex_odd_digits(self):
+        # a final odd digit is followed by a 0
+        for encoded in (b'4142 4>', b'41424'):
+            stream = encoded_stream(encoded, '/ASCIIHexDecode')
+            for chunk_size in (1, 2, None):
+                self.assertEqual(self.decode_in_pieces(stream, chunk_size), b'AB@')
+        with self.assertRaises(PdfReadError):
+            filters.ASCIIHexDecode.decode(b'41 4g>')
+
+    def test_deflate_bomb_is_stopped_at_the_limit(self):
+        stream = encoded_stream(deflate_bomb(64), '/FlateDecode')
+        stream.maxDecodedLength = 1 << 20
+        with self.assertRaisesRegex(PdfReadError, 'more than 1048576 bytes'):
+            stream.getData()
+        # nothing past the limit is decompressed
+        stage = filters._FlateStage(None, 1 << 20)
+        with self.assertRaises(PdfReadError):
+            for output in stage.decode(stream._data):
+                self.assertLessEqual(stage.length, (1 << 20) + 1)
+
+    def test_deflate_bomb_in_a_page_is_rejected(self):
+        pdf = make_pdf([
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+            b'<< /Type /Page /Parent 2 0 R /Contents 4 0 R >>',
+            stream_body(deflate_bomb(16), '/FlateDecode'),
+        ])
+        reader = PdfFileReader(BytesIO(pdf), maxStreamLength=1 << 20)
+        with self.assertRaises(PdfReadError):
+            reader.getPage(0).extractText()
+
+
+class PredictorTests(SimpleTestCase):
+    def setUp(self):
+        self.data = bytes(bytearray((i * 37 + (i // 7) * 11) % 256 for i in range(3 * 4 * 60)))
+
+    def assert_decodes(self, predicted, decode_parms, expected):
+        self.assertEqual(filters.undoPrediction(predicted, decode_parms['/Predictor'], decode_parms.get('/Colors', 1),
+                                                decode_parms.get('/BitsPerComponent', 8),
+                                                decode_parms['/Columns']), expected)
+        stream = encoded_stream(zlib.compress(predicted), '/FlateDecode')
+        stream[NameObject('/DecodeParms')] = DictionaryObject(
+            (NameObject(key), NumberObject(value)) for key, value in decode_parms.items())
+        self.assertEqual(filters.FlateDecode.decode(zlib.compress(predicted), stream['/DecodeParms']), expected)
+        # the rows are split across chunks
+        for chunk_size in (1, 7, 100):
+            self.assertEqual(b''.join(filters.iterDecodedStreamData(stream, None, chunk_size)), expected)
+
+    def test_png_filters(self):
+        for colors, columns in ((1, 12), (3, 4), (4, 3)):
+            for filter_types in ([0], [1], [2], [3], [4], [0, 1, 2, 3, 4], [4, 4, 2, 2, 1, 3]):
+                predicted = png_predict(self.data, 12, colors, filter_types)
+                self.assert_decodes(predicted, {'/Predictor': 15, '/Colors': colors, '/Columns': columns}, self.data)
+
+    def test_png_filters_match_the_original_reader(self):
+        # the original PyPDF2 only supported the None, Sub and Up filters, of one byte samples
+        predicted = bytes(bytearray([1, 10, 20, 30, 2, 1, 2, 3, 0, 9, 8, 7, 2, 255, 255, 255]))
+        self.assert_decodes(predicted, {'/Predictor': 12, '/Columns': 3},
+                            bytes(bytearray([10, 30, 60, 11, 32, 63, 9, 8, 7, 8, 7, 6])))
+
+    def test_png_filters_of_small_components(self):
+        # filters work on whole bytes, comparing each to the byte before it
+        predicted = png_predict(self.data, 12, 1, [0, 1, 2, 3, 4])
+        self.assert_decodes(predicted, {'/Predictor': 15, '/BitsPerComponent': 4, '/Columns': 24}, self.data)
+
+    def test_unsupported_png_filter(self):
+        with self.assertRaises(PdfReadError):
+            filters.undoPrediction(b'\x05abc', 15, columns=3)
+
+    def test_tiff_predictor(self):
+        for colors, bits_per_component, columns in ((1, 8, 12), (3, 8, 4), (1, 16, 6), (2, 16, 3), (1, 1, 96),
+                                                    (3, 2, 16), (1, 4, 24), (3, 4, 7)):
+            row_length = (colors * bits_per_component * columns + 7) // 8
+            data = self.data[:len(self.data) - len(self.data) % row_length]
+            predicted = tiff_predict(data, row_length, colors, bits_per_component, columns)
+            decode_parms = {'/Predictor': 2, '/Colors': colors, '/BitsPerComponent': bits_per_component,
+                            '/Columns': columns}
+            self.assert_decodes(predicted, decode_parms, data)
+
+
+class LZWDecodeTests(SimpleTestCase):
+    def setUp(self):
+        random = Random(3)
+        self.samples = [
+            b'', b'a', b'TOBEORNOTTOBEORTOBEORNOT#', b'\0' * 20000,
+            # enough random bytes to fill the table several times
+            bytes(random.getrandbits(8) for i in range(30000)),
+            bytes(random.choice(b'abcd') for i in range(60000)),
+        ]
+
+    def assert_decodes(self, encoded, decode_parms, expected):
+        self.assertEqual(filters.LZWDecode.decode(encoded, decode_parms), expected)
+        stream = encoded_stream(encoded, '/LZWDecode')
+        if decode_parms:
+            stream[NameObject('/DecodeParms')] = decode_parms
+        for chunk_size in (1, 1000, None):
+            self.assertEqual(b''.join(filters.iterDecodedStreamData(stream, None, chunk_size)), expected)
+
+    def test_round_trips(self):
+        for data in self.samples:
+            for clear_when_full in (True, False):
+                self.assert_decodes(lzw_encode(data, 1, clear_when_full), None, data)
+
+    def test_late_change(self):
+        decode_parms = DictionaryObject({NameObject('/EarlyChange'): NumberObject(0)})
+        for data in self.samples:
+            for clear_when_full in (True, False):
+                self.assert_decodes(lzw_encode(data, 0, clear_when_full), decode_parms, data)
+
+    def test_predictor(self):
+        decode_parms = DictionaryObject({NameObject('/Predictor'): NumberObject(12),
+                                         NameObject('/Columns'): NumberObject(3)})
+        self.assert_decodes(lzw_encode(bytes([1, 10, 20, 30, 2, 1, 2, 3, 0, 9, 8, 7, 2, 255, 255, 255])),
+                            decode_parms, bytes([10, 30, 60, 11, 32, 63, 9, 8, 7, 8, 7, 6]))
+
+    def test_data_after_the_stop_code_is_ignored(self):
+        self.assertEqual(filters.LZWDecode.decode(lzw_encode(b'abc') + b'\xff' * 10), b'abc')
+
+    def test_invalid_data(self):
+        for encoded in (lzw_encode(b'abc')[:-2],
+                        # a code which is not in the table yet
+                        (0x100 << 23 | 0x150 << 14 | 0x101 << 5).to_bytes(4, 'big')):
+            with self.assertRaises(PdfReadError):
+                filters.LZWDecode.decode(encoded)
+
+
+class XrefTests(SimpleTestCase):
+    def setUp(self):
+        # the example PDFs have errors which the reader warns about
+        catcher = warnings.catch_warnings()
+        catcher.__enter__()
+        self.addCleanup(catcher.__exit__)
+        warnings.simplefilter('ignore')
+
+    def test_examples_match_the_original_reader(self):
+        for name, (xref_digest, text_digest) in sorted(EXAMPLE_DIGESTS.items()):
+            with open(example_path(name), 'rb') as pdf_file:
+                reader = PdfFileReader(pdf_file)
+                self.assertEqual(example_xref_digest(reader), xref_digest, name)
+                self.assertEqual(example_text_digest(reader.getPage(i).extractText()
+                                                     for i in range(reader.getNumPages())), text_digest, name)
+
+    def test_irregular_xref_tables(self):
+        pdf = two_page_pdf(2)
+        start = pdf.index(b'xref\n')
+        variants = [
+            pdf.replace(b' n \n', b' n\r\n').replace(b' f \n', b' f\r\n'),
+            # 19 byte entries, which end in a single newline
+            pdf[:start] + pdf[start:].replace(b' n \n', b' n\n').replace(b' f \n', b' f\n'),
+        ]
+        expected = example_xref_digest(PdfFileReader(BytesIO(pdf)))
+        for variant in variants:
+            reader = PdfFileReader(BytesIO(variant))
+            self.assertEqual(example_xref_digest(reader), expected)
+            self.assertEqual(list(reader.iterPageText()), ['page one', 'page two'])
+
+    def test_xref_stream_matches_table(self):
+        table = PdfFileReader(BytesIO(generate_pdf(3, 300)))
+        pdf = generate_pdf(3, 300, xref_stream=True)
+        stream = PdfFileReader(BytesIO(pdf))
+        # the cross-reference stream is an object of its own, which follows the others
+        entries = dict(stream.xref[0])
+        self.assertEqual(entries.pop(max(entries)), int(pdf.split(b'startxref')[-1].split()[0]))
+        self.assertEqual(entries, dict(table.xref[0]))
+        compressed = PdfFileReader(BytesIO(generate_pdf(3, 300, xref_stream=True, object_streams=True)))
+        fillers = [compressed.getObject(IndirectObject(number, 0, compressed))
+                   for number in sorted(compressed.xref_objStm)]
+        self.assertEqual(fillers, [table.getObject(IndirectObject(number, 0, table)) for number in range(10, 310)])
+        self.assertEqual(list(compressed.iterPageText()), list(table.iterPageText()))
+
+
+class XrefTableTests(SimpleTestCase):
+    def setUp(self):
+        self.table = XrefTable()
+        self.xref = XrefView(self.table)
+        self.compressed = ObjectStreamView(self.table)
+
+    def test_views_behave_as_dicts(self):
+        self.table.addTableEntries(1, [15, 60, 120], [0, 0, 2])
+        self.table.addStreamEntries([5, 6, 7], [1, 2, 0], [200, 9, 0], [0, 3, 0], True)
+        self.assertEqual(sorted(self.xref), [0, 2])
+        self.assertEqual(dict(self.xref[0]), {1: 15, 2: 60, 5: 200})
+        self.assertEqual(dict(self.xref[2]), {3: 120})
+        self.assertEqual(dict(self.compressed), {6: (9, 3)})
+        self.assertNotIn(1, self.xref)
+        self.assertNotIn(7, self.xref[0])
+        with self.assertRaises(KeyError):
+            self.xref[0][3]
+        self.xref[0][3] = 90
+        del self.xref[0][1]
+        del self.compressed[6]
+        self.assertEqual(dict(self.xref[0]), {2: 60, 3: 90, 5: 200})
+        self.assertEqual(len(self.compressed), 0)
+        with self.assertRaises(KeyError):
+            del self.compressed[6]
+
+    def test_earlier_sections_take_precedence(self):
+        # the sections are read from the most recent backwards
+        self.table.addStreamEntries([1, 2], [1, 2], [500, 9], [0, 0], True)
+        self.table.addTableEntries(0, [0, 15, 60, 120], [65535, 0, 0, 0])
+        # as in the original reader, a table does not check for compressed objects
+        self.assertEqual(dict(self.xref[0]), {1: 500, 2: 60, 3: 120})
+        self.assertEqual(dict(self.compressed), {2: (9, 0)})
+
+    def test_sparse_and_high_object_numbers(self):
+        self.table.addTableEntries(100000, [80], [0])
+        self.assertEqual(len(self.table.offsets), 100001)
+        high = xref.DENSE_LIMIT + 5
+        self.table.addTableEntries(high, [40], [0])
+        self.table.addStreamEntries([high + 1, 3], [2, 2], [7, 7], [0, 1], True)
+        # the arrays stop growing at the limit, and the objects beyond it are kept in dicts
+        self.assertEqual(len(self.table.offsets), xref.DENSE_LIMIT)
+        self.assertEqual(list(self.xref[0]), [100000, high])
+        self.assertEqual(self.xref[0][high], 40)
+        self.assertEqual(list(self.compressed.items()), [(3, (7, 1)), (high + 1, (7, 0))])
+        self.assertEqual(self.table.memoryUsage(), 3 * self.table.offsets.itemsize * xref.DENSE_LIMIT + 200)
+
+    def test_unknown_entry_types(self):
+        self.table.addStreamEntries([1], [3], [0], [0], False)
+        self.assertEqual(len(self.xref), 0)
+        with self.assertRaises(PdfReadError):
+            self.table.addStreamEntries([1], [3], [0], [0], True)
+
+    def test_replacing_a_generation(self):
+        self.table.addTableEntries(1, [15, 60], [0, 0])
+        self.xref[0] = {4: 30, xref.DENSE_LIMIT: 45}
+        self.assertEqual(dict(self.xref[0]), {4: 30, xref.DENSE_LIMIT: 45})
+
+    def test_reader_views_match_the_original_reader(self):
+        with open(example_path('ShoppingMalls.pdf'), 'rb') as pdf_file:
+            reader = PdfFileReader(pdf_file)
+            self.assertIsInstance(reader.xref, XrefView)
+            self.assertIs(reader.xref.table, reader._xrefTable)
+            self.assertEqual(example_xref_digest(reader), EXAMPLE_DIGESTS['ShoppingMalls.pdf'][0])
+
+
+class MmapTests(SimpleTestCase):
+    def setUp(self):
+        # the example PDFs have errors which the reader warns about
+        catcher = warnings.catch_warnings()
+        catcher.__enter__()
+        self.addCleanup(catcher.__exit__)
+        warnings.simplefilter('ignore')
+
+    def assert_matches_original(self, reader, name):
+        xref_digest, text_digest = EXAMPLE_DIGESTS[name]
+        self.assertEqual(example_xref_digest(reader), xref_digest, name)
+        self.assertEqual(example_text_digest(reader.iterPageText()), text_digest, name)
+
+    def test_examples_from_paths(self):
+        for name in sorted(EXAMPLE_DIGESTS):
+            reader = PdfFileReader(example_path(name), useMmap=True)
+            self.assertIsInstance(reader.stream, MappedFile)
+            self.assert_matches_original(reader, name)
+
+    def test_examples_from_file_objects(self):
+        for name in sorted(EXAMPLE_DIGESTS):
+            with open(example_path(name), 'rb') as pdf_file:
+                reader = PdfFileReader(pdf_file, useMmap=True)
+            # the map outlives the file
+            self.assert_matches_original(reader, name)
+
+    def test_stream_data_is_not_copied(self):
+        reader = PdfFileReader(example_path('single_example.pdf'), useMmap=True)
+        contents = reader.getPage(0)['/Contents'].getObject()
+        self.assertIsInstance(contents._data, memoryview)
+        with open(example_path('single_example.pdf'), 'rb') as pdf_file:
+            self.assertEqual(contents.getData(), PdfFileReader(pdf_file).getPage(0)['/Contents'].getObject().getData())
+
+    def test_streams_without_a_file_are_read(self):
+        reader = PdfFileReader(BytesIO(two_page_pdf(2)), useMmap=True)
+        self.assertIsInstance(reader.stream, BytesIO)
+        self.assertEqual(list(reader.iterPageText()), ['page one', 'page two'])
+
+    def test_mapped_file_seeks_like_a_file(self):
+        data = two_page_pdf(2)
+        with tempfile.NamedTemporaryFile() as pdf_file:
+            pdf_file.write(data)
+            pdf_file.flush()
+            mapped = mapFile(pdf_file.name)
+        expected = BytesIO(data)
+        for offset, whence in ((10, 0), (-4, 1), (-100, 1), (5, 2), (-5, 2), (len(data) + 10, 0)):
+            mapped.seek(offset, whence)
+            if whence == 1:
+                # a BytesIO cannot seek before the start
+                expected.seek(max(0, expected.tell() + offset))
+            else:
+                expected.seek(offset, whence)
+            self.assertEqual(mapped.tell(), min(expected.tell(), len(data)))
+            self.assertEqual(bytes(readBytes(mapped, 8)), expected.read(8))
+        with self.assertRaises(ValueError):
+            mapped.seek(-1)
+
+    def test_empty_files_are_not_mapped(self):
+        with tempfile.NamedTemporaryFile() as pdf_file:
+            self.assertIsInstance(mapFile(pdf_file.name), BytesIO)
+
+
+class ObjectStreamTests(SimpleTestCase):
+    def setUp(self):
+        pdf = generate_pdf(1, 500, xref_stream=True, object_streams=True)
+        # each object read evicts the object stream it was read from
+        self.reader = PdfFileReader(BytesIO(pdf), maxCachedObjects=1)
+        xref = self.reader._xrefTable
+        self.numbers = [number for number in range(1, 1000) if xref.getCompressed(number) is not None]
+        self.streams = sorted(set(xref.getCompressed(number)[0] for number in self.numbers))
+
+    def read(self, numbers):
+        return [self.reader.getObject(IndirectObject(number, 0, self.reader))['/Filler'] for number in numbers]
+
+    def test_each_stream_is_decoded_once_when_read_in_order(self):
+        decode = EncodedStreamObject.getData
+        decoded = []
+
+        def get_data(stream):
+            # the streams themselves are not kept, so that they can still be evicted
+            decoded.append(True)
+            return decode(stream)
+
+        with mock.patch.object(EncodedStreamObject, 'getData', get_data):
+            self.assertEqual(self.read(self.numbers), list(range(500)))
+        self.assertEqual(len(decoded), len(self.streams))
+
+    def test_headers_outlive_the_streams_in_a_bounded_cache(self):
+        self.read(self.numbers)
+        headers = dict(self.reader._objectStreamIndexes)
+        self.assertEqual(sorted(headers), self.streams)
+        self.assertEqual(self.read(self.numbers[::-1]), list(range(500))[::-1])
+        for number, header in self.reader._objectStreamIndexes.items():
+            self.assertIs(header, headers[number])
+
+
+class ObjectCacheTests(SimpleTestCase):
+    def setUp(self):
+        # the example PDFs have errors which the reader warns about
+        catcher = warnings.catch_warnings()
+        catcher.__enter__()
+        self.addCleanup(catcher.__exit__)
+        warnings.simplefilter('ignore')
+
+    def test_least_recently_used_objects_are_evicted(self):
+        cache = ObjectCache(maxObjects=2)
+        cache[1] = 'one'
+        cache[2] = 'two'
+        self.assertEqual(cache.get(1), 'one')
+        cache[3] = 'three'
+        self.assertEqual(list(cache), [1, 3])
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'evictions': 1, 'objects': 2, 'bytes': None})
+
+    def test_objects_still_in_use_are_found_again(self):
+        cache = ObjectCache(maxObjects=1)
+        first = ArrayObject([NumberObject(1)])
+        cache[1] = first
+        cache[2] = ArrayObject()
+        self.assertNotIn(1, cache)
+        self.assertIs(cache.get(1), first)
+        del first
+        cache[3] = ArrayObject()
+        self.assertIsNone(cache.get(1))
+
+    def test_size_is_bounded(self):
+        cache = ObjectCache(maxBytes=1000)
+        for number in range(20):
+            cache[number] = ByteStringObject(b'x' * 200)
+            self.assertLessEqual(cache.stats()['bytes'], 1000)
+        # the last object is kept even if it does not fit
+        cache[20] = ByteStringObject(b'x' * 2000)
+        self.assertEqual(list(cache), [20])
+        self.assertEqual(cache.stats()['bytes'], approximateSize(cache[20]))
+
+    def test_unbounded_cache_keeps_every_object(self):
+        reader = PdfFileReader(BytesIO(generate_pdf(3, 300)))
+        for number in range(1, 310):
+            reader.getObject(IndirectObject(number, 0, reader))
+        self.assertEqual(reader.getCacheStats()['evictions'], 0)
+        self.assertEqual(reader.getCacheStats()['objects'], 309)
+
+    def test_examples_match_the_original_reader(self):
+        for limits in ({'maxCachedObjects': 4}, {'maxCachedBytes': 20000}):
+            for name, (xref_digest, text_digest) in sorted(EXAMPLE_DIGESTS.items()):
+                reader = PdfFileReader(example_path(name), **limits)
+                self.assertEqual(example_text_digest(reader.iterPageText()), text_digest, name)
+                # and again, from objects which have been read again
+                self.assertEqual(example_text_digest(reader.iterPageText()), text_digest, name)
+                stats = reader.getCacheStats()
+                self.assertLessEqual(stats['objects'], limits.get('maxCachedObjects', stats['objects']))
+
+    def test_evicted_pages_keep_their_changes(self):
+        reader = PdfFileReader(BytesIO(generate_pdf(2, 300)), maxCachedObjects=2)
+        page = reader.getPage(0)
+        page[NameObject('/Rotate')] = NumberObject(90)
+        for number in list(reader.xref[0]):
+            reader.getObject(IndirectObject(number, 0, reader))
+        self.assertGreater(reader.getCacheStats()['evictions'], 0)
+        self.assertIs(reader.getPage(0), page)
+        self.assertEqual(reader.getPage(0)['/Rotate'], 90)
+
+
+class StreamCacheTests(SimpleTestCase):
+    def setUp(self):
+        # the example PDFs have errors which the reader warns about
+        catcher = warnings.catch_warnings()
+        catcher.__enter__()
+        self.addCleanup(catcher.__exit__)
+        warnings.simplefilter('ignore')
+        # the decoded contents of each page take 1291 bytes, so only one is kept at a time
+        self.reader = PdfFileReader(BytesIO(generate_pdf(4, 0, lines=20, compress=True)),
+                                    streamCache=StreamCache(maxBytes=2000, dropEncoded=True))
+        self.contents = [page['/Contents'].getObject() for page in self.reader.iterPages()]
+
+    def test_least_recently_used_data_is_dropped(self):
+        cache = StreamCache(maxBytes=10)
+        streams = [encoded_stream(b'', '/FlateDecode') for i in range(4)]
+        self.assertTrue(cache.put(streams[0], b'aaaa'))
+        self.assertTrue(cache.put(streams[1], b'bbbb'))
+        self.assertEqual(cache.get(streams[0]), b'aaaa')
+        self.assertTrue(cache.put(streams[2], b'cccc'))
+        self.assertIsNone(cache.get(streams[1]))
+        self.assertEqual(cache.get(streams[2]), b'cccc')
+        # data larger than the cache is not kept
+        self.assertFalse(cache.put(streams[3], b'd' * 11))
+        self.assertEqual(cache.stats(), {'hits': 2, 'misses': 1, 'evictions': 1, 'streams': 2, 'bytes': 8,
+                                         'peakBytes': 8})
+        # nor is the data of a stream which is no longer used
+        del streams[0]
+        self.assertEqual(cache.stats()['streams'], 1)
+
+    def test_encoded_data_is_dropped_and_read_again(self):
+        expected = [contents.getData() for contents in self.contents]
+        for contents in self.contents:
+            self.assertIsNone(contents._encodedData)
+            self.assertIsNone(contents.decodedSelf)
+        # only the last page is kept, and the others are read from the file and decoded again
+        self.assertEqual(self.reader.getStreamCacheStats()['evictions'], 3)
+        self.assertEqual([contents.getData() for contents in self.contents], expected)
+        # iterating over the data does not add it to the cache
+        self.assertEqual([b''.join(contents.iterData(100)) for contents in self.contents], expected)
+        self.assertEqual(self.reader.getStreamCacheStats(), {'hits': 1, 'misses': 11, 'evictions': 7, 'streams': 1,
+                                                             'bytes': 1291, 'peakBytes': 1291})
+
+    def test_examples_match_the_original_reader(self):
+        for use_mmap in (False, True):
+            for name, (xref_digest, text_digest) in sorted(EXAMPLE_DIGESTS.items()):
+                reader = PdfFileReader(example_path(name), useMmap=use_mmap,
+                                       streamCache=StreamCache(maxBytes=4096, dropEncoded=True))
+                self.assertEqual(example_text_digest(reader.iterPageText()), text_digest, name)
+                self.assertEqual(example_text_digest(reader.iterPageText()), text_digest, name)
+                self.assertLessEqual(reader.getStreamCacheStats()['peakBytes'], 4096)
+
+    def test_mapped_data_is_not_dropped(self):
+        reader = PdfFileReader(example_path('single_example.pdf'), useMmap=True,
+                               streamCache=StreamCache(dropEncoded=True))
+        contents = reader.getPage(0)['/Contents'].getObject()
+        contents.getData()
+        self.assertIsInstance(contents._encodedData, memoryview)
+
+    def test_without_a_cache(self):
+        reader = PdfFileReader(BytesIO(generate_pdf(1, 0, compress=True)))
+        contents = reader.getPage(0)['/Contents'].getObject()
+        self.assertEqual(contents.getData(), contents.decodedSelf.getData())
+        self.assertIsNotNone(contents._encodedData)
+        self.assertIsNone(reader.getStreamCacheStats())
+
+
+class ContentStreamTests(SimpleTestCase):
+    def test_operations_match_the_original_reader(self):
+        # the operations which the original PyPDF2 read from each stream
+        expected = {
+            b'BT /F1 12 Tf 72 712 Td (Hello) Tj ET': [
+                ([], b'BT'), ([('NameObject', '/F1'), ('NumberObject', 12)], b'Tf'),
+                ([('NumberObject', 72), ('NumberObject', 712)], b'Td'), ([('TextStringObject', 'Hello')], b'Tj'),
+                ([], b'ET'),
+            ],
+            b'q 1 0 0 1 0 0 cm\n% comment\nBT [(A) -120 (B)] TJ 0 -14 TD (it\'s) \' 1 2 (x\\(y\\)) " T* '
+            b'<48656c6c6f> Tj ET Q': [
+                ([], b'q'), ([('NumberObject', n) for n in (1, 0, 0, 1, 0, 0)], b'cm'), ([], b'BT'),
+                ([('ArrayObject', ['A', -120, 'B'])], b'TJ'), ([('NumberObject', 0), ('NumberObject', -14)], b'TD'),
+                ([('TextStringObject', "it's")], b"'"),
+                ([('NumberObject', 1), ('NumberObject', 2), ('TextStringObject', 'x(y)')], b'"'), ([], b'T*'),
+                ([('TextStringObject', 'Hello')], b'Tj'), ([], b'ET'), ([], b'Q'),
+            ],
+            b'BT (nested (paren) here) Tj (esc\\n\\101) Tj -.5 +3 1.25 Td [/a [1 2] << /K 3 >>] TJ ET': [
+                ([], b'BT'), ([('TextStringObject', 'nested (paren) here')], b'Tj'),
+                ([('ByteStringObject', b'esc\nA')], b'Tj'),
+                ([('FloatObject', -0.5), ('NumberObject', 3), ('FloatObject', 1.25)], b'Td'),
+                ([('ArrayObject', ['/a', [1, 2], {'/K': 3}])], b'TJ'), ([], b'ET'),
+            ],
+            b'/Name1 /N#20x sh 0.5 g': [
+                ([('NameObject', '/Name1'), ('NameObject', '/N#20x')], b'sh'), ([('FloatObject', 0.5)], b'g'),
+            ],
+            b'BT\r\n(a)Tj\tT*(b)Tj ET': [
+                ([], b'BT'), ([('TextStringObject', 'a')], b'Tj'), ([], b'T*'), ([('TextStringObject', 'b')], b'Tj'),
+                ([], b'ET'),
+            ],
+        }
+        for data, operations in expected.items():
+            self.assertEqual(operation_types(content_stream(data).operations), operations, data)
+
+    def test_inline_images(self):
+        operations = content_stream(b'BI /W 2 /H 1 /BPC 8 /CS /G ID \x00\xffEI Q BT (after) Tj ET').operations
+        settings, operator = operations[0]
+        self.assertEqual(operator, b'INLINE IMAGE')
+        self.assertEqual(settings['settings'], {'/W': 2, '/H': 1, '/BPC': 8, '/CS': '/G'})
+        self.assertEqual(settings['data'], b'\x00\xff')
+        self.assertEqual(operations[1:], [([], b'Q'), ([], b'BT'), (['after'], b'Tj'), ([], b'ET')])
+
+    def test_consecutive_inline_images(self):
+        data = b'q BI /W 2 /H 1 ID EI xEI Q q BI /W 1 /H 1 ID \x01EI\nQ BT (x) Tj ET'
+        operations = content_stream(data).operations
+        images = [operands['data'] for operands, operator in operations if operator == b'INLINE IMAGE']
+        self.assertEqual(images, [b'EI x', b'\x01'])
+        self.assertEqual([operator for operands, operator in operations],
+                         [b'q', b'INLINE IMAGE', b'Q', b'q', b'INLINE IMAGE', b'Q', b'BT', b'Tj', b'ET'])
+        with self.assertRaises(PdfStreamError):
+            content_stream(b'BI /W 1 /H 1 ID \x01EI')
+
+    def test_operands_are_converted_when_first_used(self):
+        stream = content_stream(b'q (x) Tj 1 2 Td')
+        self.assertEqual(stream.rawOperations, [((), b'q'), (('x',), b'Tj'), ((b'1', b'2'), b'Td')])
+        self.assertEqual(stream.operations, [([], b'q'), (['x'], b'Tj'), ([1, 2], b'Td')])
+        self.assertIsNone(stream.rawOperations)
+
+    def test_text_only(self):
+        data = b'q (x) Tj BT /F1 12 Tf [(A) -120 (B)] TJ 0 -14 TD (c) \' ET BI /W 1 ID zzEI Q 1 2 (out) "'
+        # only the operations which show text are kept, including any outside of text objects
+        self.assertEqual(content_stream(data, True).operations,
+                         [(['x'], b'Tj'), ([['A', -120, 'B']], b'TJ'), (['c'], b"'"), ([1, 2, 'out'], b'"')])
+
+
+class TextExtractionTests(SimpleTestCase):
+    def page_text(self, content):
+        pdf = make_pdf([
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+            b'<< /Type /Page /Parent 2 0 R /Contents 4 0 R >>',
+            stream_body(content),
+        ])
+        return PdfFileReader(BytesIO(pdf)).getPage(0).extractText()
+
+    def test_text_matches_the_original_reader(self):
+        # the text which the original PyPDF2 extracted from each content stream
+        expected = {
+            b'BT (Hello) Tj ET': 'Hello',
+            b'(outside) Tj BT (inside) Tj ET (after) Tj': 'outsideinsideafter',
+            b'BT [(A) -120 (B) 300 (C)] TJ ET': 'ABC\n',
+            b'BT (one) Tj (two) \' 1 2 (three) " T* (four) Tj ET': 'one\ntwo\nthree\nfour',
+            b'BT (a) Tj ET BI /W 2 /H 1 /BPC 8 /CS /G ID \x00\xffBT (x) TjEI Q BT (b) Tj ET': 'ab',
+            b'q BT /F1 12 Tf 0 -14 TD (x\\(y\\)) Tj <48656c6c6f> Tj ET Q': 'x(y)Hello',
+            b'BT [(a) (b)] TJ\n% (comment) Tj\n(c) Tj ET': 'ab\nc',
+            b'BT (no end) Tj': 'no end',
+            b'1 0 0 1 5 5 cm 0.5 g /GS1 gs 1 2 (z) " 1 0 R (q) Tj /F1 (w) \' [1 2] 0 d (x) Tj': '\nz\nx',
+            b'/F1 Tj 10 20 m 30 40 l S': '',
+        }
+        for content, text in expected.items():
+            self.assertEqual(self.page_text(content), text, content)
+
+    def test_examples_match_the_original_reader(self):
+        for name, (xref_digest, text_digest) in sorted(EXAMPLE_DIGESTS.items()):
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                reader = PdfFileReader(example_path(name))
+                self.assertEqual(example_text_digest(reader.iterPageText()), text_digest, name)
+
+
+class PdfParserTests(SimpleTestCase):
+    def test_parse_problem_pdf(self):
+        pdf = text_pdf([['Shortest Paths', ' ', 'Problem Description', ' ', 'Find the path.', ' ', 'Sample Input', ' ',
+                         '1 2', ' '],
+                        ['Sample Output', ' ', '3', ' ', 'Paradigms', ' ', 'graphs', ' ']])
+        problem = pdf_parser.parse_problem_pdf(pdf)
+        self.assertEqual(problem['title'], 'Shortest Paths')
+        self.assertEqual(problem['problem_description'].strip(), 'Find the path.')
+        self.assertEqual(problem['example_input'].strip(), '1 2')
+        self.assertEqual(problem['example_output'].strip(), '3')
+        self.assertEqual(problem['paradigms'].strip(), 'graphs')
+        self.assertEqual(pdf_parser.read_pdf_lines(pdf)[0], 2)
+
+    def test_parallel_extraction_matches_sequential(self):
+        pdf = generate_pdf(pdf_parser.PARALLEL_MIN_PAGES + 8, 0, lines=3)
+        num_pages, texts = pdf_parser.extract_text(pdf)
+        self.assertEqual(num_pages, pdf_parser.PARALLEL_MIN_PAGES + 8)
+        self.assertEqual(len(texts), num_pages)
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+            pdf_file.write(pdf)
+        self.addCleanup(os.remove, pdf_file.name)
+        with mock.patch.object(pdf_parser, '_extract_text_pool', wraps=pdf_parser._extract_text_pool) as pool:
+            for source in (pdf, bytearray(pdf), BytesIO(pdf), pdf_file.name):
+                self.assertEqual(pdf_parser.extract_text_parallel(source, 2), (num_pages, texts))
+            self.assertEqual(pool.call_count, 4)
+            self.assertEqual(pdf_parser.extract_text_parallel(pdf, 1), (num_pages, texts))
+            self.assertEqual(pool.call_count, 4)
+
+    def test_pdfs_are_read_in_one_process(self):
+        # the ingestion jobs and import_pdfs read their PDFs in daemonic processes, which cannot start a pool
+        pdf = generate_pdf(pdf_parser.PARALLEL_MIN_PAGES, 0)
+        with mock.patch.object(multiprocessing, 'Pool') as pool:
+            num_pages, lines = pdf_parser.read_pdf_lines(pdf)
+        self.assertFalse(pool.called)
+        self.assertEqual(num_pages, pdf_parser.PARALLEL_MIN_PAGES)
+        self.assertIn('Problem %d: find the shortest path.' % num_pages, lines)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('setter', password='password')
+        # the private problems are the most relevant to the search
+        self.private_ids = [Problem.objects.create(created_by=self.user, title='graph graph graph %d' % i).id
+                            for i in range(5)]
+        self.public_ids = [Problem.objects.create(created_by=self.user, title='graph %d' % i,
+                                                  problem_privacy=False).id for i in range(3)]
+        Problem.objects.create(created_by=self.user, title='strings', problem_privacy=False)
+
+    def test_ranking_is_limited_after_filtering(self):
+        problems = Problem.objects.filter(problem_privacy=False)
+        with self.assertNumQueries(1):
+            ranked_ids = search.ranked_problem_ids('graph', problems, limit=3)
+        self.assertEqual(sorted(ranked_ids), self.public_ids)
+
+    def test_ranking_without_filter(self):
+        ranked_ids = search.ranked_problem_ids('Graph', limit=6)
+        self.assertEqual(sorted(ranked_ids[:5]), self.private_ids)
+        self.assertIn(ranked_ids[5], self.public_ids)
+        self.assertEqual(search.ranked_problem_ids('!!'), [])
+
+    def test_catalogue_search_shows_visible_problems(self):
+        response = self.client.get(reverse('index'), {'q': 'graph'})
+        self.assertEqual(response.context['result_count'], 3)
+        self.assertEqual(sorted(problem.id for problem in response.context['problems']), self.public_ids)
+
+
+class ImportPdfsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('setter', password='password')
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_pdf(self, name, data):
+        with open(os.path.join(self.directory, name), 'wb') as pdf_file:
+            pdf_file.write(data)
+
+    def outcome(self, title):
+        return {
+            'problem': pdf_parser.parse_problem_pdf(problem_pdf(title)),
+            'solution': pdf_parser.parse_solution_pdf(solution_pdf()),
+        }
+
+    def test_parse_pair_counts_pages(self):
+        self.write_pdf('walk.pdf', problem_pdf('Walk'))
+        self.write_pdf('walk_solution.pdf', solution_pdf())
+        outcome = import_pdfs.parse_pair(('walk', (None, os.path.join(self.directory, 'walk.pdf')),
+                                          (None, os.path.join(self.directory, 'walk_solution.pdf'))))
+        self.assertEqual((outcome['files'], outcome['pages'], outcome['errors']), (2, 2, []))
+        self.assertEqual(outcome['problem']['title'], 'Walk')
+        self.assertEqual(outcome['solution']['time_limit'], '1.5')
+
+    def test_batch_queries_do_not_grow_with_batch_size(self):
+        command = import_pdfs.Command()
+        # the first batch creates the categories
+        command.write_batch([self.outcome('Walk')], self.user, True)
+        with self.assertNumQueries(16):
+            self.assertEqual(command.write_batch([self.outcome('Jog')], self.user, True), 1)
+        with self.assertNumQueries(16):
+            self.assertEqual(command.write_batch([self.outcome('Run %d' % i) for i in range(5)], self.user, True), 5)
+        self.assertEqual(Content.objects.count(), 7)
+        self.assertEqual(Solution.objects.filter(language__name='python').count(), 7)
+        self.assertEqual(len(search.ranked_problem_ids('path run')), 5)
+
+    def test_import_directory(self):
+        for i in range(3):
+            self.write_pdf('problem%d.pdf' % i, problem_pdf('Problem %d' % i, 'graphs, greedy'))
+        self.write_pdf('problem0_solution.pdf', solution_pdf())
+        call_command('import_pdfs', self.directory, user='setter', public=True, workers=1, batch_size=2,
+                     stdout=StringIO(), stderr=StringIO())
+        problems = Problem.objects.filter(problem_privacy=False)
+        self.assertEqual(sorted(problems.values_list('title', flat=True)), ['Problem 0', 'Problem 1', 'Problem 2'])
+        self.assertEqual(problems.filter(categories__name='greedy').count(), 3)
+        self.assertEqual(search.ranked_problem_ids('queue'), [Problem.objects.get(title='Problem 0').id])
+
+
+class IngestionJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('setter', password='password')
+        Account.objects.create(user=self.user, activation_code='code', activation_deadline=datetime.date.today(),
+                               activated=True)
+        self.client.login(username='setter', password='password')
+
+    def upload(self, **files):
+        response = self.client.post(reverse('add_problem_from_pdf'), dict(
+            (name, SimpleUploadedFile(name + '.pdf', data, 'application/pdf')) for name, data in files.items()))
+        job = IngestionJob.objects.latest('id')
+        self.assertRedirects(response, reverse('view_ingestion_job', kwargs={'job_id': job.id}),
+                             fetch_redirect_response=False)
+        return job
+
+    def test_upload_is_queued(self):
+        job = self.upload(problem=problem_pdf('Walk'))
+        self.assertEqual(job.status, IngestionJob.PENDING)
+        self.assertEqual(bytes(job.problem_pdf), problem_pdf('Walk'))
+        self.assertIsNone(job.solution_pdf)
+
+    def test_progress_pages_do_not_load_the_pdfs(self):
+        job = self.upload(problem=problem_pdf('Walk'), solution=solution_pdf())
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('ingestion_job_status', kwargs={'job_id': job.id}))
+            self.client.get(reverse('view_ingestion_job', kwargs={'job_id': job.id}))
+        self.assertEqual(response.json()['status'], IngestionJob.PENDING)
+        self.assertFalse([query for query in queries.captured_queries if 'problem_pdf' in query['sql']])
+
+    def test_worker_parses_job_and_drops_pdfs(self):
+        job = self.upload(problem=problem_pdf('Walk'), solution=solution_pdf())
+        IngestionWorker(1, 30, 0).run(poll_interval=0.01, once=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (IngestionJob.DONE, ''))
+        self.assertIsNone(job.problem_pdf)
+        self.assertIsNone(job.solution_pdf)
+        self.assertEqual(job.get_result()['problem']['title'], 'Walk')
+        self.assertEqual(job.get_result()['solution']['languages'], 'python')
+        response = self.client.get(reverse('view_ingestion_job', kwargs={'job_id': job.id}))
+        self.assertTemplateUsed(response, 'problems/add_problem_from_pdf.html')
+
+    def test_unreadable_pdf_fails(self):
+        job = self.upload(problem=b'not a pdf')
+        IngestionWorker(1, 30, 0).run(poll_interval=0.01, once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestionJob.FAILED)
+        self.assertTrue(job.error.startswith('The PDF could not be read'))
+        self.assertIsNone(job.problem_pdf)
+
+    def stale_job(self, attempts, hours=1):
+        return IngestionJob.objects.create(created_by=self.user, status=IngestionJob.RUNNING, attempts=attempts,
+                                           started=timezone.now() - datetime.timedelta(hours=hours),
+                                           problem_pdf=problem_pdf('Job %d %d' % (attempts, hours)))
+
+    def test_claiming_counts_attempts(self):
+        job = self.upload(problem=problem_pdf('Walk'))
+        self.assertEqual(IngestionJob.claim_next().id, job.id)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (IngestionJob.RUNNING, 1))
+        self.assertIsNone(IngestionJob.claim_next())
+
+    def test_stale_jobs_are_recovered(self):
+        retried = self.stale_job(1)
+        exhausted = self.stale_job(IngestionJob.MAX_ATTEMPTS)
+        recent = self.stale_job(1, hours=0)
+        excluded = self.stale_job(2)
+        self.assertEqual(IngestionJob.recover_stale(60, exclude=[excluded.id]), 2)
+        for job in (retried, exhausted, recent, excluded):
+            job.refresh_from_db()
+        self.assertEqual(retried.status, IngestionJob.PENDING)
+        self.assertIsNone(retried.started)
+        self.assertIsNotNone(retried.problem_pdf)
+        self.assertEqual(exhausted.status, IngestionJob.FAILED)
+        self.assertIsNone(exhausted.problem_pdf)
+        self.assertEqual((recent.status, excluded.status), (IngestionJob.RUNNING, IngestionJob.RUNNING))
+
+    def test_worker_runs_abandoned_job(self):
+        job = self.stale_job(1)
+        IngestionWorker(1, 30, 0).run(poll_interval=0.01, once=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (IngestionJob.DONE, 2))
+        self.assertEqual(job.get_result()['problem']['title'], 'Job 1 1')
+
+
+class RerenderMarkdownTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('setter', password='password')
+        self.contents = [Content.objects.create(problem=Problem.objects.create(created_by=user, title='Problem %d' % i),
+                                                problem_description='**Problem %d**' % i) for i in range(3)]
+        # the HTML of the first problem was rendered by an older renderer
+        Content.objects.filter(pk=self.contents[0].pk).update(renderer_version='old',
+                                                              problem_description_html='<p>old</p>')
+
+    def rerender(self, *args):
+        output = StringIO()
+        call_command('rerender_markdown', *args, workers=1, stdout=output)
+        return output.getvalue()
+
+    def test_saving_renders_with_the_current_version(self):
+        self.assertEqual(self.contents[1].renderer_version, rendering.RENDERER_VERSION)
+        content = Content.objects.get(pk=self.contents[0].pk)
+        content.save()
+        self.assertEqual(content.renderer_version, rendering.RENDERER_VERSION)
+        self.assertEqual(content.problem_description_html, '<p><strong>Problem 0</strong></p>\n')
+
+    def test_only_stale_objects_are_rerendered(self):
+        self.assertIn('Re-rendered 1 Content objects', self.rerender())
+        content = Content.objects.get(pk=self.contents[0].pk)
+        self.assertEqual(content.renderer_version, rendering.RENDERER_VERSION)
+        self.assertEqual(content.problem_description_html, '<p><strong>Problem 0</strong></p>\n')
+        self.assertIn('Re-rendered 0 Content objects', self.rerender())
+
+    def test_force_rerenders_everything(self):
+        Content.objects.update(problem_description_html='<p>old</p>')
+        self.assertIn('Re-rendered 3 Content objects', self.rerender('--force'))
+        self.assertFalse(Content.objects.filter(problem_description_html='<p>old</p>').exists())
+
+
+class CatalogueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('setter', password='password')
+
+    def create_problems(self, count):
+        for i in range(Problem.objects.count(), count):
+            create_problem(self.user, 'Problem %d' % i, paradigms='graphs, greedy', languages='python',
+                           algorithms='bfs', data_structures='queue', complexity='O(n)')
+
+    def test_problem_data_takes_a_fixed_number_of_queries(self):
+        index = views.Index()
+        self.create_problems(2)
+        with self.assertNumQueries(6):
+            small = index.get_problem_data(Problem.objects.all())
+        self.create_problems(8)
+        with self.assertNumQueries(6):
+            large = index.get_problem_data(Problem.objects.all())
+        self.assertEqual(small, large[:2])
+        problem_id, availability, categories = large[-1]
+        self.assertEqual(problem_id, Problem.objects.get(title='Problem 7').id)
+        self.assertEqual(availability, False)
+        self.assertEqual([c.name for c in categories], ['graphs', 'greedy', 'queue', 'bfs', 'o(n)', 'python'])
+
+    def test_solution_availability(self):
+        index = views.Index()
+        problem = Problem.objects.create(created_by=self.user, title='Empty')
+        Solution.objects.create(problem=problem)
+        self.assertEqual(index.get_problem_data(Problem.objects.all()), [(problem.id, 'No solution provided.', [])])
+
+    def test_catalogue_page_takes_a_fixed_number_of_queries(self):
+        self.create_problems(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('index'))
+        self.create_problems(8)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('index'))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.context['problem_info']), 8)
+
+
+class CataloguePaginationTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('setter', password='password')
+        for i in range(8):
+            create_problem(user, 'Problem %d' % i, difficulty=(i * 3) % 5)
+        patcher = mock.patch.object(views.Index, 'PAGE_SIZE', 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_page(self, query):
+        response = self.client.get(reverse('index') + query)
+        return [problem.id for problem in response.context['problems']], response.context
+
+    def test_pages_by_number(self):
+        ids = list(Problem.objects.order_by('id').values_list('id', flat=True))
+        pages = [self.get_page('?page=%d' % number)[0] for number in (1, 2, 3)]
+        self.assertEqual(pages, [ids[0:3], ids[3:6], ids[6:8]])
+        page, context = self.get_page('?page=9')
+        self.assertEqual((page, context['page_number'], context['num_pages']), (ids[6:8], 3, 3))
+
+    def test_cursors_walk_the_sorted_catalogue(self):
+        ids = list(Problem.objects.order_by('difficulty', 'id').values_list('id', flat=True))
+        pages = []
+        page, context = self.get_page('?sort=difficulty')
+        pages.append(page)
+        query_counts = []
+        while context['next_page_url']:
+            with CaptureQueriesContext(connection) as queries:
+                page, context = self.get_page(context['next_page_url'])
+            query_counts.append(len(queries))
+            pages.append(page)
+        self.assertEqual(pages, [ids[0:3], ids[3:6], ids[6:8]])
+        # seeking to a later page costs the same as seeking to an earlier one
+        self.assertEqual(len(set(query_counts)), 1)
+
+        backwards = [page]
+        while context['previous_page_url']:
+            page, context = self.get_page(context['previous_page_url'])
+            backwards.append(page)
+        self.assertEqual(backwards[::-1], pages)
+
+    def test_malformed_cursor_is_ignored(self):
+        ids = list(Problem.objects.order_by('id').values_list('id', flat=True))
+        self.assertEqual(self.get_page('?page=2&after=x')[0], ids[3:6])
+        self.assertEqual(self.get_page('?page=2&after=1,2')[0], ids[3:6])
+
+
+class CategoryIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('setter', password='password')
+        self.graphs = create_problem(self.user, 'Graphs', paradigms='graphs', languages='python, java')
+        self.greedy = create_problem(self.user, 'Greedy', paradigms='greedy, graphs', languages='java',
+                                     data_structures='heap')
+        self.hidden = create_problem(self.user, 'Hidden', public=False, paradigms='graphs', languages='java')
+
+    def search(self, **facets):
+        response = self.client.get(reverse('index'), facets)
+        return sorted(problem.title for problem in response.context['problems'])
+
+    def test_index_follows_the_category_helpers(self):
+        entries = CategoryIndex.objects.filter(problem=self.greedy).values_list('type', 'name')
+        self.assertEqual(sorted(entries), [('data-structure', 'heap'), ('language', 'java'), ('paradigm', 'graphs'),
+                                           ('paradigm', 'greedy')])
+        solution = Solution.objects.get(problem=self.greedy)
+        solution.remove_ds()
+        solution.add_language('Python')
+        self.greedy.add_paradigms('dp')
+        entries = CategoryIndex.objects.filter(problem=self.greedy).values_list('type', 'name')
+        self.assertEqual(sorted(entries), [('language', 'python'), ('paradigm', 'dp')])
+
+    def test_facets_are_intersected(self):
+        self.assertEqual(self.search(paradigms='graphs'), ['Graphs', 'Greedy'])
+        self.assertEqual(self.search(paradigms='Graphs', languages='python'), ['Graphs'])
+        self.assertEqual(self.search(paradigms='greedy,dp', languages='java'), ['Greedy'])
+        self.assertEqual(self.search(data_structures='heap', languages='python'), [])
+
+    def test_facet_filter_is_a_single_query(self):
+        problems = Problem.objects.all()
+        for category_type, names in (('paradigm', ['graphs']), ('language', ['java']), ('data-structure', ['heap'])):
+            problems = problems.filter(id__in=CategoryIndex.problems_in(category_type, names))
+        with self.assertNumQueries(1):
+            self.assertEqual(list(problems.values_list('title', flat=True)), ['Greedy'])
+
+
+class CategoryAssignmentTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('setter', password='password')
+        self.problem = create_problem(user, 'Walk')
+        self.solution = Solution.objects.get(problem=self.problem)
+
+    def test_resolve(self):
+        Category.objects.create(name='bfs', type='algorithm')
+        categories = Category.resolve(' BFS, dfs,, bfs ,Dijkstra', 'algorithm')
+        self.assertEqual([c.name for c in categories], ['bfs', 'dfs', 'dijkstra'])
+        self.assertEqual(Category.objects.filter(type='algorithm').count(), 3)
+        self.assertEqual(Category.resolve(' , ', 'algorithm'), [])
+
+    def test_concurrently_created_categories(self):
+        bulk_create = QuerySet.bulk_create
+        calls = []
+
+        def fail_part_way(queryset, objects, *args, **kwargs):
+            # another request has already created one of the categories, so the bulk insert fails part way through
+            # and is rolled back
+            calls.append(objects)
+            if len(calls) == 1:
+                bulk_create(queryset, objects[:1])
+                raise IntegrityError('UNIQUE constraint failed')
+            return bulk_create(queryset, objects, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'bulk_create', fail_part_way):
+            categories = Category.resolve('a, b', 'paradigm')
+        self.assertEqual([c.name for c in categories], ['a', 'b'])
+        self.assertEqual(sorted(Category.objects.filter(type='paradigm').values_list('name', flat=True)),
+                         ['a', 'b'])
+        self.assertEqual(len(calls), 1)
+
+    def test_queries_do_not_grow_with_the_number_of_tags(self):
+        names = ', '.join('algorithm %d' % i for i in range(10))
+        Category.resolve(names, 'algorithm')
+        with self.assertNumQueries(1):
+            Category.resolve('algorithm 1', 'algorithm')
+        with self.assertNumQueries(1):
+            Category.resolve(names, 'algorithm')
+        with CaptureQueriesContext(connection) as one:
+            self.solution.add_algorithms('algorithm 1')
+        with CaptureQueriesContext(connection) as many:
+            self.solution.add_algorithms(names)
+        self.assertEqual(len(one), len(many))
+        self.assertEqual(self.solution.algorithms.count(), 10)
+        # new categories are created in bulk too
+        other = create_problem(self.problem.created_by, 'Run')
+        with CaptureQueriesContext(connection) as one:
+            other.add_paradigms('paradigm')
+        with CaptureQueriesContext(connection) as many:
+            self.problem.add_paradigms(', '.join('paradigm %d' % i for i in range(10)))
+        self.assertEqual(len(one), len(many))
+        self.assertEqual(self.problem.categories.count(), 10)
+
+
+class SectionTests(SimpleTestCase):
+    def test_reassemble_lines(self):
+        # the lines found by the original getPDFContent for each page of text
+        cases = [
+            ('Title\n \nProblem Description\n \nFind the\nshortest\npath.\n \nSample Input\n \n1 2\n',
+             ['Title', ' ', 'Problem Description', ' ', 'Find theshortestpath.', 'Sample Input', ' ', '1 2']),
+            ('a\nb\nc', ['abc']),
+            (' \n \na\n \n \nb', [' ', ' ', 'a', ' ', '', 'b']),
+            ('a\n \n', ['a', ' ', '']),
+            ('', ['']),
+            ('one\ntwo\n \n \nthree\n \nfour\nfive', ['onetwo', '', 'three', ' ', 'fourfive']),
+            ('x\n \ny\nz\n \n', ['x', ' ', 'yz', '']),
+        ]
+        for text, lines in cases:
+            self.assertEqual(list(pdf_parser.reassemble_lines(text.split('\n'))), lines)
+
+    def test_read_sections(self):
+        lines = ['Intro', 'Time Limit', '1', 'Languages', 'C', 'LINKS', 'a', 'languages', 'Java', 'b']
+        sections = pdf_parser.read_sections(lines, pdf_parser.SOLUTION_HEADINGS)
+        self.assertEqual(sections[None], 'Intro\n')
+        self.assertEqual(sections['time limit'], '1,')
+        self.assertEqual(sections['links'], 'a\n')
+        # a heading which appears twice has the text of both sections
+        self.assertEqual(sections['languages'], 'C,Java,b,')
+        self.assertEqual(sections['complexity'], '')
+
+    def test_parse_solution_lines(self):
+        solution = pdf_parser.parse_solution_lines(['Use a queue.', 'Languages', 'python', ' ', 'java', 'Time Limit',
+                                                    '1.5 seconds', 'Complexity', 'O(n)'])
+        self.assertEqual(solution['solution_description'], 'Use a queue.\n')
+        self.assertEqual(solution['languages'], 'python,java')
+        self.assertEqual(solution['time_limit'], '1.5')
+        self.assertEqual(solution['complexity'], 'O(n)')
+        self.assertEqual(solution['links'], 'No links.')
+        self.assertEqual(solution['example_code'], 'No example solution code.')
+
+    def test_parse_problem_lines(self):
+        problem = pdf_parser.parse_problem_lines(['Walk', 'Sample Output', '3', 'Problem Description', 'Walk home.'])
+        self.assertEqual(problem['title'], 'Walk')
+        self.assertEqual(problem['problem_description'], 'Walk home.\n')
+        self.assertEqual(problem['example_output'], '3\n')
+        self.assertEqual(problem['example_input'], 'No sample input provided.')
+        with self.assertRaises(ValueError):
+            pdf_parser.parse_problem_lines(['Walk'])
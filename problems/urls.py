@@ -14,6 +14,12 @@ urlpatterns = [
     url(r'^add/upload/?$',
         views.AddProblemFromPDF.as_view(),
         name="add_problem_from_pdf"),
+    url(r'^add/upload/(?P<job_id>[0-9]+)/?$',
+        views.ViewIngestionJob.as_view(),
+        name="view_ingestion_job"),
+    url(r'^add/upload/(?P<job_id>[0-9]+)/status/?$',
+        views.IngestionJobStatus.as_view(),
+        name="ingestion_job_status"),
     url(r'^add/?$',
         views.AddProblem.as_view(),
         name="add_problem"),
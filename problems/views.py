@@ -3,20 +3,17 @@ from hashlib import md5
 
 from io import StringIO, BytesIO
 
-import collections
-from itertools import islice
-
-from PyPDF2 import PdfFileReader
 import random
 import datetime
 import reportlab
 from django.contrib.auth.models import User
-from django.core.files.storage import FileSystemStorage
 from django.core.mail import send_mail
+from django.db.models import Q
 from django.core.management import call_command
 from django.forms import formset_factory
 from django.http import HttpResponse
 from django.http import HttpResponseRedirect
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.template import Context
 from django.template.loader import get_template
@@ -29,6 +26,7 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from FindingProblems import settings
 from .models import *
 from .forms import *
+from . import search
 
 def is_activated(user):
     """
@@ -79,6 +77,73 @@ class HelperView(View):
         """
         return [str(ds.name) for ds in Category.objects.filter(type="data-structure")]
 
+    def pdf_form_context(self, result, uploaded=True):
+        """
+        Populates the Add Problem form with the information parsed from uploaded PDFs
+        :param result: A dictionary with 'problem' and 'solution' keys, each holding the data parsed from that PDF, or None
+        if it was not uploaded
+        :param uploaded: False if no PDFs were uploaded at all
+        :return: A dictionary of context for the Add Problem from PDF template
+        """
+        problem = result.get('problem')
+        solution = result.get('solution')
+        #set up the problem and content form, falling back to the defaults
+        if problem:
+            problem_form = ProblemForm(initial={'title': problem['title']})
+            paradigms = problem['paradigms']
+            content_form = ContentForm(initial={
+                'problem_description': problem['problem_description'],
+                'example_input': problem['example_input'],
+                'example_output': problem['example_output'],
+            })
+        else:
+            problem_form = ProblemForm(initial={'title': ''})
+            paradigms = ''
+            content_form = ContentForm(initial={
+                'problem_description': '',
+                'example_input': 'No example input provided.',
+                'example_output': 'No example output provided.',
+            })
+        #set up the solution form, falling back to the defaults
+        if solution:
+            solution_form = SolutionForm(initial={
+                'solution_description': solution['solution_description'],
+                'links': solution['links'],
+                'example_code': solution['example_code'],
+                'time_limit': solution['time_limit'],
+            })
+            languages = solution['languages']
+            algorithms = solution['algorithms']
+            data_structures = solution['data_structures']
+            complexity = solution['complexity']
+        else:
+            solution_form = SolutionForm({
+                'solution_description': 'No solution description has been provided.' if uploaded else '',
+                'links': 'No links.',
+                'example_code': 'No example solution code.',
+                'time_limit': 0,
+                'complexity': None,
+            })
+            languages = ''
+            algorithms = ''
+            data_structures = ''
+            complexity = ''
+        return {
+            'problem_form': problem_form,
+            'content_form': content_form,
+            'solution_form': solution_form,
+            'paradigms': paradigms,
+            'languages': languages,
+            'algorithms': algorithms,
+            'data_structures': data_structures,
+            'complexity': complexity,
+            'suggested_paradigms': self.SUGGESTED_PARADIGMS,
+            'suggested_algorithms': self.SUGGESTED_ALGORITHMS,
+            'suggested_data_structures': self.SUGGESTED_DATA_STRUCTURES,
+            'suggested_languages': self.SUGGESTED_LANGUAGES,
+            'suggested_complexity': self.SUGGESTED_COMPLEXITY,
+        }
+
 
 class Home(View):
     """
@@ -261,6 +326,12 @@ class Index(HelperView):
     """
     A class for managing requests made to the Problem Catalogue page
     """
+    PAGE_SIZE = 25
+    ORDERINGS = {
+        'id': ['id'],
+        'difficulty': ['difficulty', 'id'],
+    }
+
     def get(self, request):
         """
         A method for handling HTTP GET requests made to the Problem Catalogue page
@@ -279,18 +350,23 @@ class Index(HelperView):
         data_structures = request.GET.get('data_structures', '')
         difficulty = request.GET.get('difficulty', '')
         visibility = request.GET.get('visibility', '')
-
-        #filter the problems by the terms in the search query
-        if paradigms:
-            problems = problems.filter(categories__name__in=[x.lower().strip() for x in paradigms.split(',')])
-        if languages:
-            problems = problems.filter(solution__language__name__in=[x.lower().strip() for x in languages.split(',')])
-        if algorithms:
-            problems = problems.filter(solution__algorithms__name__in=[x.lower().strip() for x in algorithms.split(',')])
-        if complexity:
-            problems = problems.filter(solution__complexity__name__in=[x.lower().strip() for x in complexity.split(',')])
-        if data_structures:
-            problems = problems.filter(solution__data_structures__name__in=[x.lower().strip() for x in data_structures.split(',')])
+        terms = request.GET.get('q', '').strip()
+        sort = request.GET.get('sort', '')
+        if sort not in self.ORDERINGS:
+            sort = 'id'
+
+        #filter the problems by the terms in the search query, intersecting the category index for each facet
+        facets = [
+            ("paradigm", paradigms),
+            ("language", languages),
+            ("algorithm", algorithms),
+            ("complexity", complexity),
+            ("data-structure", data_structures),
+        ]
+        for category_type, names in facets:
+            if names:
+                names = [x.lower().strip() for x in names.split(',')]
+                problems = problems.filter(id__in=CategoryIndex.problems_in(category_type, names))
         if difficulty:
             problems = problems.filter(difficulty=difficulty)
 
@@ -302,14 +378,23 @@ class Index(HelperView):
         else:
             problems = problems.exclude(problem_privacy=True)
 
-        problems_tuples = self.get_problem_data(problems)
+        if search.is_searchable(terms):
+            #rank the problems in the filtered set which match the full-text search
+            ranked_ids = search.ranked_problem_ids(terms, problems)
+            result_count = len(ranked_ids)
+            page_problems, pagination = self.paginate_ranked_problems(request, ranked_ids)
+        else:
+            result_count = problems.count()
+            page_problems, pagination = self.paginate_problems(request, problems, sort, result_count)
+        problems_tuples = self.get_problem_data(page_problems)
         context = {
             'suggested_paradigms': self.SUGGESTED_PARADIGMS(),
             'suggested_data_structures': self.SUGGESTED_DATA_STRUCTURES(),
             'suggested_complexity': self.SUGGESTED_COMPLEXITY(),
             'suggested_algorithms': self.SUGGESTED_ALGORITHMS(),
             'suggested_languages': self.SUGGESTED_LANGUAGES(),
-            'problems': problems.distinct(),
+            'problems': page_problems,
+            'result_count': result_count,
             'problem_info': problems_tuples,
             'problem_sets': Challenge.objects.all(),
             'difficulties': zip(range(5), ['Very Easy', 'Easy', 'Average', 'Difficult', 'Very Difficult']),
@@ -320,10 +405,161 @@ class Index(HelperView):
             'searched_languages': languages,
             'searched_difficulty': difficulty,
             'searched_visibility': visibility,
+            'searched_sort': sort,
+            'searched_terms': terms,
             'challenge': challenge,
         }
+        context.update(pagination)
         return render(request, 'problems/index.html', context)
 
+    def paginate_problems(self, request, problems, sort, result_count):
+        """
+        A helper method for selecting the page of problems to display on the Problem Catalogue page. Pages are normally
+        chosen by number, but when an 'after' or 'before' cursor is supplied the page is found by seeking past the
+        cursor's sort key instead, which costs the same however deep into the catalogue the page is.
+        :param request: A dictionary object representing the HTTP GET request
+        :param problems: The filtered set of problems to be paginated
+        :param sort: The key of the ordering in ORDERINGS to paginate by
+        :param result_count: The total number of problems in the filtered set
+        :return: A tuple of (the list of problems on the page, a dictionary of pagination details for the template)
+        """
+        ordering = self.ORDERINGS[sort]
+        after = self.parse_cursor(request.GET.get('after', ''), ordering)
+        before = self.parse_cursor(request.GET.get('before', ''), ordering)
+        num_pages = self.count_pages(result_count)
+        page_number = self.get_page_number(request, num_pages)
+
+        if after:
+            problems = problems.filter(self.keyset_filter(ordering, after, '__gt')).order_by(*ordering)
+            page = list(problems[:self.PAGE_SIZE + 1])
+            has_next = len(page) > self.PAGE_SIZE
+            has_previous = True
+            page = page[:self.PAGE_SIZE]
+        elif before:
+            problems = problems.filter(self.keyset_filter(ordering, before, '__lt'))\
+                .order_by(*['-' + field for field in ordering])
+            page = list(problems[:self.PAGE_SIZE + 1])
+            has_previous = len(page) > self.PAGE_SIZE
+            has_next = True
+            page = page[:self.PAGE_SIZE][::-1]
+        else:
+            offset = (page_number - 1) * self.PAGE_SIZE
+            page = list(problems.order_by(*ordering)[offset:offset + self.PAGE_SIZE + 1])
+            has_next = len(page) > self.PAGE_SIZE
+            has_previous = page_number > 1
+            page = page[:self.PAGE_SIZE]
+
+        pagination = {
+            'page_number': page_number,
+            'num_pages': num_pages,
+            'previous_page_url': '',
+            'next_page_url': '',
+        }
+        if page:
+            if has_previous:
+                pagination['previous_page_url'] = self.page_url(request, page_number - 1,
+                                                                before=self.cursor_for(page[0], ordering))
+            if has_next:
+                pagination['next_page_url'] = self.page_url(request, page_number + 1,
+                                                            after=self.cursor_for(page[-1], ordering))
+        return page, pagination
+
+    def paginate_ranked_problems(self, request, ranked_ids):
+        """
+        A helper method for selecting the page of full-text search results to display on the Problem Catalogue page
+        :param request: A dictionary object representing the HTTP GET request
+        :param ranked_ids: The ids of the matching problems, from the most to the least relevant
+        :return: A tuple of (the list of problems on the page, a dictionary of pagination details for the template)
+        """
+        num_pages = self.count_pages(len(ranked_ids))
+        page_number = self.get_page_number(request, num_pages)
+        offset = (page_number - 1) * self.PAGE_SIZE
+        page_ids = ranked_ids[offset:offset + self.PAGE_SIZE]
+        problems_by_id = Problem.objects.in_bulk(page_ids)
+        page = [problems_by_id[problem_id] for problem_id in page_ids if problem_id in problems_by_id]
+        pagination = {
+            'page_number': page_number,
+            'num_pages': num_pages,
+            'previous_page_url': self.page_url(request, page_number - 1) if page_number > 1 else '',
+            'next_page_url': self.page_url(request, page_number + 1) if page_number < num_pages else '',
+        }
+        return page, pagination
+
+    def count_pages(self, result_count):
+        """
+        A helper method for determining how many pages a set of results spans
+        :param result_count: The number of results
+        :return: The number of pages, which is at least 1
+        """
+        return max(1, -(-result_count // self.PAGE_SIZE))
+
+    def get_page_number(self, request, num_pages):
+        """
+        A helper method for reading the requested page number from the query string
+        :param request: A dictionary object representing the HTTP GET request
+        :param num_pages: The number of pages available
+        :return: The page number, clamped to the available pages
+        """
+        try:
+            return min(max(1, int(request.GET.get('page', 1))), num_pages)
+        except ValueError:
+            return 1
+
+    def parse_cursor(self, cursor, ordering):
+        """
+        A helper method for reading a keyset cursor from the query string
+        :param cursor: A string of comma separated values, one for each field in the ordering
+        :param ordering: The list of fields the cursor refers to
+        :return: A list of the cursor's values, or None if the cursor is missing or malformed
+        """
+        try:
+            values = [int(value) for value in cursor.split(',')]
+        except ValueError:
+            return None
+        if len(values) != len(ordering):
+            return None
+        return values
+
+    def cursor_for(self, problem, ordering):
+        """
+        A helper method for creating the keyset cursor pointing at a problem
+        :param problem: The problem to create the cursor for
+        :param ordering: The list of fields the cursor should refer to
+        :return: A string of comma separated values, one for each field in the ordering
+        """
+        return ','.join(str(getattr(problem, field)) for field in ordering)
+
+    def keyset_filter(self, ordering, values, lookup):
+        """
+        A helper method for building the filter which selects the problems sorted strictly after (or before) a cursor
+        :param ordering: The list of fields the problems are sorted by
+        :param values: The values of the cursor for each field in the ordering
+        :param lookup: '__gt' to select the problems after the cursor, '__lt' to select those before it
+        :return: A Q object representing the filter
+        """
+        keyset = Q()
+        for i, field in enumerate(ordering):
+            condition = Q(**{field + lookup: values[i]})
+            for previous_field, previous_value in zip(ordering[:i], values[:i]):
+                condition &= Q(**{previous_field: previous_value})
+            keyset |= condition
+        return keyset
+
+    def page_url(self, request, page_number, **cursor):
+        """
+        A helper method for creating the link to another page of the current search
+        :param request: A dictionary object representing the HTTP GET request
+        :param page_number: The number of the page being linked to
+        :param cursor: Either an 'after' or a 'before' cursor for the page being linked to
+        :return: A query string for the page, keeping the search terms of the current request
+        """
+        query = request.GET.copy()
+        for key in ('page', 'after', 'before'):
+            query.pop(key, None)
+        query['page'] = str(page_number)
+        query.update(cursor)
+        return '?' + query.urlencode()
+
     def get_solution_availability(self, solution):
         """
         A helper method for determining the state of the solution availability for a particular problem
@@ -343,11 +579,10 @@ class Index(HelperView):
         :return: A tuple representing the state of the following pieces of information (problem id, solution availability, categories for the problem)
         """
         p_list = []
-        for problem in problems:
-            solution = Solution.objects.get(problem=problem)
+        for solution in Solution.for_problems(problems):
             solution_availability = self.get_solution_availability(solution)
             categories = solution.get_all_categories()
-            temp = (problem.id, solution_availability, categories)
+            temp = (solution.problem_id, solution_availability, categories)
             p_list.append(temp)
         return p_list
 
@@ -400,392 +635,81 @@ class AddProblemFromPDF(HelperView):
         }
         return render(request, 'problems/upload.html', context)
 
+    @method_decorator(login_required)
+    @method_decorator(user_passes_test(is_activated, login_url="/problems/accounts/activate/"))
     def post(self, request):
         """
-        A method for handling HTTP POST requests made to the Upload Problem via PDF page
+        A method for handling HTTP POST requests made to the Upload Problem via PDF page. Uploaded PDFs are queued to be
+        parsed in the background.
         :param request: A dictionary object representing the HTTP POST request
-        :return: Returns an HTTP response object which renders the Add Problem form with the information from the uploaded
-        PDF. If an error occurs, it renders the Problem Catalogue page with an error message displayed.
+        :return: Returns an HTTP response object which redirects to the progress page of the queued PDFs. If no files were
+        uploaded, the empty Add Problem form is rendered instead. If an error occurs, it renders the Problem Catalogue page
+        with an error message displayed.
         """
         pdf_form = PDFForm(request.POST, request.FILES)
         if pdf_form.is_valid():
             if request.FILES:
-                #process the problem PDF, if it exists
-                try:
-                    if request.FILES['problem']:
-                        problem_file = request.FILES['problem']
-                        fs = FileSystemStorage()
-                        f_name = fs.save(problem_file.name, problem_file)
-                        f_name = f_name.replace('%20', ' ')
-                        #upload the file
-                        upload_file_url = settings.MEDIA_ROOT+'\\'+f_name
-                        #parse the file
-                        parsed_problem_pdf = self.parse_problem_pdf(upload_file_url)
-                        problem_form = parsed_problem_pdf[0]
-                        paradigms = parsed_problem_pdf[1]
-                        content_form = parsed_problem_pdf[2]
-                        os.remove(upload_file_url)
-
-                #set up default problem and content form
-                except MultiValueDictKeyError:
-                    p_form_data = {
-                        'title': '',
-                    }
-                    problem_form = ProblemForm(initial=p_form_data)
-                    paradigms = ''
-                    c_form_data = {
-                        'problem_description': '',
-                        'example_input': 'No example input provided.',
-                        'example_output': 'No example output provided.',
-                    }
-                    content_form = ContentForm(initial=c_form_data)
-
-                #process the solution PDF, if it exists
-                try:
-                    if request.FILES['solution']:
-                        solution_file = request.FILES['solution']
-                        fs = FileSystemStorage()
-                        f_name = fs.save(solution_file.name, solution_file)
-                        f_name = f_name.replace('%20', ' ')
-                        #upload the file
-                        upload_file_url = settings.MEDIA_ROOT+'\\'+f_name
-                        #parse the file
-                        parsed_solution_pdf = self.parse_solution_pdf(upload_file_url)
-                        solution_form = parsed_solution_pdf[0]
-                        languages = parsed_solution_pdf[1]
-                        algorithms = parsed_solution_pdf[2]
-                        data_structures = parsed_solution_pdf[3]
-                        complexity = parsed_solution_pdf[4]
-                        os.remove(upload_file_url)
-
-                #set up default solution form
-                except MultiValueDictKeyError:
-                    s_form_data = {
-                        'solution_description': 'No solution description has been provided.',
-                        'links': 'No links.',
-                        'example_code': 'No example solution code.',
-                        'time_limit': 0,
-                        'complexity': None,
-                    }
-                    solution_form = SolutionForm(s_form_data)
-                    languages = ''
-                    algorithms = ''
-                    data_structures = ''
-                    complexity = ''
+                job = IngestionJob(created_by=request.user)
+                if request.FILES.get('problem'):
+                    job.problem_pdf = request.FILES['problem'].read()
+                if request.FILES.get('solution'):
+                    job.solution_pdf = request.FILES['solution'].read()
+                job.save()
+                return redirect('view_ingestion_job', job_id=job.id)
             #if neither file submitted, setup default problem, content and solution forms
-            else:
-                p_form_data = {
-                    'title': '',
-                }
-                problem_form = ProblemForm(initial=p_form_data)
-                c_form_data = {
-                    'problem_description': '',
-                    'example_input': 'No example input provided.',
-                    'example_output': 'No example output provided.',
-                }
-                content_form = ContentForm(initial=c_form_data)
-                s_form_data = {
-                    'solution_description': '',
-                    'links': 'No links.',
-                    'example_code': 'No example solution code.',
-                    'time_limit': 0,
-                    'complexity': None,
-                }
-                solution_form = SolutionForm(s_form_data)
-                paradigms = ''
-                languages = ''
-                algorithms = ''
-                data_structures = ''
-                complexity = ''
-
-            context = {
-                'problem_form': problem_form,
-                'content_form': content_form,
-                'solution_form': solution_form,
-                'paradigms': paradigms,
-                'languages': languages,
-                'algorithms': algorithms,
-                'data_structures': data_structures,
-                'complexity': complexity,
-                'suggested_paradigms': self.SUGGESTED_PARADIGMS,
-                'suggested_algorithms': self.SUGGESTED_ALGORITHMS,
-                'suggested_data_structures': self.SUGGESTED_DATA_STRUCTURES,
-                'suggested_languages': self.SUGGESTED_LANGUAGES,
-                'suggested_complexity': self.SUGGESTED_COMPLEXITY,
-            }
+            context = self.pdf_form_context({'problem': None, 'solution': None}, uploaded=False)
             messages.info(request, "File has been uploaded. Please check to make sure that all the fields are correct.")
             return render(request, 'problems/add_problem_from_pdf.html', context)
         else:
             messages.info(request, "Error when uploading file. Please try again.")
             return redirect('index')
 
-    def parse_solution_pdf(self, file_name):
-        """
-        A helper method for parsing a PDF containing the solution to a problem
-        :param file_name: The name of the file to be parsed.
-        :return: A list, containing the following [populated solution form, string representing the languages by which the
-        solution has been categorised, a string representing the algorithms by which the solution has been categorised,
-        a string representing the data structures by which the solution has been categorised, a string representing the
-        complexities by which the solution has been categorised]
-        """
-        HEADINGS = ['complexity', 'links', 'time limit', 'example code', 'languages', 'algorithms', 'data structures']
-        solution_pdf_content = self.getPDFContent(file_name)
-        #parse the solution description
-        solution_description = ""
-        start_next_section = 0
-        if solution_pdf_content[start_next_section] not in HEADINGS:
-            for line in range(0, len(solution_pdf_content)):
-                if solution_pdf_content[line].lower() in HEADINGS:
-                    start_next_section = line
-                    break
-                else:
-                    solution_description += solution_pdf_content[line] + '\n'
-        complexity = ""
-        links = ""
-        example_code = ""
-        language = ""
-        data_structures = ""
-        algorithms = ""
-        time_limit = ""
-
-        max_index = len(solution_pdf_content) - 1
-        not_end_of_file = True
-        #parse the subsections of the file based on expected HEADINGS
-        while not_end_of_file:
-            if solution_pdf_content[start_next_section].lower() == 'complexity':
-                start = start_next_section + 1
-                for line in range(start, len(solution_pdf_content)):
-                    if solution_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        complexity += solution_pdf_content[line] + '\n'
-                        start_next_section += 1
-            elif solution_pdf_content[start_next_section].lower() == 'links':
-                start = start_next_section + 1
-                for line in range(start, len(solution_pdf_content)):
-                    if solution_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        links += solution_pdf_content[line] + '\n'
-                        start_next_section += 1
-            elif solution_pdf_content[start_next_section].lower() == 'example code':
-                start = start_next_section + 1
-                for line in range(start, len(solution_pdf_content)):
-                    if solution_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        example_code += solution_pdf_content[line] + '\n'
-                        start_next_section += 1
-            elif solution_pdf_content[start_next_section].lower() == 'languages':
-                start = start_next_section + 1
-                for line in range(start, len(solution_pdf_content)):
-                    if solution_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        language += solution_pdf_content[line] + ','
-                        start_next_section += 1
-            elif solution_pdf_content[start_next_section].lower() == 'data structures':
-                start = start_next_section + 1
-                for line in range(start, len(solution_pdf_content)):
-                    if solution_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        data_structures += solution_pdf_content[line] + ','
-                        start_next_section += 1
-            elif solution_pdf_content[start_next_section].lower() == 'algorithms':
-                start = start_next_section + 1
-                for line in range(start, len(solution_pdf_content)):
-                    if solution_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        algorithms += solution_pdf_content[line] + ','
-                        start_next_section += 1
-            elif solution_pdf_content[start_next_section].lower() == 'time limit':
-                start = start_next_section + 1
-                for line in range(start, len(solution_pdf_content)):
-                    if solution_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        time_limit += solution_pdf_content[line] + ','
-                        start_next_section += 1
-            start_next_section += 1
-            if start_next_section >= max_index:
-                not_end_of_file = False
-
-        reject_char = [' ', '', '\n']
-        # clean up languages
-        temp_language = ""
-        for l in language.split(','):
-            if l in reject_char:
-                pass
-            else:
-                temp_language += l + ','
-        language = temp_language[:-1]
-        # clean up complexity
-        temp_complexity = ""
-        for c in complexity.split(','):
-            if c in reject_char:
-                pass
-            else:
-                temp_complexity += c + ','
-        complexity = temp_complexity[:-1]
-        # clean up datastructures input
-        temp_ds = ""
-        for ds in data_structures.split(','):
-            if ds in reject_char:
-                pass
-            else:
-                temp_ds += ds + ','
-        data_structures = temp_ds[:-1]
-        # clean up time limit input
-        for char in time_limit:
-            try:
-                int(char)
-            except ValueError:
-                if char == '.':
-                    pass
-                else:
-                    time_limit = time_limit.replace(char, '')
-        if time_limit == '.':
-            time_limit = float(0)
-
-        #populate the solution form
-        s_form_data = {
-            'solution_description': solution_description if solution_description != "" else "No solution description has been provided.",
-            'links': links.strip() if links != "" else "No links.",
-            'example_code': example_code if example_code != "" else "No example solution code.",
-            'time_limit': time_limit if time_limit != "" else 0,
-        }
-        solution_form = SolutionForm(initial=s_form_data)
-        return [solution_form, language.strip(), algorithms.strip(), data_structures.strip(), complexity.strip()]
-
-    def parse_problem_pdf(self, file_name):
-        """
-        A helper method for parsing a PDF of a problem
-        :param file_name: The name of the file containing the problem
-        :return: A list containing the following values: [populated problem form, paradigms by which the problem should
-        be categorised, populated content form]
-        """
-        HEADINGS = ['sample input', 'problem description', 'sample output', 'paradigms']
-        problem_pdf_content = self.getPDFContent(file_name)
-        title = problem_pdf_content[0]
-        #parse the problem description
-        problem_description = ""
-        start_next_section = 1
-        sample_input = ""
-        sample_output = ""
-        paradigms = ""
-        max_index = len(problem_pdf_content) - 1
-        not_end_of_file = True
-        #parse the rest of the file based on expected HEADINGS
-        while not_end_of_file:
-            if problem_pdf_content[start_next_section].lower() == 'sample input':
-                start = start_next_section + 1
-                for line in range(start, len(problem_pdf_content)):
-                    if problem_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        sample_input += problem_pdf_content[line] + '\n'
-                        start_next_section += 1
-            elif problem_pdf_content[start_next_section].lower() == 'problem description':
-                start = start_next_section + 1
-                for line in range(start, len(problem_pdf_content)):
-                    if problem_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        problem_description += problem_pdf_content[line] + '\n'
-                        start_next_section += 1
-            elif problem_pdf_content[start_next_section].lower() == 'sample output':
-                start = start_next_section + 1
-                for line in range(start, len(problem_pdf_content)):
-                    if problem_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        sample_output += problem_pdf_content[line] + '\n'
-                        start_next_section += 1
-            elif problem_pdf_content[start_next_section].lower() == 'paradigms':
-                start = start_next_section + 1
-                for line in range(start, len(problem_pdf_content)):
-                    if problem_pdf_content[line].lower() in HEADINGS:
-                        break
-                    else:
-                        paradigms += problem_pdf_content[line] + '\n'
-                        start_next_section += 1
-            start_next_section += 1
-            if start_next_section >= max_index:
-                not_end_of_file = False
-
-        #populate the problem form
-        p_form_data = {
-            'title': title,
-        }
-        problem_form = ProblemForm(initial=p_form_data)
-        #populate the content form
-        c_form_data = {
-            'problem_description': problem_description,
-            'example_input': sample_input if sample_input != "" else "No sample input provided.",
-            'example_output': sample_output if sample_output != "" else "No sample output provided.",
+
+class ViewIngestionJob(HelperView):
+    """
+    A class for managing requests made to the progress page of an uploaded PDF
+    """
+    @method_decorator(login_required)
+    @method_decorator(user_passes_test(is_activated, login_url="/problems/accounts/activate/"))
+    def get(self, request, job_id):
+        """
+        A method for handling HTTP GET requests made to the progress page of an uploaded PDF
+        :param request: A dictionary object representing the HTTP GET request
+        :param job_id: The unique identifier for the ingestion job of the upload
+        :return: Returns an HTTP response object which renders the Add Problem form with the information from the uploaded
+        PDF once it has been parsed. Until then, or if parsing fails, the progress page is rendered instead.
+        """
+        job = get_object_or_404(IngestionJob.objects.defer(*IngestionJob.PDF_FIELDS), pk=job_id,
+                                created_by=request.user)
+        if job.status == IngestionJob.DONE:
+            context = self.pdf_form_context(job.get_result())
+            messages.info(request, "File has been uploaded. Please check to make sure that all the fields are correct.")
+            return render(request, 'problems/add_problem_from_pdf.html', context)
+        context = {
+            'job': job,
         }
-        content_form = ContentForm(initial=c_form_data)
+        return render(request, 'problems/ingestion_job.html', context)
 
-        return [problem_form, paradigms, content_form]
 
-    def consume(self, iterator, num):
-        """
-        A helper method to increment the current iteration of a loop
-        :param iterator: An Iterator for a loop
-        :param num: The number of iterations the Iterator needs to be moved through
-        :return: The incremented iterator
+class IngestionJobStatus(View):
+    """
+    A class for managing requests made to the status endpoint of an uploaded PDF
+    """
+    @method_decorator(login_required)
+    def get(self, request, job_id):
         """
-        if num is None:
-            collections.deque(iterator, maxlen=0)
-        else:
-            next(islice(iterator, num, num), None)
-
-    def getPDFContent(self, file_name):
-        """
-        A helper method for reading and saving information from the PDF
-        :param file_name: The name of the file to be read in
-        :return: A list containing the contents of the PDF on a line- by-line basis
-        """
-        pdf_file = open(file_name, 'rb')
-        reader = PdfFileReader(pdf_file)
-        actual_lines = []
-        pages = reader.getNumPages()
-        for page in range(pages):
-            current_page = reader.getPage(page).extractText()
-            list_of_lines = current_page.split('\n')
-            out_of_range = len(list_of_lines)
-            max_index = out_of_range - 1
-            lines_on_page = iter(range(out_of_range))
-            for line in lines_on_page:
-                section = list_of_lines[line]
-                # end of file, just append the line
-                if line == max_index:
-                    actual_lines.append(section)
-                # otherwise
-                else:
-                    next_section = list_of_lines[line + 1]
-                    # if the next line is just a blank line, append both and continue from the line after the blank one
-                    if list_of_lines[line + 1] == ' ':
-                        actual_lines.append(section)
-                        actual_lines.append(next_section)
-                        self.consume(lines_on_page, 1)
-                    else:
-                        temp_line = line
-                        paragraph = ""
-                        while section != ' ':
-                            paragraph += section
-                            temp_line += 1
-                            if temp_line <= max_index:
-                                section = list_of_lines[temp_line]
-                            else:
-                                break
-                        actual_lines.append(paragraph)
-                        self.consume(lines_on_page, temp_line - line)
-
-        pdf_file.close()
-        return actual_lines
+        A method for handling HTTP GET requests made to the status endpoint of an uploaded PDF
+        :param request: A dictionary object representing the HTTP GET request
+        :param job_id: The unique identifier for the ingestion job of the upload
+        :return: Returns a JSON response describing the state of the job
+        """
+        job = get_object_or_404(IngestionJob.objects.defer(*IngestionJob.PDF_FIELDS), pk=job_id,
+                                created_by=request.user)
+        return JsonResponse({
+            'id': job.id,
+            'status': job.status,
+            'error': job.error,
+        })
 
 
 class AddProblem(HelperView):